@@ -8,6 +8,10 @@ import csv
 import os
 from models.thalassemia_models import get_model
 from models.model_utils import load_model
+from data_loaders.cbc_store import CBCColumnStore
+from data_loaders.scaler_io import load_scaler
+from federated.feature_stats import GLOBAL_SCALER_FILE
+from blockchain.ledger import BlockchainLedger
 from config.settings import settings
 from config.logging_config import get_logger
 
@@ -19,6 +23,47 @@ api_bp = Blueprint('api', __name__)
 # Global model (loaded on startup)
 global_model = None
 
+# Global scaler from the federated statistics round, reloaded when the file changes
+_global_scaler = None
+_global_scaler_mtime = None
+
+
+def get_global_scaler():
+    """Load the cached global scaler (None if no FL run has written it yet)."""
+    global _global_scaler, _global_scaler_mtime
+    
+    scaler_path = settings.checkpoints_dir / GLOBAL_SCALER_FILE
+    if not scaler_path.exists():
+        return None
+    
+    mtime = scaler_path.stat().st_mtime_ns
+    if mtime != _global_scaler_mtime:
+        _global_scaler = load_scaler(scaler_path)
+        _global_scaler_mtime = mtime
+    
+    return _global_scaler
+
+
+# Read-only view of the training ledger. A SQLite ledger reads new blocks
+# live; a block log reader tails the lines appended since its last refresh.
+_ledger = None
+
+
+def get_ledger():
+    """Open the cached read-only ledger (None if no FL run has written it yet)."""
+    global _ledger
+    
+    log_path = settings.ledger_path
+    if not log_path.exists():
+        return None
+    
+    if _ledger is None:
+        _ledger = BlockchainLedger(log_path=log_path, read_only=True, storage=settings.ledger_storage)
+    else:
+        _ledger.refresh()
+    
+    return _ledger
+
 
 @api_bp.route('/predict/cbc', methods=['POST'])
 def predict_cbc():
@@ -52,7 +97,10 @@ def predict_cbc():
             data['platelets']
         ]], dtype=np.float32)
         
-        # Normalize (you should use the same scaler from training)
+        # Normalize with the same global scaler used in training
+        scaler = get_global_scaler()
+        if scaler is not None:
+            features = scaler.transform(features).astype(np.float32)
         features_tensor = torch.FloatTensor(features)
         
         # Predict (placeholder - load actual model)
@@ -90,14 +138,53 @@ def model_info():
 @api_bp.route('/blockchain/status', methods=['GET'])
 def blockchain_status():
     """Get blockchain status."""
-    # Placeholder - integrate with actual blockchain
+    ledger = get_ledger()
+    counts = ledger.count_blocks() if ledger is not None else {'total': 0}
+    
     return jsonify({
         'enabled': settings.blockchain_enabled,
         'network': settings.blockchain_network,
-        'blocks': 0
+        'blocks': counts.pop('total'),
+        'block_types': counts
     })
 
 
+@api_bp.route('/blockchain/blocks', methods=['GET'])
+def blockchain_blocks():
+    """
+    Query ledger blocks.
+    
+    Query parameters (all optional):
+        type: Block type (e.g. fl_round, client_updates)
+        round: FL round number
+        client_id: Client identifier
+        offset: Matching blocks to skip (default 0)
+        limit: Page size (default 100)
+    """
+    try:
+        block_type = request.args.get('type')
+        round_number = request.args.get('round', type=int)
+        client_id = request.args.get('client_id')
+        offset = request.args.get('offset', default=0, type=int)
+        limit = request.args.get('limit', default=100, type=int)
+        
+        ledger = get_ledger()
+        if ledger is None:
+            return jsonify({'blocks': [], 'offset': offset, 'limit': limit})
+        
+        blocks = ledger.get_blocks(
+            block_type=block_type,
+            round_number=round_number,
+            client_id=client_id,
+            offset=offset,
+            limit=limit
+        )
+        return jsonify({'blocks': blocks, 'offset': offset, 'limit': limit})
+    
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+
+
 @api_bp.route('/federated/status', methods=['GET'])
 def federated_status():
     """Get federated learning status."""
@@ -264,6 +351,15 @@ def hospital_upload():
             writer.writerow(row_values)
 
         logger.info(f"Appended sample to {csv_path}")
+
+        # Keep the binary column store in sync (converts only the new row)
+        if settings.cbc_column_store:
+            try:
+                CBCColumnStore.sync(csv_path)
+            except Exception as e:
+                # The next dataset load re-syncs from the CSV
+                logger.warning(f"Column store sync failed for {csv_path}: {e}")
+
         return jsonify({'status': 'ok', 'sample': sample}), 200
 
     except Exception as e:
@@ -0,0 +1,109 @@
+"""Signed verification anchors for incremental chain validation."""
+
+import hmac
+import json
+import hashlib
+import threading
+from pathlib import Path
+from typing import Dict, List, Optional
+from config.logging_config import get_logger
+
+logger = get_logger(__name__)
+
+
+class AnchorStore:
+    """
+    HMAC-signed (index, hash) checkpoints of verified chain prefixes.
+
+    Once the chain up to ``index`` has been verified, an anchor records
+    the block hash there. Later validation trusts the prefix whose tip
+    still matches the latest anchor and only re-hashes newer blocks.
+    Anchors are appended to ``path`` (one JSON line each) when given;
+    anchors with a bad signature are ignored.
+    """
+
+    def __init__(self, key: str, path: Optional[Path] = None):
+        """
+        Initialize anchor store.
+
+        Args:
+            key: HMAC secret
+            path: Optional anchors file (JSON lines)
+        """
+        self._key = key.encode("utf-8")
+        self.path = Path(path) if path else None
+        self.anchors: List[Dict] = []
+        self._lock = threading.Lock()
+
+        if self.path is not None and self.path.exists():
+            with open(self.path, "r", encoding="utf-8") as f:
+                for line in f:
+                    if not line.strip():
+                        continue
+                    try:
+                        anchor = json.loads(line)
+                    except ValueError:
+                        continue  # torn last line
+                    if self.is_authentic(anchor):
+                        self.anchors.append(anchor)
+                    else:
+                        logger.warning(f"Ignoring anchor with invalid signature at block {anchor.get('index')}")
+
+    def sign(self, index: int, block_hash: str) -> str:
+        """HMAC-SHA256 signature of an anchor."""
+        message = f"{index}:{block_hash}".encode("utf-8")
+        return hmac.new(self._key, message, hashlib.sha256).hexdigest()
+
+    def is_authentic(self, anchor: Dict) -> bool:
+        """Check an anchor's signature."""
+        try:
+            expected = self.sign(anchor["index"], anchor["hash"])
+        except KeyError:
+            return False
+        return hmac.compare_digest(expected, anchor.get("signature", ""))
+
+    def add(self, index: int, block_hash: str) -> Dict:
+        """
+        Record a verified (index, hash) anchor.
+
+        Args:
+            index: Block index verified up to
+            block_hash: Hash of that block
+
+        Returns:
+            The signed anchor
+        """
+        anchor = {"index": index, "hash": block_hash, "signature": self.sign(index, block_hash)}
+
+        with self._lock:
+            self.anchors.append(anchor)
+            if self.path is not None:
+                self.path.parent.mkdir(parents=True, exist_ok=True)
+                with open(self.path, "a", encoding="utf-8") as f:
+                    f.write(json.dumps(anchor) + "\n")
+
+        return anchor
+
+    def clear(self):
+        """Drop all anchors (e.g. when a new chain is started)."""
+        with self._lock:
+            self.anchors = []
+            if self.path is not None and self.path.exists():
+                self.path.unlink()
+
+    def latest(self, max_index: Optional[int] = None) -> Optional[Dict]:
+        """
+        Most recent anchor, optionally at or below ``max_index``.
+
+        Args:
+            max_index: Highest usable block index (e.g. chain length - 1)
+
+        Returns:
+            Anchor dict or None
+        """
+        with self._lock:
+            anchors = list(self.anchors)
+        for anchor in reversed(anchors):
+            if max_index is None or anchor["index"] <= max_index:
+                return anchor
+        return None
@@ -0,0 +1,121 @@
+"""Ledger blocks."""
+
+import hashlib
+import json
+from typing import Dict, Optional
+
+
+class Block:
+    """A single block in the blockchain."""
+    
+    # Millions of blocks may be resident; no per-instance __dict__
+    __slots__ = ("index", "timestamp", "data", "previous_hash", "hash")
+    
+    def __init__(
+        self,
+        index: int,
+        timestamp: str,
+        data: Dict,
+        previous_hash: str,
+        hash: Optional[str] = None
+    ):
+        """
+        Initialize a block.
+        
+        Args:
+            index: Block index
+            timestamp: Block timestamp
+            data: Block data (model updates, metrics, etc.)
+            previous_hash: Hash of previous block
+            hash: Stored hash to trust (calculated if None)
+        """
+        self.index = index
+        self.timestamp = timestamp
+        self.data = data
+        self.previous_hash = previous_hash
+        self.hash = hash if hash is not None else self.calculate_hash()
+    
+    def calculate_hash(self) -> str:
+        """Calculate block hash."""
+        block_string = json.dumps({
+            "index": self.index,
+            "timestamp": self.timestamp,
+            "data": self.data,
+            "previous_hash": self.previous_hash
+        }, sort_keys=True)
+        
+        return hashlib.sha256(block_string.encode()).hexdigest()
+    
+    @classmethod
+    def from_dict(cls, block_data: Dict, verify: bool = False) -> "Block":
+        """
+        Create a block from ``to_dict`` output.
+        
+        The stored hash is trusted unless ``verify`` is set (or there is
+        none); chain integrity is then covered by ``is_valid``/``audit``.
+        
+        Args:
+            block_data: Block dict
+            verify: Recalculate the hash and check it against the stored one
+            
+        Returns:
+            Block
+        """
+        stored_hash = block_data.get("hash")
+        block = cls(
+            index=block_data["index"],
+            timestamp=block_data["timestamp"],
+            data=block_data["data"],
+            previous_hash=block_data["previous_hash"],
+            hash=None if verify else stored_hash
+        )
+        
+        if verify and stored_hash is not None and block.hash != stored_hash:
+            raise ValueError(f"Stored hash does not match block {block.index}")
+        
+        return block
+    
+    def to_dict(self) -> Dict:
+        """Convert block to dictionary."""
+        return {
+            "index": self.index,
+            "timestamp": self.timestamp,
+            "data": self.data,
+            "previous_hash": self.previous_hash,
+            "hash": self.hash
+        }
+
+
+class LazyBlock(Block):
+    """
+    Block loaded from a log line, decoded on first attribute access.
+    
+    Until then only the raw JSON line is held, so resuming a long chain
+    costs one string per block and no JSON decoding or hashing. The stored
+    hash is trusted, as for ``Block.from_dict``.
+    """
+    
+    __slots__ = ("_raw",)
+    
+    def __init__(self, raw: str):
+        """
+        Initialize a lazy block.
+        
+        Args:
+            raw: JSON line written by the block log
+        """
+        self._raw = raw
+    
+    def __getattr__(self, name: str):
+        # Only called while a Block slot is still unset
+        if name == "_raw" or name not in Block.__slots__:
+            raise AttributeError(name)
+        
+        block_data = json.loads(self._raw)
+        self.index = block_data["index"]
+        self.timestamp = block_data["timestamp"]
+        self.data = block_data["data"]
+        self.previous_hash = block_data["previous_hash"]
+        self.hash = block_data.get("hash") or self.calculate_hash()
+        
+        return getattr(self, name)
@@ -2,7 +2,9 @@
 
 import hashlib
 import json
-from typing import Any, Dict
+import torch
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Optional
 
 
 def hash_dict(data: Dict) -> str:
@@ -40,6 +42,182 @@ def hash_model_weights(weights: Dict) -> str:
     return hash_dict(weights_list)
 
 
+def _tensor_bytes(value) -> tuple:
+    """
+    Canonical (dtype, shape, raw bytes) of a weight value.
+    
+    Tensors are reinterpreted as bytes without a copy (a device tensor is
+    copied to the CPU one at a time); other values hash as their ``str``.
+    """
+    if hasattr(value, 'cpu'):
+        tensor = value.detach().cpu().contiguous()
+        dtype = str(tensor.dtype).replace("torch.", "")
+        shape = tuple(tensor.shape)
+        data = tensor.reshape(-1).view(torch.uint8).numpy() if tensor.numel() else b""
+        return dtype, shape, data
+    return "str", (), str(value).encode()
+
+
+def _tensor_header(key: str, dtype: str, shape: tuple, nbytes: int) -> bytes:
+    """Length-prefixed key/dtype/shape/size header, so tensor boundaries are unambiguous."""
+    return f"{len(key)}:{key}|{dtype}|{','.join(map(str, shape))}|{nbytes}\n".encode()
+
+
+def _hash_tensor(key: str, value) -> bytes:
+    """SHA256 digest of one tensor's header and raw bytes."""
+    dtype, shape, data = _tensor_bytes(value)
+    digest = hashlib.sha256(_tensor_header(key, dtype, shape, len(data)))
+    digest.update(data)
+    return digest.digest()
+
+
+def hash_model_weights_stream(weights: Dict) -> str:
+    """
+    Hash model weights with one incremental SHA256.
+    
+    Keys are visited in sorted order and each tensor's header and raw
+    bytes are fed straight into the hash, so no hex strings or JSON are
+    built and memory stays constant beyond the weights themselves.
+    
+    Args:
+        weights: Model state dict
+        
+    Returns:
+        Hash digest
+    """
+    digest = hashlib.sha256()
+    for key in sorted(weights):
+        dtype, shape, data = _tensor_bytes(weights[key])
+        digest.update(_tensor_header(key, dtype, shape, len(data)))
+        digest.update(data)
+    return digest.hexdigest()
+
+
+# Domain-separation prefixes, so a leaf can never be read as an internal node
+MERKLE_LEAF_PREFIX = b"\x00"
+MERKLE_NODE_PREFIX = b"\x01"
+
+
+def _merkle_leaf(leaf: bytes) -> bytes:
+    """Level-0 node of a leaf digest."""
+    return hashlib.sha256(MERKLE_LEAF_PREFIX + leaf).digest()
+
+
+def _merkle_node(left: bytes, right: bytes) -> bytes:
+    """Parent of two nodes."""
+    return hashlib.sha256(MERKLE_NODE_PREFIX + left + right).digest()
+
+
+def _merkle_parent_level(level: List[bytes]) -> List[bytes]:
+    """Pair up a level; an odd last node is promoted unchanged."""
+    parents = [_merkle_node(level[i], level[i + 1]) for i in range(0, len(level) - 1, 2)]
+    if len(level) % 2:
+        parents.append(level[-1])
+    return parents
+
+
+def merkle_root(leaves: List[bytes]) -> bytes:
+    """
+    Merkle root of leaf digests.
+    
+    Leaves are hashed as SHA256(0x00 || leaf) and internal nodes as
+    SHA256(0x01 || left || right). An odd node at any level is promoted
+    to the next level instead of being paired with itself, so no two
+    leaf lists share a root.
+    
+    Args:
+        leaves: Leaf digests
+        
+    Returns:
+        Root digest
+    """
+    if not leaves:
+        return hashlib.sha256(b"").digest()
+    
+    level = [_merkle_leaf(leaf) for leaf in leaves]
+    while len(level) > 1:
+        level = _merkle_parent_level(level)
+    return level[0]
+
+
+def merkle_proof(leaves: List[bytes], index: int) -> List[Dict]:
+    """
+    Inclusion proof for one leaf: the sibling digest at every level.
+    
+    Levels where the leaf's node is promoted have no sibling and add
+    no step, so proofs may be shorter than the tree height.
+    
+    Args:
+        leaves: Leaf digests
+        index: Position of the leaf
+        
+    Returns:
+        List of {"hash": hex, "side": "left" | "right"} from leaf to root
+    """
+    if not 0 <= index < len(leaves):
+        raise ValueError(f"Leaf index {index} out of range ({len(leaves)} leaves)")
+    
+    proof = []
+    level = [_merkle_leaf(leaf) for leaf in leaves]
+    while len(level) > 1:
+        sibling = index ^ 1
+        if sibling < len(level):
+            proof.append({
+                "hash": level[sibling].hex(),
+                "side": "left" if sibling < index else "right"
+            })
+        level = _merkle_parent_level(level)
+        index //= 2
+    return proof
+
+
+def verify_merkle_proof(leaf: bytes, proof: List[Dict], root: bytes) -> bool:
+    """
+    Check a ``merkle_proof`` against a root in O(log n).
+    
+    Args:
+        leaf: Leaf digest
+        proof: Sibling digests from leaf to root
+        root: Expected Merkle root
+        
+    Returns:
+        True if the leaf is included under ``root``
+    """
+    node = _merkle_leaf(leaf)
+    for step in proof:
+        sibling = bytes.fromhex(step["hash"])
+        if step["side"] == "left":
+            node = _merkle_node(sibling, node)
+        else:
+            node = _merkle_node(node, sibling)
+    return node == root
+
+
+def hash_model_weights_merkle(weights: Dict, num_threads: Optional[int] = None) -> str:
+    """
+    Hash model weights as a Merkle root over per-tensor digests.
+    
+    Each tensor (sorted by key) is hashed independently from its raw
+    bytes; with ``num_threads`` > 1 the tensors are hashed in parallel
+    threads (hashlib releases the GIL on large buffers).
+    
+    Args:
+        weights: Model state dict
+        num_threads: Hashing threads (sequential if None or 1)
+        
+    Returns:
+        Hash digest
+    """
+    keys = sorted(weights)
+    if num_threads and num_threads > 1:
+        with ThreadPoolExecutor(max_workers=num_threads) as executor:
+            leaves = list(executor.map(lambda key: _hash_tensor(key, weights[key]), keys))
+    else:
+        leaves = [_hash_tensor(key, weights[key]) for key in keys]
+    
+    return merkle_root(leaves).hex()
+
+
 def verify_hash(data: Any, expected_hash: str) -> bool:
     """
     Verify data against expected hash.
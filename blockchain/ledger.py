@@ -1,69 +1,120 @@
 """Blockchain ledger for model update tracking."""
 
-import hashlib
 import json
+import queue
+import threading
+import time
+from concurrent.futures import Future
 from datetime import datetime
-from typing import List, Dict, Optional
+from pathlib import Path
+from typing import Iterator, List, Dict, Optional, Union
 from config.logging_config import get_logger
+from config.settings import settings, DEFAULT_SECRET_KEY
+from .block import Block
+from .ledger_log import iter_json_array
+from .anchors import AnchorStore
+from .storage import BlockStore, open_block_store
+from .pruning import STATE_BLOCK, is_state_block, link_hash, summarize_blocks, write_archive, iter_archive, verify_archive
+from .blockchain_utils import hash_dict, merkle_root, merkle_proof, verify_merkle_proof
 
 logger = get_logger(__name__)
 
 
-class Block:
-    """A single block in the blockchain."""
+class BlockchainLedger:
+    """Blockchain ledger for federated learning."""
     
     def __init__(
         self,
-        index: int,
-        timestamp: str,
-        data: Dict,
-        previous_hash: str
+        log_path: Optional[Path] = None,
+        fsync: str = "batch",
+        fsync_every: int = 100,
+        snapshot_every: Optional[int] = None,
+        anchor_key: Optional[str] = None,
+        verify_on_load: bool = False,
+        batch_client_updates: bool = False,
+        read_only: bool = False,
+        storage: Union[str, BlockStore] = "memory",
+        async_commits: bool = False,
+        commit_batch_size: int = 256,
+        archive_dir: Optional[Path] = None
     ):
         """
-        Initialize a block.
+        Initialize blockchain with genesis block.
         
         Args:
-            index: Block index
-            timestamp: Block timestamp
-            data: Block data (model updates, metrics, etc.)
-            previous_hash: Hash of previous block
-        """
-        self.index = index
-        self.timestamp = timestamp
-        self.data = data
-        self.previous_hash = previous_hash
-        self.hash = self.calculate_hash()
-    
-    def calculate_hash(self) -> str:
-        """Calculate block hash."""
-        block_string = json.dumps({
-            "index": self.index,
-            "timestamp": self.timestamp,
-            "data": self.data,
-            "previous_hash": self.previous_hash
-        }, sort_keys=True)
-        
-        return hashlib.sha256(block_string.encode()).hexdigest()
-    
-    def to_dict(self) -> Dict:
-        """Convert block to dictionary."""
-        return {
-            "index": self.index,
-            "timestamp": self.timestamp,
-            "data": self.data,
-            "previous_hash": self.previous_hash,
-            "hash": self.hash
-        }
-
-
-class BlockchainLedger:
-    """Blockchain ledger for federated learning."""
-    
-    def __init__(self):
-        """Initialize blockchain with genesis block."""
-        self.chain: List[Block] = []
-        self.create_genesis_block()
-        logger.info("Initialized blockchain ledger")
+            log_path: Block log (memory storage) or database file (sqlite
+                storage); an existing chain is resumed
+            fsync: Sync policy ("always", "batch" or "never")
+            fsync_every: Blocks between fsyncs for the "batch" policy
+            snapshot_every: Write a compact snapshot every N appended blocks
+            anchor_key: HMAC key for verification anchors (default:
+                settings.secret_key; anchors are only kept in memory while
+                it is the default placeholder)
+            verify_on_load: Re-hash resumed blocks instead of trusting stored hashes
+            batch_client_updates: Buffer client updates and commit each round's
+                updates as one Merkle-rooted block
+            read_only: Open an existing chain for queries only (e.g. from the
+                API while training appends to it); nothing is written
+            storage: Storage backend ("memory" or "sqlite") or an open BlockStore
+            async_commits: Record blocks through a background commit writer;
+                record methods then return futures (see ``submit_block``)
+            commit_batch_size: Most queued blocks the writer commits at once
+            archive_dir: Directory of pruned-block archives (default:
+                ``<store path>.archive``)
+        """
+        self.batch_client_updates = batch_client_updates
+        self._pending_updates: Dict[int, List[Dict]] = {}
+        self.read_only = read_only
+        
+        if isinstance(storage, BlockStore):
+            self.chain = storage
+        else:
+            self.chain = open_block_store(
+                storage,
+                log_path,
+                fsync=fsync,
+                fsync_every=fsync_every,
+                snapshot_every=snapshot_every,
+                read_only=read_only
+            )
+        
+        # Verified-prefix anchors (persisted next to the store) and the full-audit state
+        store_path = self.chain.path
+        anchors_path = store_path.with_name(store_path.name + ".anchors") if store_path else None
+        anchor_key = anchor_key or settings.secret_key
+        if anchors_path is not None and anchor_key == DEFAULT_SECRET_KEY:
+            # Persisted anchors signed with a public key could be forged
+            logger.warning("SECRET_KEY is the default placeholder; verification anchors are not persisted")
+            anchors_path = None
+        self.anchors = AnchorStore(anchor_key, anchors_path)
+        if read_only:
+            self.anchors.path = None  # keep new anchors in memory
+        if archive_dir is None and store_path is not None:
+            archive_dir = store_path.with_name(store_path.name + ".archive")
+        self.archive_dir = Path(archive_dir) if archive_dir is not None else None
+        self.last_audit: Optional[Dict] = None
+        self._audit_stop: Optional[threading.Event] = None
+        self._audit_thread: Optional[threading.Thread] = None
+        
+        # Serializes block creation between callers and the commit writer
+        self._write_lock = threading.RLock()
+        self.commit_batch_size = max(1, commit_batch_size)
+        self._commit_queue: Optional[queue.Queue] = None
+        self._commit_thread: Optional[threading.Thread] = None
+        
+        if len(self.chain):
+            if verify_on_load and not self.is_valid(full=True):
+                raise ValueError(f"Stored chain in {store_path} failed verification")
+            logger.info(f"Resumed blockchain ledger from {store_path} ({len(self.chain)} blocks)")
+        elif not read_only:
+            self.anchors.clear()  # anchors of a previous chain do not apply
+            self.create_genesis_block()
+            logger.info("Initialized blockchain ledger")
+        
+        if async_commits and not read_only:
+            self._commit_queue = queue.Queue()
+            self._commit_thread = threading.Thread(target=self._run_commits, name="ledger-commit", daemon=True)
+            self._commit_thread.start()
     
     def create_genesis_block(self):
         """Create the first block in the chain."""
@@ -83,25 +134,235 @@ class BlockchainLedger:
         """
         Add a new block to the chain.
         
+        With async commits, queued blocks are committed first so the
+        chain order matches the call order.
+        
         Args:
             data: Block data
             
         Returns:
             New block
         """
-        latest_block = self.get_latest_block()
+        if self.read_only:
+            raise ValueError("Ledger is open read-only")
+        
+        self.flush()
+        with self._write_lock:
+            new_block = self._new_block(data, self.get_latest_block())
+            self.chain.append(new_block)
+        logger.debug(f"Added block #{new_block.index} to blockchain")
         
-        new_block = Block(
-            index=len(self.chain),
+        return new_block
+    
+    @staticmethod
+    def _new_block(data: Dict, latest_block: Block) -> Block:
+        """Hash a new block chained to ``latest_block``."""
+        return Block(
+            index=latest_block.index + 1,
             timestamp=datetime.now().isoformat(),
             data=data,
-            previous_hash=latest_block.hash
+            previous_hash=link_hash(latest_block)
         )
+    
+    def submit_block(self, data: Dict) -> Future:
+        """
+        Queue a block for the background commit writer.
         
-        self.chain.append(new_block)
-        logger.info(f"Added block #{new_block.index} to blockchain")
+        The writer hashes, chains and persists queued blocks in batches
+        (one log write or database transaction per batch), so recording
+        does not wait on hashing or I/O. Without async commits the block
+        is added immediately.
         
-        return new_block
+        Args:
+            data: Block data
+            
+        Returns:
+            Future resolving to the committed block
+        """
+        if self.read_only:
+            raise ValueError("Ledger is open read-only")
+        
+        future = Future()
+        if self._commit_queue is None:
+            future.set_result(self.add_block(data))
+        else:
+            self._commit_queue.put((data, future))
+        return future
+    
+    def _record(self, data: Dict) -> Union[Block, Future]:
+        """Add a block, through the commit writer when async commits are on."""
+        if self._commit_queue is not None:
+            return self.submit_block(data)
+        return self.add_block(data)
+    
+    def _run_commits(self):
+        """Commit writer loop; a None entry stops it."""
+        while True:
+            batch = [self._commit_queue.get()]
+            while len(batch) < self.commit_batch_size and batch[-1] is not None:
+                try:
+                    batch.append(self._commit_queue.get_nowait())
+                except queue.Empty:
+                    break
+            
+            entries = [entry for entry in batch if entry is not None]
+            try:
+                self._commit_batch(entries)
+            finally:
+                for _ in batch:
+                    self._commit_queue.task_done()
+            
+            if len(entries) < len(batch):
+                return
+    
+    def _commit_batch(self, entries: List):
+        """Hash, chain and persist queued (data, future) entries."""
+        blocks: List[Block] = []
+        futures: List[Future] = []
+        
+        with self._write_lock:
+            latest_block = self.get_latest_block()
+            for data, future in entries:
+                if not future.set_running_or_notify_cancel():
+                    continue
+                try:
+                    block = self._new_block(data, latest_block)
+                except Exception as e:  # e.g. data that is not JSON-serializable
+                    future.set_exception(e)
+                    continue
+                blocks.append(block)
+                futures.append(future)
+                latest_block = block
+            
+            try:
+                self.chain.extend(blocks)
+            except Exception as e:
+                logger.error(f"Failed to commit {len(blocks)} blocks: {e}")
+                for future in futures:
+                    future.set_exception(e)
+                return
+        
+        for future, block in zip(futures, blocks):
+            future.set_result(block)
+        if blocks:
+            logger.debug(f"Committed blocks #{blocks[0].index}-#{blocks[-1].index}")
+    
+    def flush(self):
+        """Wait until every queued block is committed (e.g. at a round boundary)."""
+        if self._commit_queue is not None and threading.current_thread() is not self._commit_thread:
+            self._commit_queue.join()
+    
+    def snapshot(self):
+        """Compact the storage (block log snapshot or database checkpoint)."""
+        self.flush()
+        self.chain.snapshot()
+    
+    def prune(self, height: Optional[int] = None, archive_dir: Optional[Path] = None) -> Block:
+        """
+        Move blocks up to ``height`` to a cold archive and start from a state block.
+        
+        The state block takes the place of block ``height``. It summarizes
+        per-client contribution totals and the round history of the
+        pruned prefix (including any earlier state block) and carries the
+        hash of block ``height``, which the next block still links to. The
+        summary is bound to the chain through the archive: ``audit``
+        checks the archive ends at that hash and reproduces the summary.
+        Memory and validation then scale with the live chain only.
+        
+        Args:
+            height: Last block index to prune (default: the current tip)
+            archive_dir: Archive directory (default: ``self.archive_dir``)
+            
+        Returns:
+            The state block
+        """
+        if self.read_only:
+            raise ValueError("Ledger is open read-only")
+        
+        self.flush()
+        # Block creation and audits must not see the chain mid-prune
+        with self._write_lock:
+            return self._prune(height, archive_dir)
+    
+    def _prune(self, height: Optional[int], archive_dir: Optional[Path]) -> Block:
+        """Prune with ``_write_lock`` held (see ``prune``)."""
+        base = self.chain.base
+        tip = self.get_latest_block().index
+        height = tip if height is None else height
+        if not base <= height <= tip:
+            raise ValueError(f"Prune height {height} outside the live chain ({base}-{tip})")
+        if height == base and is_state_block(self.chain[0]):
+            return self.chain[0]
+        
+        # Never summarize (and so launder) a tampered prefix
+        if not self.is_valid():
+            raise ValueError("Cannot prune an invalid chain")
+        
+        if archive_dir is not None:
+            self.archive_dir = Path(archive_dir)
+        if self.archive_dir is None:
+            raise ValueError("archive_dir is required for a ledger without storage path")
+        
+        prefix = self.chain[:height - base + 1]
+        pruned = prefix[-1]
+        archive_path = self.archive_dir / f"blocks_{base:010d}_{height:010d}.jsonl.gz"
+        write_archive(prefix, archive_path)
+        
+        state = Block(
+            index=height,
+            timestamp=datetime.now().isoformat(),
+            data={
+                "type": STATE_BLOCK,
+                "height": height,
+                "pruned_hash": pruned.hash,
+                "archive": archive_path.name,
+                **summarize_blocks(prefix)
+            },
+            previous_hash=pruned.previous_hash
+        )
+        self.chain.prune(state)
+        
+        # Anchors of the pruned prefix no longer apply; the live chain was just verified
+        self.anchors.clear()
+        self.anchors.add(tip, self.get_latest_block().hash)
+        
+        logger.info(f"Pruned ledger up to block #{height} ({len(prefix)} blocks archived)")
+        
+        return state
+    
+    def refresh(self):
+        """Pick up blocks another process appended (read-only ledgers)."""
+        self.chain.refresh()
+    
+    def get_state(self) -> Dict:
+        """
+        Contribution totals and round history of the whole chain.
+        
+        Returns:
+            Dict with "clients" and "rounds" (see ``pruning.summarize_blocks``)
+        """
+        return summarize_blocks(self.chain)
+    
+    def close(self):
+        """Commit buffered and queued blocks, stop background threads and close the storage."""
+        if not self.read_only:
+            for round_number in sorted(self._pending_updates):
+                self.commit_client_updates(round_number)
+        
+        if self._commit_queue is not None:
+            self.flush()
+            self._commit_queue.put(None)
+            self._commit_thread.join()
+            self._commit_queue = None
+            self._commit_thread = None
+        
+        self.stop_background_audit()
+        self.chain.close()
+    
+    @staticmethod
+    def _update_leaf(record: Dict) -> bytes:
+        """Merkle leaf of a client update record."""
+        return bytes.fromhex(hash_dict(record))
     
     def record_fl_round(
         self,
@@ -109,7 +370,7 @@ class BlockchainLedger:
         num_clients: int,
         global_metrics: Dict,
         model_hash: Optional[str] = None
-    ) -> Block:
+    ) -> Union[Block, Future]:
         """
         Record a federated learning round.
         
@@ -120,7 +381,7 @@ class BlockchainLedger:
             model_hash: Hash of global model weights
             
         Returns:
-            New block
+            New block (a future of it with async commits)
         """
         data = {
             "type": "fl_round",
@@ -130,7 +391,9 @@ class BlockchainLedger:
             "model_hash": model_hash
         }
         
-        return self.add_block(data)
+        self.commit_client_updates(round_number)
+        
+        return self._record(data)
     
     def record_client_update(
         self,
@@ -138,10 +401,13 @@ class BlockchainLedger:
         client_id: str,
         data_size: int,
         metrics: Dict
-    ) -> Block:
+    ) -> Union[Block, Future, None]:
         """
         Record a client update.
         
+        In batched mode the update is buffered until the round is
+        committed (``commit_client_updates`` or ``record_fl_round``).
+        
         Args:
             round_number: FL round number
             client_id: Client identifier
@@ -149,8 +415,16 @@ class BlockchainLedger:
             metrics: Client metrics
             
         Returns:
-            New block
+            New block (a future with async commits, None when batched)
         """
+        if self.batch_client_updates:
+            self._pending_updates.setdefault(round_number, []).append({
+                "client_id": client_id,
+                "data_size": data_size,
+                "metrics": metrics
+            })
+            return None
+        
         data = {
             "type": "client_update",
             "round": round_number,
@@ -159,18 +433,149 @@ class BlockchainLedger:
             "metrics": metrics
         }
         
-        return self.add_block(data)
+        return self._record(data)
+    
+    def record_client_updates(self, round_number: int, updates: List[Dict]) -> Union[Block, Future]:
+        """
+        Record all client updates of a round in one block.
+        
+        Updates are sorted by client ID and the block stores them with the
+        Merkle root over their hashes, so a single hospital's contribution
+        can be proven with ``get_inclusion_proof``.
+        
+        Args:
+            round_number: FL round number
+            updates: Records with client_id, data_size and metrics
+            
+        Returns:
+            New block (a future of it with async commits)
+        """
+        records = sorted(updates, key=lambda record: record["client_id"])
+        root = merkle_root([self._update_leaf(record) for record in records])
+        
+        data = {
+            "type": "client_updates",
+            "round": round_number,
+            "num_clients": len(records),
+            "merkle_root": root.hex(),
+            "updates": records
+        }
+        
+        return self._record(data)
     
-    def is_valid(self) -> bool:
+    def commit_client_updates(self, round_number: int) -> Union[Block, Future, None]:
+        """
+        Commit a round's buffered client updates (batched mode).
+        
+        Args:
+            round_number: FL round number
+            
+        Returns:
+            New block (or its future), or None if nothing was buffered
+        """
+        updates = self._pending_updates.pop(round_number, None)
+        if not updates:
+            return None
+        return self.record_client_updates(round_number, updates)
+    
+    def get_inclusion_proof(self, round_number: int, client_id: str) -> Dict:
+        """
+        Merkle inclusion proof of a client's update in a batched round.
+        
+        Args:
+            round_number: FL round number
+            client_id: Client identifier
+            
+        Returns:
+            Dict with the update record, its leaf hash, the O(log n) sibling
+            path, the Merkle root and the containing block
+        """
+        matches = self.chain.query(
+            block_type="client_updates", round_number=round_number, client_id=client_id
+        )
+        if not matches:
+            raise ValueError(f"Client {client_id} has no batched update in round {round_number}")
+        block = matches[-1]
+        
+        records = block.data["updates"]
+        positions = [i for i, record in enumerate(records) if record["client_id"] == client_id]
+        if not positions:
+            raise ValueError(f"Client {client_id} has no update in round {round_number}")
+        
+        leaves = [self._update_leaf(record) for record in records]
+        return {
+            "round": round_number,
+            "client_id": client_id,
+            "record": records[positions[0]],
+            "leaf": leaves[positions[0]].hex(),
+            "proof": merkle_proof(leaves, positions[0]),
+            "merkle_root": block.data["merkle_root"],
+            "block_index": block.index,
+            "block_hash": block.hash
+        }
+    
+    @staticmethod
+    def verify_inclusion_proof(proof: Dict) -> bool:
+        """
+        Check an inclusion proof (record hash, sibling path and root).
+        
+        Args:
+            proof: Output of ``get_inclusion_proof``
+            
+        Returns:
+            True if the record is included under the proof's Merkle root
+        """
+        leaf = BlockchainLedger._update_leaf(proof["record"])
+        if leaf.hex() != proof["leaf"]:
+            return False
+        return verify_merkle_proof(leaf, proof["proof"], bytes.fromhex(proof["merkle_root"]))
+    
+    def is_valid(self, full: bool = False) -> bool:
         """
         Validate the blockchain.
         
+        By default only blocks after the latest signed anchor are
+        re-hashed, after checking the anchored block still has the
+        anchored hash; a successful run anchors the current tip. The
+        prefix is covered by ``audit`` (e.g. in the background). A pruned
+        chain is validated from its state block.
+        
+        Args:
+            full: Re-hash every block from genesis (or the state block)
+            
         Returns:
             True if blockchain is valid
         """
-        for i in range(1, len(self.chain)):
-            current_block = self.chain[i]
-            previous_block = self.chain[i - 1]
+        # A prune between reading the bounds and the blocks would move them
+        with self._write_lock:
+            return self._is_valid(full)
+    
+    def _is_valid(self, full: bool) -> bool:
+        """Validate with ``_write_lock`` held (see ``is_valid``)."""
+        base = self.chain.base
+        end = len(self.chain)
+        tip = base + end - 1
+        start = 1
+        
+        anchor = None if full else self.anchors.latest(max_index=tip)
+        # Anchors at or below a pruning height refer to archived blocks
+        if anchor is not None and base and anchor["index"] <= base:
+            anchor = None
+        if anchor is not None:
+            if self.chain[anchor["index"] - base].hash != anchor["hash"]:
+                logger.error(f"Block {anchor['index']} does not match its verification anchor")
+                return False
+            start = anchor["index"] - base + 1
+        elif end and is_state_block(self.chain[0]):
+            state = self.chain[0]
+            if state.hash != state.calculate_hash():
+                logger.error(f"Invalid hash at state block {state.index}")
+                return False
+        
+        # Stream the range so a database-backed chain is read in batches
+        previous_block = self.chain[start - 1] if start < end else None
+        for current_block in self.chain.iter_range(start, end):
+            i = current_block.index
             
             # Check hash
             if current_block.hash != current_block.calculate_hash():
@@ -178,43 +583,176 @@ class BlockchainLedger:
                 return False
             
             # Check previous hash
-            if current_block.previous_hash != previous_block.hash:
+            if current_block.previous_hash != link_hash(previous_block):
                 logger.error(f"Invalid previous hash at block {i}")
                 return False
+            
+            previous_block = current_block
+        
+        if anchor is None or anchor["index"] < tip:
+            self.anchors.add(tip, self.chain[end - 1].hash)
         
         return True
     
+    def verify_archives(self) -> bool:
+        """
+        Check the archives behind a pruned chain.
+        
+        The state block's archive must end at the pruned block and
+        reproduce its summary (see ``pruning.verify_archive``). If the
+        archive itself starts from an earlier state block, that block's
+        archive is checked in turn, back to genesis.
+        
+        Returns:
+            True if every archive matches (or the chain was never pruned)
+        """
+        with self._write_lock:
+            state = self.chain[0] if len(self.chain) else None
+        
+        while state is not None and is_state_block(state):
+            path = self.archive_dir / state.data["archive"] if self.archive_dir else None
+            if path is None or not path.exists():
+                logger.error(f"Archive of state block {state.index} not found")
+                return False
+            if not verify_archive(path, state):
+                return False
+            state = next(iter_archive(path))
+        
+        return True
+    
+    def audit(self) -> bool:
+        """
+        Full audit: re-hash and re-link the whole chain and its archives.
+        
+        Returns:
+            True if blockchain is valid (also stored in ``last_audit``)
+        """
+        started = time.time()
+        valid = self.is_valid(full=True) and self.verify_archives()
+        self.last_audit = {
+            "valid": valid,
+            "blocks": len(self.chain),
+            "finished_at": datetime.now().isoformat(),
+            "seconds": time.time() - started
+        }
+        
+        if not valid:
+            logger.error("Full ledger audit failed")
+        
+        return valid
+    
+    def start_background_audit(self, interval_seconds: float = 3600.0):
+        """
+        Run ``audit`` periodically in a daemon thread.
+        
+        Args:
+            interval_seconds: Seconds between audits
+        """
+        if self._audit_thread is not None:
+            return
+        
+        self._audit_stop = threading.Event()
+        
+        def run():
+            while not self._audit_stop.is_set():
+                try:
+                    self.audit()
+                except Exception as e:
+                    # Record the failure and keep auditing
+                    logger.exception("Ledger audit raised an error")
+                    self.last_audit = {
+                        "valid": False,
+                        "error": str(e),
+                        "finished_at": datetime.now().isoformat()
+                    }
+                self._audit_stop.wait(interval_seconds)
+        
+        self._audit_thread = threading.Thread(target=run, name="ledger-audit", daemon=True)
+        self._audit_thread.start()
+        logger.info(f"Started background ledger audit (every {interval_seconds:.0f}s)")
+    
+    def stop_background_audit(self):
+        """Stop the background audit thread."""
+        if self._audit_thread is None:
+            return
+        
+        self._audit_stop.set()
+        self._audit_thread.join()
+        self._audit_thread = None
+    
     def get_chain(self) -> List[Dict]:
         """Get the entire chain as list of dicts."""
         return [block.to_dict() for block in self.chain]
     
     def get_fl_rounds(self) -> List[Dict]:
         """Get all FL round records."""
-        return [
-            block.to_dict()
-            for block in self.chain
-            if block.data.get("type") == "fl_round"
-        ]
+        return self.get_blocks(block_type="fl_round")
+    
+    def get_blocks(
+        self,
+        block_type: Optional[str] = None,
+        round_number: Optional[int] = None,
+        client_id: Optional[str] = None,
+        offset: int = 0,
+        limit: Optional[int] = None
+    ) -> List[Dict]:
+        """
+        Query blocks through the index, in chain order.
+        
+        Queries go through the storage's indexes and only the returned
+        page of blocks is read, so a query costs the size of its result
+        rather than the length of the chain.
+        
+        Args:
+            block_type: Block type (e.g. "fl_round", "client_updates")
+            round_number: FL round number
+            client_id: Client identifier (also matches batched updates)
+            offset: Matching blocks to skip
+            limit: Maximum number of blocks (all if None)
+            
+        Returns:
+            Matching blocks as dicts
+        """
+        if offset < 0 or (limit is not None and limit < 0):
+            raise ValueError("offset and limit must be non-negative")
+        
+        blocks = self.chain.query(block_type, round_number, client_id, offset=offset, limit=limit)
+        return [block.to_dict() for block in blocks]
+    
+    def count_blocks(self) -> Dict[str, int]:
+        """Number of blocks in total and of every type."""
+        return {"total": len(self.chain), **self.chain.counts()}
     
     def save_to_file(self, filepath: str):
         """Save blockchain to JSON file."""
+        self.flush()
         with open(filepath, 'w') as f:
             json.dump(self.get_chain(), f, indent=2)
         logger.info(f"Saved blockchain to {filepath}")
     
-    def load_from_file(self, filepath: str):
-        """Load blockchain from JSON file."""
-        with open(filepath, 'r') as f:
-            chain_data = json.load(f)
-        
-        self.chain = []
-        for block_data in chain_data:
-            block = Block(
-                index=block_data["index"],
-                timestamp=block_data["timestamp"],
-                data=block_data["data"],
-                previous_hash=block_data["previous_hash"]
-            )
-            self.chain.append(block)
+    @staticmethod
+    def _load_blocks(blocks: Iterator[Dict], verify: bool) -> List[Block]:
+        """Build blocks from dicts, checking links as well when verifying."""
+        chain: List[Block] = []
+        for block_data in blocks:
+            block = Block.from_dict(block_data, verify=verify)
+            if verify and chain and block.previous_hash != link_hash(chain[-1]):
+                raise ValueError(f"Invalid previous hash at block {block.index}")
+            chain.append(block)
+        return chain
+    
+    def load_from_file(self, filepath: str, verify: bool = False):
+        """
+        Load blockchain from JSON file.
+        
+        The file is streamed block by block and stored hashes are trusted,
+        so loading does not re-serialize and re-hash the chain.
+        
+        Args:
+            filepath: JSON file written by ``save_to_file``
+            verify: Re-hash every block and check the links while loading
+        """
+        self.chain.replace(self._load_blocks(iter_json_array(filepath), verify))
+        self.anchors.clear()  # anchors of the previous chain do not apply
         
         logger.info(f"Loaded blockchain from {filepath} ({len(self.chain)} blocks)")
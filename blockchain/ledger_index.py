@@ -0,0 +1,136 @@
+"""Secondary indexes of ledger blocks by type, round and client."""
+
+import os
+import json
+from bisect import bisect_left
+from pathlib import Path
+from typing import Dict, List, Optional
+from config.logging_config import get_logger
+
+logger = get_logger(__name__)
+
+
+def _contains(sorted_indices: List[int], value: int) -> bool:
+    pos = bisect_left(sorted_indices, value)
+    return pos < len(sorted_indices) and sorted_indices[pos] == value
+
+
+class LedgerIndex:
+    """
+    Block indices keyed by block type, round number and client ID.
+
+    Blocks are added in chain order, so every posting list is sorted and
+    a query walks its shortest list and checks the others by bisection.
+    Batched ``client_updates`` blocks are indexed under every client they
+    contain. The index can be saved next to the block log together with
+    the height it covers, so a resumed ledger only indexes newer blocks.
+    """
+
+    def __init__(self):
+        """Initialize empty indexes."""
+        self.by_type: Dict[str, List[int]] = {}
+        self.by_round: Dict[int, List[int]] = {}
+        self.by_client: Dict[str, List[int]] = {}
+        self.height = -1  # highest indexed block
+        self.tip_hash: Optional[str] = None
+
+    def add(self, index: int, data: Dict, block_hash: Optional[str] = None):
+        """
+        Index one block.
+
+        Args:
+            index: Block index (must be above ``height``)
+            data: Block data
+            block_hash: Block hash (identifies the chain a saved index belongs to)
+        """
+        if index <= self.height:
+            return
+        self.height = index
+        self.tip_hash = block_hash
+
+        if not isinstance(data, dict):
+            return
+
+        block_type = data.get("type")
+        if block_type is not None:
+            self.by_type.setdefault(block_type, []).append(index)
+
+        round_number = data.get("round")
+        if round_number is not None:
+            self.by_round.setdefault(round_number, []).append(index)
+
+        client_ids = {data["client_id"]} if "client_id" in data else set()
+        client_ids.update(record["client_id"] for record in data.get("updates", ()))
+        for client_id in client_ids:
+            self.by_client.setdefault(client_id, []).append(index)
+
+    def query(
+        self,
+        block_type: Optional[str] = None,
+        round_number: Optional[int] = None,
+        client_id: Optional[str] = None
+    ) -> Optional[List[int]]:
+        """
+        Indices of blocks matching every given filter, in chain order.
+
+        Args:
+            block_type: Block type
+            round_number: FL round number
+            client_id: Client identifier
+
+        Returns:
+            Matching indices (None when no filter is given)
+        """
+        postings = []
+        if block_type is not None:
+            postings.append(self.by_type.get(block_type, []))
+        if round_number is not None:
+            postings.append(self.by_round.get(round_number, []))
+        if client_id is not None:
+            postings.append(self.by_client.get(client_id, []))
+
+        if not postings:
+            return None
+
+        postings.sort(key=len)
+        shortest, others = postings[0], postings[1:]
+        return [i for i in shortest if all(_contains(other, i) for other in others)]
+
+    def counts(self) -> Dict[str, int]:
+        """Number of blocks of every type."""
+        return {block_type: len(indices) for block_type, indices in self.by_type.items()}
+
+    def save(self, path: Path):
+        """Write the index atomically."""
+        tmp_path = Path(str(path) + ".tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({
+                "height": self.height,
+                "tip_hash": self.tip_hash,
+                "by_type": self.by_type,
+                "by_round": {str(k): v for k, v in self.by_round.items()},
+                "by_client": self.by_client
+            }, f, separators=(",", ":"))
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path: Path) -> Optional["LedgerIndex"]:
+        """
+        Load a saved index.
+
+        Returns:
+            Index, or None if the file is missing or unreadable
+        """
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                state = json.load(f)
+        except (OSError, ValueError):
+            return None
+
+        index = cls()
+        index.height = state["height"]
+        index.tip_hash = state.get("tip_hash")
+        index.by_type = state["by_type"]
+        index.by_round = {int(k): v for k, v in state["by_round"].items()}
+        index.by_client = state["by_client"]
+        return index
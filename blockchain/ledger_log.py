@@ -0,0 +1,300 @@
+"""Append-only on-disk log for ledger blocks."""
+
+import os
+import json
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+from config.logging_config import get_logger
+
+logger = get_logger(__name__)
+
+# fsync after every block, every ``fsync_every`` blocks, or never (OS decides)
+FSYNC_POLICIES = ("always", "batch", "never")
+
+
+def _dump_line(block: Dict) -> str:
+    """Compact single-line JSON for one block."""
+    return json.dumps(block, separators=(",", ":")) + "\n"
+
+
+def iter_json_array(path: Path, chunk_size: int = 1 << 20) -> Iterator[Dict]:
+    """
+    Stream the elements of a top-level JSON array file.
+
+    Elements are decoded one at a time from a chunked read buffer, so a
+    large ledger export is never held in memory as a whole.
+
+    Args:
+        path: JSON file containing an array
+        chunk_size: Characters read at a time
+
+    Yields:
+        Array elements
+    """
+    decoder = json.JSONDecoder()
+    with open(path, "r", encoding="utf-8") as f:
+        buffer = f.read(chunk_size).lstrip()
+        if not buffer.startswith("["):
+            raise ValueError(f"{path} does not contain a JSON array")
+        pos = 1
+        eof = False
+
+        while True:
+            # Skip separators, refilling the buffer as needed
+            while True:
+                while pos < len(buffer) and buffer[pos] in " \t\r\n,":
+                    pos += 1
+                if pos < len(buffer) or eof:
+                    break
+                buffer, pos = f.read(chunk_size), 0
+                eof = not buffer
+
+            if pos >= len(buffer):
+                raise ValueError(f"Unterminated JSON array in {path}")
+            if buffer[pos] == "]":
+                return
+
+            try:
+                element, end = decoder.raw_decode(buffer, pos)
+                complete = end < len(buffer) or eof  # a number could continue in the next chunk
+            except json.JSONDecodeError:
+                if eof:
+                    raise
+                complete = False
+
+            if not complete:
+                more = f.read(chunk_size)
+                eof = not more
+                buffer, pos = buffer[pos:] + more, 0
+                continue
+
+            yield element
+            pos = end
+
+
+class LedgerLog:
+    """
+    Append-only JSON-lines block log with compact snapshots.
+
+    Every block is one line appended to ``path``, so saving a block costs
+    one write regardless of chain length. ``write_snapshot`` rewrites the
+    chain into ``<path>.snapshot`` and starts an empty log; loading reads
+    the snapshot and then the log. A torn last line (crash mid-append) is
+    dropped on open. A reader can follow a log another process appends to
+    with ``tail_lines`` and ``rewritten``.
+    """
+
+    def __init__(
+        self,
+        path: Path,
+        fsync: str = "batch",
+        fsync_every: int = 100,
+        read_only: bool = False
+    ):
+        """
+        Open (or create) a ledger log.
+
+        Args:
+            path: Log file path
+            fsync: "always", "batch" (every ``fsync_every`` blocks) or "never"
+            fsync_every: Blocks between fsyncs for the "batch" policy
+            read_only: Only read (e.g. while another process appends)
+        """
+        if fsync not in FSYNC_POLICIES:
+            raise ValueError(f"Unknown fsync policy: {fsync} (expected one of {FSYNC_POLICIES})")
+
+        self.path = Path(path)
+        self.snapshot_path = self.path.with_name(self.path.name + ".snapshot")
+        self.fsync = fsync
+        self.fsync_every = max(1, fsync_every)
+        self._unsynced = 0
+        self.read_only = read_only
+        self._file = None
+
+        # Reader position: log bytes consumed and the files it was read from
+        self.log_offset = 0
+        self._read_ids: Optional[Tuple] = None
+
+        if not read_only:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            self._repair_tail()
+            self._file = open(self.path, "a", encoding="utf-8")
+
+    def _repair_tail(self):
+        """Truncate a partially written last line left by a crash."""
+        if not self.path.exists() or self.path.stat().st_size == 0:
+            return
+
+        with open(self.path, "rb+") as f:
+            f.seek(-1, os.SEEK_END)
+            if f.read(1) == b"\n":
+                return
+
+            f.seek(0)
+            data = f.read()
+            keep = data.rfind(b"\n") + 1
+            f.truncate(keep)
+            logger.warning(f"Dropped incomplete last block in {self.path} ({len(data) - keep} bytes)")
+
+    def append(self, block: Dict):
+        """
+        Append one block.
+
+        Args:
+            block: Block dict
+        """
+        self.append_many([block])
+
+    def append_many(self, blocks: Iterable[Dict]):
+        """
+        Append blocks with one write (and at most one fsync).
+
+        Args:
+            blocks: Block dicts, in chain order
+        """
+        if self.read_only:
+            raise ValueError(f"Ledger log {self.path} is open read-only")
+        lines = [_dump_line(block) for block in blocks]
+        self._file.write("".join(lines))
+        self._file.flush()
+
+        self._unsynced += len(lines)
+        if self.fsync == "always" or (self.fsync == "batch" and self._unsynced >= self.fsync_every):
+            self.sync()
+
+    def sync(self):
+        """Flush and fsync appended blocks."""
+        self._file.flush()
+        if self._unsynced:
+            os.fsync(self._file.fileno())
+            self._unsynced = 0
+
+    def _read_lines(self, path: Path, offset: int = 0) -> Iterator[Tuple[str, int]]:
+        """Complete lines from byte ``offset``, each with the offset after it."""
+        if not path.exists():
+            return
+        with open(path, "rb") as f:
+            f.seek(offset)
+            for raw in f:
+                # A line without newline is still being written by another process
+                if not raw.endswith(b"\n"):
+                    return
+                offset += len(raw)
+                if raw.strip():
+                    yield raw.decode("utf-8"), offset
+
+    def _file_ids(self) -> Tuple:
+        """Identity of the snapshot and log files (both are replaced, never rewritten in place)."""
+        def file_id(path: Path):
+            try:
+                stat = path.stat()
+            except FileNotFoundError:
+                return None
+            return stat.st_ino, stat.st_size, stat.st_mtime_ns
+
+        snapshot_id = file_id(self.snapshot_path)
+        log_id = file_id(self.path)
+        return snapshot_id, log_id[0] if log_id else None
+
+    def iter_lines(self) -> Iterator[str]:
+        """
+        Stream the raw JSON line of every block (snapshot, then log).
+
+        Lines are not decoded, except the last snapshot line and the
+        first log lines needed to skip blocks already in the snapshot.
+
+        Yields:
+            One JSON line per block, in chain order
+        """
+        self._read_ids = self._file_ids()
+        self.log_offset = 0
+
+        last_line = None
+        for line, _ in self._read_lines(self.snapshot_path):
+            last_line = line
+            yield line
+        last_index = json.loads(last_line)["index"] if last_line is not None else -1
+
+        # A crash between snapshot and log reset leaves already-snapshotted blocks in the log
+        skipping = last_line is not None
+        for line, end in self._read_lines(self.path):
+            self.log_offset = end
+            if skipping:
+                if json.loads(line)["index"] <= last_index:
+                    continue
+                skipping = False
+            yield line
+
+    def rewritten(self) -> bool:
+        """
+        Whether a snapshot replaced the files since the last ``iter_lines``.
+
+        Returns:
+            True if the chain must be re-read with ``iter_lines``
+        """
+        if self._read_ids != self._file_ids():
+            return True
+        return self.path.exists() and self.path.stat().st_size < self.log_offset
+
+    def tail_lines(self) -> Iterator[str]:
+        """
+        Stream log lines appended since the last ``iter_lines``/``tail_lines``.
+
+        Only valid while ``rewritten`` is False.
+
+        Yields:
+            One JSON line per new block, in chain order
+        """
+        for line, end in self._read_lines(self.path, self.log_offset):
+            self.log_offset = end
+            yield line
+
+    def iter_blocks(self) -> Iterator[Dict]:
+        """
+        Stream all blocks (snapshot, then log) without loading the files.
+
+        Yields:
+            Block dicts in chain order
+        """
+        for line in self.iter_lines():
+            yield json.loads(line)
+
+    def read(self) -> List[Dict]:
+        """
+        Read all blocks (snapshot, then log).
+
+        Returns:
+            Block dicts in chain order
+        """
+        return list(self.iter_blocks())
+
+    def write_snapshot(self, blocks: Iterable[Dict]):
+        """
+        Write a compact snapshot of the chain and start an empty log.
+
+        Args:
+            blocks: All block dicts, in chain order
+        """
+        tmp_path = self.snapshot_path.with_name(self.snapshot_path.name + ".tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            for block in blocks:
+                f.write(_dump_line(block))
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self.snapshot_path)
+
+        # Start a new log file (not truncated in place), so readers
+        # tailing the old one notice the switch
+        self._file.close()
+        tmp_log = self.path.with_name(self.path.name + ".tmp")
+        open(tmp_log, "w", encoding="utf-8").close()
+        os.replace(tmp_log, self.path)
+        self._file = open(self.path, "a", encoding="utf-8")
+        self._unsynced = 0
+        logger.info(f"Wrote ledger snapshot {self.snapshot_path}")
+
+    def close(self):
+        """Sync and close the log."""
+        if self._file is not None and not self._file.closed:
+            self.sync()
+            self._file.close()
@@ -0,0 +1,169 @@
+"""State summaries and cold archives for pruned ledger prefixes."""
+
+import os
+import gzip
+import json
+from pathlib import Path
+from typing import Dict, Iterable, Iterator
+from config.logging_config import get_logger
+from .block import Block
+
+logger = get_logger(__name__)
+
+STATE_BLOCK = "state"
+
+
+def is_state_block(block: Block) -> bool:
+    """Whether a block is a state block written by pruning."""
+    return isinstance(block.data, dict) and block.data.get("type") == STATE_BLOCK
+
+
+def link_hash(block: Block) -> str:
+    """
+    Hash the next block must reference as ``previous_hash``.
+
+    A state block stands in for the pruned block at its height, so its
+    successor still links to the pruned block's hash.
+    """
+    if is_state_block(block):
+        return block.data["pruned_hash"]
+    return block.hash
+
+
+def summarize_blocks(blocks: Iterable[Block]) -> Dict:
+    """
+    Per-client contribution totals and round history of a chain segment.
+
+    A state block in the segment seeds the totals with its summary, so
+    summarizing a live chain that starts from a state block covers the
+    whole history.
+
+    Args:
+        blocks: Blocks in chain order
+
+    Returns:
+        Dict with "clients" (updates, data_size, last_round per client)
+        and "rounds" (one entry per recorded FL round)
+    """
+    clients: Dict[str, Dict] = {}
+    rounds = []
+
+    def add_update(round_number, record):
+        totals = clients.setdefault(record["client_id"], {"updates": 0, "data_size": 0, "last_round": None})
+        totals["updates"] += 1
+        totals["data_size"] += record.get("data_size") or 0
+        totals["last_round"] = round_number
+
+    for block in blocks:
+        data = block.data if isinstance(block.data, dict) else {}
+        block_type = data.get("type")
+
+        if block_type == STATE_BLOCK:
+            clients = {client_id: dict(totals) for client_id, totals in data["clients"].items()}
+            rounds = list(data["rounds"])
+        elif block_type == "client_update":
+            add_update(data.get("round"), data)
+        elif block_type == "client_updates":
+            for record in data["updates"]:
+                add_update(data.get("round"), record)
+        elif block_type == "fl_round":
+            rounds.append({
+                "round": data.get("round"),
+                "num_clients": data.get("num_clients"),
+                "model_hash": data.get("model_hash"),
+                "metrics": data.get("metrics"),
+                "block_index": block.index
+            })
+
+    return {"clients": clients, "rounds": rounds}
+
+
+def write_archive(blocks: Iterable[Block], path: Path) -> int:
+    """
+    Write blocks to a gzip-compressed JSON-lines archive (atomically).
+
+    Args:
+        blocks: Blocks in chain order
+        path: Archive file
+
+    Returns:
+        Number of archived blocks
+    """
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_name(path.name + ".tmp")
+
+    count = 0
+    with gzip.open(tmp_path, "wt", encoding="utf-8") as f:
+        for block in blocks:
+            f.write(json.dumps(block.to_dict(), separators=(",", ":")) + "\n")
+            count += 1
+    os.replace(tmp_path, path)
+
+    logger.info(f"Archived {count} blocks to {path}")
+    return count
+
+
+def iter_archive(path: Path) -> Iterator[Block]:
+    """
+    Stream the blocks of an archive.
+
+    Args:
+        path: Archive written by ``write_archive``
+
+    Yields:
+        Blocks in chain order
+    """
+    with gzip.open(path, "rt", encoding="utf-8") as f:
+        for line in f:
+            if line.strip():
+                yield Block.from_dict(json.loads(line))
+
+
+def verify_archive(path: Path, state: Block) -> bool:
+    """
+    Check an archive is the intact prefix a state block was pruned from.
+
+    Every archived block is re-hashed and re-linked, the last one must
+    have the state block's ``pruned_hash``, and summarizing the archive
+    must reproduce the state block's summary. The live chain links to
+    ``pruned_hash``, so this binds the summary to the chain.
+
+    Args:
+        path: Archive file
+        state: State block written when the archive was pruned
+
+    Returns:
+        True if the archive matches
+    """
+    checked = {"ok": True, "last": None}
+
+    def checked_blocks():
+        previous = None
+        for block in iter_archive(path):
+            if block.hash != block.calculate_hash():
+                logger.error(f"Invalid hash at archived block {block.index}")
+                checked["ok"] = False
+                return
+            if previous is not None and block.previous_hash != link_hash(previous):
+                logger.error(f"Invalid previous hash at archived block {block.index}")
+                checked["ok"] = False
+                return
+            previous = block
+            yield block
+        checked["last"] = previous
+
+    summary = summarize_blocks(checked_blocks())
+    if not checked["ok"]:
+        return False
+
+    last = checked["last"]
+    if last is None or last.hash != state.data["pruned_hash"]:
+        logger.error(f"Archive {path} does not end at the pruned block")
+        return False
+
+    if summary != {"clients": state.data["clients"], "rounds": state.data["rounds"]}:
+        logger.error(f"State block {state.index} does not match the summary of {path}")
+        return False
+
+    return True
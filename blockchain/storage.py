@@ -0,0 +1,568 @@
+"""Pluggable storage backends for ledger blocks."""
+
+import abc
+import json
+import sqlite3
+import threading
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Optional, Union
+from config.logging_config import get_logger
+from .block import Block, LazyBlock
+from .ledger_index import LedgerIndex
+from .ledger_log import LedgerLog
+
+logger = get_logger(__name__)
+
+STORAGE_BACKENDS = ("memory", "sqlite")
+
+
+class BlockStore(abc.ABC):
+    """
+    Storage backend interface of ``BlockchainLedger``.
+
+    A store behaves like the chain list: ``len``, iteration and indexing
+    by chain position (negative indices and slices included), plus
+    ``append`` and indexed ``query``. Positions start at ``base``, the
+    index of the first live block (non-zero after pruning). ``path`` is
+    the backing file (None if not persisted); ledger sidecar files are
+    kept next to it.
+    """
+
+    path: Optional[Path] = None
+    read_only: bool = False
+
+    @abc.abstractmethod
+    def __len__(self) -> int:
+        """Number of live blocks."""
+
+    @property
+    @abc.abstractmethod
+    def base(self) -> int:
+        """Block index of the first live block."""
+
+    @abc.abstractmethod
+    def _get(self, index: int) -> Block:
+        """Block at a non-negative chain position."""
+
+    @abc.abstractmethod
+    def iter_range(self, start: int, stop: int) -> Iterator[Block]:
+        """
+        Stream blocks ``start`` to ``stop - 1``.
+
+        Args:
+            start: First chain position
+            stop: Position after the last block
+
+        Yields:
+            Blocks in chain order
+        """
+
+    def append(self, block: Block):
+        """Store a new block at the tip."""
+        self.extend([block])
+
+    @abc.abstractmethod
+    def extend(self, blocks: List[Block]):
+        """Store consecutive new blocks at the tip in one write."""
+
+    @abc.abstractmethod
+    def query(
+        self,
+        block_type: Optional[str] = None,
+        round_number: Optional[int] = None,
+        client_id: Optional[str] = None,
+        offset: int = 0,
+        limit: Optional[int] = None
+    ) -> List[Block]:
+        """
+        Blocks matching every given filter, in chain order.
+
+        Args:
+            block_type: Block type
+            round_number: FL round number
+            client_id: Client identifier (also matches batched updates)
+            offset: Matching blocks to skip
+            limit: Maximum number of blocks (all if None)
+
+        Returns:
+            Matching blocks
+        """
+
+    @abc.abstractmethod
+    def counts(self) -> Dict[str, int]:
+        """Number of blocks of every type."""
+
+    @abc.abstractmethod
+    def replace(self, blocks: Iterable[Block]):
+        """Replace the stored chain (e.g. with a loaded export)."""
+
+    @abc.abstractmethod
+    def prune(self, state: Block):
+        """
+        Drop the blocks up to ``state.index`` and start the chain from ``state``.
+
+        Args:
+            state: State block standing in for the block at its index
+        """
+
+    def refresh(self):
+        """Pick up blocks appended by another process (read-only stores)."""
+
+    def snapshot(self):
+        """Compact the backing file(s)."""
+
+    def close(self):
+        """Flush and release the backing file(s)."""
+
+    def __iter__(self) -> Iterator[Block]:
+        return self.iter_range(0, len(self))
+
+    def __getitem__(self, key: Union[int, slice]):
+        length = len(self)
+        if isinstance(key, slice):
+            positions = range(length)[key]
+            if positions.step != 1:
+                return [self._get(i) for i in positions]
+            return list(self.iter_range(positions.start, positions.stop))
+
+        index = key + length if key < 0 else key
+        if not 0 <= index < length:
+            raise IndexError(f"Block index {key} out of range (chain has {length} blocks)")
+        return self._get(index)
+
+    def _check_writable(self):
+        if self.read_only:
+            raise ValueError(f"Block store {self.path} is open read-only")
+
+
+class MemoryBlockStore(BlockStore):
+    """
+    Chain held in a Python list, optionally persisted to a block log.
+
+    Blocks resumed from the log stay undecoded (``LazyBlock``) until
+    accessed, and queries go through a ``LedgerIndex`` saved next to the
+    log, so resuming only decodes blocks appended after the saved index.
+    """
+
+    def __init__(
+        self,
+        log_path: Optional[Path] = None,
+        fsync: str = "batch",
+        fsync_every: int = 100,
+        snapshot_every: Optional[int] = None,
+        read_only: bool = False
+    ):
+        """
+        Initialize memory store.
+
+        Args:
+            log_path: Append-only block log; an existing log is resumed
+            fsync: Log fsync policy ("always", "batch" or "never")
+            fsync_every: Blocks between fsyncs for the "batch" policy
+            snapshot_every: Write a compact snapshot every N appended blocks
+            read_only: Only read the log (e.g. while another process appends)
+        """
+        self.read_only = read_only
+        self.snapshot_every = snapshot_every
+        self._since_snapshot = 0
+        self._log = (
+            LedgerLog(log_path, fsync=fsync, fsync_every=fsync_every, read_only=read_only)
+            if log_path else None
+        )
+        self.path = self._log.path if self._log else None
+        self._index_path = self.path.with_name(self.path.name + ".index") if self.path else None
+
+        self._load()
+
+    def _load(self):
+        """Read the chain from the log and resume its index."""
+        self.blocks: List[Block] = []
+        if self._log is not None:
+            self.blocks = [LazyBlock(line) for line in self._log.iter_lines()]
+
+        self.index = LedgerIndex()
+        if self.blocks:
+            self._resume_index()
+
+    def refresh(self):
+        """
+        Pick up blocks another process appended to the log (read-only stores).
+
+        Only the new log lines are read and indexed; the chain is re-read
+        when the writer has replaced the files with a snapshot.
+        """
+        if self._log is None or not self.read_only:
+            return
+        if self._log.rewritten():
+            self._load()
+            return
+
+        start = len(self.blocks)
+        self.blocks.extend(LazyBlock(line) for line in self._log.tail_lines())
+        self._index_blocks(start)
+
+    def _index_blocks(self, start: int):
+        """Index the blocks from position ``start`` to the tip."""
+        for block in self.blocks[max(start, 0):]:
+            self.index.add(block.index, block.data, block.hash)
+
+    def _resume_index(self):
+        """
+        Load the saved index and index only blocks appended after it.
+
+        A saved index is used only if the block at its height still has
+        the hash it was saved with; otherwise the chain is re-indexed.
+        """
+        saved = LedgerIndex.load(self._index_path)
+        position = saved.height - self.base if saved is not None else -1
+        if (
+            saved is not None
+            and 0 <= position < len(self.blocks)
+            and self.blocks[position].hash == saved.tip_hash
+        ):
+            self.index = saved
+        elif saved is not None:
+            logger.warning(f"Ledger index {self._index_path} does not match the chain; rebuilding")
+
+        self._index_blocks(self.index.height + 1 - self.base)
+
+    def save_index(self):
+        """Write the block index next to the block log."""
+        if self._index_path is not None and not self.read_only:
+            self.index.save(self._index_path)
+
+    def __len__(self) -> int:
+        return len(self.blocks)
+
+    @property
+    def base(self) -> int:
+        return self.blocks[0].index if self.blocks else 0
+
+    def __iter__(self) -> Iterator[Block]:
+        return iter(self.blocks)
+
+    def __getitem__(self, key: Union[int, slice]):
+        return self.blocks[key]
+
+    def _get(self, index: int) -> Block:
+        return self.blocks[index]
+
+    def iter_range(self, start: int, stop: int) -> Iterator[Block]:
+        return (self.blocks[i] for i in range(start, min(stop, len(self.blocks))))
+
+    def extend(self, blocks: List[Block]):
+        self._check_writable()
+        for block in blocks:
+            self.blocks.append(block)
+            self.index.add(block.index, block.data, block.hash)
+
+        if self._log is None:
+            return
+
+        # One log line per block (O(1)) and a compact snapshot periodically
+        self._log.append_many(block.to_dict() for block in blocks)
+        self._since_snapshot += len(blocks)
+        if self.snapshot_every and self._since_snapshot >= self.snapshot_every:
+            self.snapshot()
+
+    def query(
+        self,
+        block_type: Optional[str] = None,
+        round_number: Optional[int] = None,
+        client_id: Optional[str] = None,
+        offset: int = 0,
+        limit: Optional[int] = None
+    ) -> List[Block]:
+        end = None if limit is None else offset + limit
+        matches = self.index.query(block_type, round_number, client_id)
+        if matches is None:
+            return self.blocks[offset:end]
+        base = self.base
+        return [self.blocks[i - base] for i in matches[offset:end]]
+
+    def counts(self) -> Dict[str, int]:
+        return self.index.counts()
+
+    def replace(self, blocks: Iterable[Block]):
+        self._check_writable()
+        self.blocks = list(blocks)
+        self.index = LedgerIndex()
+        self._index_blocks(0)
+
+        # Keep the log in step with the chain it now holds
+        if self._log is not None:
+            self.snapshot()
+
+    def prune(self, state: Block):
+        self.replace([state] + self.blocks[state.index - self.base + 1:])
+
+    def snapshot(self):
+        if self._log is None:
+            raise ValueError("Ledger has no block log to snapshot")
+        self._check_writable()
+
+        self._log.write_snapshot(block.to_dict() for block in self.blocks)
+        self._since_snapshot = 0
+        self.save_index()
+
+    def close(self):
+        if self._log is not None:
+            self._log.close()
+            self.save_index()
+
+
+# fsync policy -> SQLite synchronous level (WAL commits are atomic at every level)
+_SYNCHRONOUS = {"always": "FULL", "batch": "NORMAL", "never": "OFF"}
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS blocks (
+    idx INTEGER PRIMARY KEY,
+    timestamp TEXT NOT NULL,
+    previous_hash TEXT NOT NULL,
+    hash TEXT NOT NULL,
+    block_type TEXT,
+    round INTEGER,
+    data TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS blocks_type ON blocks (block_type, idx);
+CREATE INDEX IF NOT EXISTS blocks_round ON blocks (round, idx);
+CREATE TABLE IF NOT EXISTS block_clients (
+    client_id TEXT NOT NULL,
+    idx INTEGER NOT NULL,
+    PRIMARY KEY (client_id, idx)
+) WITHOUT ROWID;
+"""
+
+_COLUMNS = "b.idx, b.timestamp, b.data, b.previous_hash, b.hash"
+
+
+def _row_to_block(row) -> Block:
+    idx, timestamp, data, previous_hash, block_hash = row
+    return Block(idx, timestamp, json.loads(data), previous_hash, hash=block_hash)
+
+
+class SQLiteBlockStore(BlockStore):
+    """
+    Chain stored in an embedded SQLite database.
+
+    Each block is one row keyed by its index, with the block type and
+    round in indexed columns and client IDs (including every client of
+    a batched update) in a side table, so appends are one WAL commit and
+    range reads and queries only touch the rows they return. Several
+    processes can share the file: readers open it read-only and see new
+    blocks as they are committed.
+    """
+
+    def __init__(
+        self,
+        db_path: Optional[Path] = None,
+        fsync: str = "batch",
+        read_only: bool = False
+    ):
+        """
+        Open (or create) a block database.
+
+        Args:
+            db_path: Database file (in-memory database if None)
+            fsync: "always" (FULL), "batch" (NORMAL) or "never" (OFF) sync
+            read_only: Open an existing database for reading only
+        """
+        if fsync not in _SYNCHRONOUS:
+            raise ValueError(f"Unknown fsync policy: {fsync} (expected one of {tuple(_SYNCHRONOUS)})")
+
+        self.path = Path(db_path) if db_path else None
+        self.read_only = read_only
+        # The connection is shared with audit/writer threads
+        self._lock = threading.RLock()
+
+        if self.path is None:
+            self._conn = sqlite3.connect(":memory:", check_same_thread=False)
+        elif read_only:
+            self._conn = sqlite3.connect(f"file:{self.path}?mode=ro", uri=True, check_same_thread=False)
+        else:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            self._conn = sqlite3.connect(str(self.path), check_same_thread=False)
+
+        if not read_only:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(f"PRAGMA synchronous={_SYNCHRONOUS[fsync]}")
+            self._conn.executescript(_SCHEMA)
+            self._conn.commit()
+
+        self._base, self._length = self._bounds()
+
+    def _bounds(self):
+        """(base, length) of the stored chain."""
+        with self._lock:
+            base, tip = self._conn.execute("SELECT MIN(idx), MAX(idx) FROM blocks").fetchone()
+        if tip is None:
+            return 0, 0
+        return base, tip - base + 1
+
+    def __len__(self) -> int:
+        # A reader sees blocks committed by other processes
+        return self._bounds()[1] if self.read_only else self._length
+
+    @property
+    def base(self) -> int:
+        return self._bounds()[0] if self.read_only else self._base
+
+    def _get(self, index: int) -> Block:
+        with self._lock:
+            row = self._conn.execute(
+                f"SELECT {_COLUMNS} FROM blocks b WHERE b.idx = ?", (self.base + index,)
+            ).fetchone()
+        if row is None:
+            raise IndexError(f"Block index {index} out of range")
+        return _row_to_block(row)
+
+    def iter_range(self, start: int, stop: int, batch_size: int = 1000) -> Iterator[Block]:
+        base = self.base
+        start, stop = base + start, base + stop
+
+        # Fetch in batches so the lock is not held while the caller works
+        while start < stop:
+            with self._lock:
+                rows = self._conn.execute(
+                    f"SELECT {_COLUMNS} FROM blocks b WHERE b.idx >= ? AND b.idx < ? ORDER BY b.idx",
+                    (start, min(stop, start + batch_size))
+                ).fetchall()
+            if not rows:
+                return
+            for row in rows:
+                yield _row_to_block(row)
+            start = rows[-1][0] + 1
+
+    def _insert(self, block: Block):
+        data = block.data if isinstance(block.data, dict) else {}
+        self._conn.execute(
+            "INSERT INTO blocks VALUES (?, ?, ?, ?, ?, ?, ?)",
+            (
+                block.index,
+                block.timestamp,
+                block.previous_hash,
+                block.hash,
+                data.get("type"),
+                data.get("round"),
+                json.dumps(block.data, separators=(",", ":"))
+            )
+        )
+
+        client_ids = {data["client_id"]} if "client_id" in data else set()
+        client_ids.update(record["client_id"] for record in data.get("updates", ()))
+        self._conn.executemany(
+            "INSERT INTO block_clients VALUES (?, ?)",
+            [(client_id, block.index) for client_id in client_ids]
+        )
+
+    def extend(self, blocks: List[Block]):
+        self._check_writable()
+        if not blocks:
+            return
+        with self._lock, self._conn:
+            for block in blocks:
+                self._insert(block)
+        if self._length == 0:
+            self._base = blocks[0].index
+        self._length = blocks[-1].index - self._base + 1
+
+    def query(
+        self,
+        block_type: Optional[str] = None,
+        round_number: Optional[int] = None,
+        client_id: Optional[str] = None,
+        offset: int = 0,
+        limit: Optional[int] = None
+    ) -> List[Block]:
+        sql = f"SELECT {_COLUMNS} FROM blocks b"
+        params: List = []
+        if client_id is not None:
+            sql += " JOIN block_clients c ON c.idx = b.idx AND c.client_id = ?"
+            params.append(client_id)
+
+        conditions = []
+        if block_type is not None:
+            conditions.append("b.block_type = ?")
+            params.append(block_type)
+        if round_number is not None:
+            conditions.append("b.round = ?")
+            params.append(round_number)
+        if conditions:
+            sql += " WHERE " + " AND ".join(conditions)
+
+        sql += " ORDER BY b.idx LIMIT ? OFFSET ?"
+        params += [-1 if limit is None else limit, offset]
+
+        with self._lock:
+            rows = self._conn.execute(sql, params).fetchall()
+        return [_row_to_block(row) for row in rows]
+
+    def counts(self) -> Dict[str, int]:
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT block_type, COUNT(*) FROM blocks WHERE block_type IS NOT NULL GROUP BY block_type"
+            ).fetchall()
+        return dict(rows)
+
+    def replace(self, blocks: Iterable[Block]):
+        self._check_writable()
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM blocks")
+            self._conn.execute("DELETE FROM block_clients")
+            for block in blocks:
+                self._insert(block)
+        self._base, self._length = self._bounds()
+
+    def prune(self, state: Block):
+        self._check_writable()
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM blocks WHERE idx <= ?", (state.index,))
+            self._conn.execute("DELETE FROM block_clients WHERE idx <= ?", (state.index,))
+            self._insert(state)
+        self._base, self._length = self._bounds()
+        self.snapshot()
+
+    def snapshot(self):
+        """Checkpoint the write-ahead log into the database file."""
+        self._check_writable()
+        with self._lock:
+            self._conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+def open_block_store(
+    backend: str = "memory",
+    path: Optional[Path] = None,
+    fsync: str = "batch",
+    fsync_every: int = 100,
+    snapshot_every: Optional[int] = None,
+    read_only: bool = False
+) -> BlockStore:
+    """
+    Open a block store.
+
+    Args:
+        backend: "memory" (list plus optional block log) or "sqlite"
+        path: Block log or database file (not persisted if None)
+        fsync: Sync policy ("always", "batch" or "never")
+        fsync_every: Blocks between fsyncs for the "batch" policy (memory)
+        snapshot_every: Write a compact log snapshot every N blocks (memory)
+        read_only: Open an existing store for reading only
+
+    Returns:
+        Block store
+    """
+    if backend == "memory":
+        return MemoryBlockStore(
+            path,
+            fsync=fsync,
+            fsync_every=fsync_every,
+            snapshot_every=snapshot_every,
+            read_only=read_only
+        )
+    if backend == "sqlite":
+        return SQLiteBlockStore(path, fsync=fsync, read_only=read_only)
+    raise ValueError(f"Unknown storage backend: {backend} (expected one of {STORAGE_BACKENDS})")
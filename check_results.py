@@ -1,6 +1,7 @@
 """Check blockchain ledger and FL results."""
 
 import json
+from collections import Counter
 from pathlib import Path
 
 print("=" * 70)
@@ -29,21 +30,32 @@ if ledger_path.exists():
     print(f"  Size: {size_kb:.2f} KB")
     print(f"  Total blocks: {len(ledger)}")
     
-    # Count block types
-    fl_rounds = sum(1 for b in ledger if b.get("type") == "fl_round")
-    client_updates = sum(1 for b in ledger if b.get("type") == "client_update")
+    # Count block types and collect FL rounds in one pass; the type lives in
+    # the block data (older ledger files kept it at the top level)
+    type_counts = Counter()
+    batched_updates = 0
+    fl_round_blocks = []
+    for block in ledger:
+        data = block.get("data")
+        data = data if isinstance(data, dict) else {}
+        block_type = data.get("type") or block.get("type")
+        type_counts[block_type] += 1
+        if block_type == "client_updates":
+            batched_updates += len(data.get("updates", []))
+        elif block_type == "fl_round":
+            fl_round_blocks.append(data)
     
     print(f"  Genesis block: 1")
-    print(f"  FL rounds: {fl_rounds}")
-    print(f"  Client updates: {client_updates}")
+    print(f"  FL rounds: {type_counts['fl_round']}")
+    print(f"  Client updates: {type_counts['client_update']}")
+    print(f"  Batched client updates: {type_counts['client_updates']} blocks ({batched_updates} updates)")
     
     # Show FL rounds
     print(f"\n  FL Round Details:")
-    for block in ledger:
-        if block.get("type") == "fl_round":
-            data = block.get("data", {})
-            print(f"    Round {data.get('round')}: {data.get('num_clients')} clients, "
-                  f"Avg Acc: {data.get('avg_accuracy', 0)*100:.2f}%")
+    for data in fl_round_blocks:
+        accuracy = (data.get("metrics") or {}).get("accuracy", data.get("avg_accuracy", 0))
+        print(f"    Round {data.get('round')}: {data.get('num_clients')} clients, "
+              f"Avg Acc: {accuracy*100:.2f}%")
 else:
     print("\n✗ Blockchain file not found")
 
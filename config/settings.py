@@ -11,6 +11,9 @@ load_dotenv()
 # Project root directory
 PROJECT_ROOT = Path(__file__).parent.parent
 
+# Placeholder secret; anything signed with it can be forged
+DEFAULT_SECRET_KEY = "dev-secret-key-change-in-production"
+
 
 @dataclass
 class Settings:
@@ -22,6 +25,7 @@ class Settings:
     models_dir: Path = PROJECT_ROOT / "saved_models"
     logs_dir: Path = PROJECT_ROOT / "logs"
     checkpoints_dir: Path = PROJECT_ROOT / "checkpoints"
+    cache_dir: Path = Path(os.getenv("CACHE_DIR", str(PROJECT_ROOT / "cache")))
     
     # Hospital configurations
     hospitals: List[str] = field(default_factory=lambda: ["italy", "pakistan", "usa"])
@@ -36,17 +40,29 @@ class Settings:
     learning_rate: float = float(os.getenv("LEARNING_RATE", "0.001"))
     epochs: int = int(os.getenv("EPOCHS", "50"))
     num_workers: int = int(os.getenv("NUM_WORKERS", "4"))
+    cbc_batch_loader: bool = os.getenv("CBC_BATCH_LOADER", "false").lower() == "true"
+    cbc_column_store: bool = os.getenv("CBC_COLUMN_STORE", "false").lower() == "true"
+    out_of_core_mb: int = int(os.getenv("OUT_OF_CORE_MB", "1024"))  # larger CSVs stream from disk
     
     # Federated learning settings
     fl_rounds: int = int(os.getenv("FL_ROUNDS", "10"))
     local_epochs: int = int(os.getenv("LOCAL_EPOCHS", "5"))
     aggregation_method: str = os.getenv("AGGREGATION_METHOD", "fedavg")  # fedavg, fedprox
     min_clients: int = int(os.getenv("MIN_CLIENTS", "2"))
+    flat_aggregation: bool = os.getenv("FLAT_AGGREGATION", "false").lower() == "true"
     
     # Blockchain settings
     blockchain_enabled: bool = os.getenv("BLOCKCHAIN_ENABLED", "true").lower() == "true"
     blockchain_network: str = os.getenv("BLOCKCHAIN_NETWORK", "ganache")  # ganache, sepolia
     contract_address: str = os.getenv("CONTRACT_ADDRESS", "")
+    ledger_storage: str = os.getenv("LEDGER_STORAGE", "memory")  # memory, sqlite
+    ledger_path: Path = Path(os.getenv("LEDGER_PATH", str(PROJECT_ROOT / "ledger" / "chain.jsonl")))
+    ledger_fsync: str = os.getenv("LEDGER_FSYNC", "batch")  # always, batch, never
+    ledger_fsync_every: int = int(os.getenv("LEDGER_FSYNC_EVERY", "100"))
+    ledger_snapshot_every: int = int(os.getenv("LEDGER_SNAPSHOT_EVERY", "100000"))
+    ledger_prune_every: int = int(os.getenv("LEDGER_PRUNE_EVERY", "0"))  # rounds; 0 disables pruning
+    ledger_batch_updates: bool = os.getenv("LEDGER_BATCH_UPDATES", "false").lower() == "true"
+    ledger_async_commits: bool = os.getenv("LEDGER_ASYNC_COMMITS", "false").lower() == "true"
     
     # API settings
     api_host: str = os.getenv("API_HOST", "0.0.0.0")
@@ -66,7 +82,7 @@ class Settings:
     use_tensorboard: bool = os.getenv("USE_TENSORBOARD", "true").lower() == "true"
     
     # Security
-    secret_key: str = os.getenv("SECRET_KEY", "dev-secret-key-change-in-production")
+    secret_key: str = os.getenv("SECRET_KEY", DEFAULT_SECRET_KEY)
     jwt_secret_key: str = os.getenv("JWT_SECRET_KEY", "jwt-secret-key-change-in-production")
     
     def __post_init__(self):
@@ -2,7 +2,8 @@
 
 import argparse
 from pathlib import Path
-from thalassemia_data_generator import generate_hospital_data
+from thalassemia_data_generator import generate_hospital_data, write_hospital_data, CHUNK_ROWS
+from parallel_generation import generate_hospitals_parallel
 from config.settings import settings
 from config.logging_config import setup_logging
 
@@ -14,21 +15,54 @@ def main():
     parser = argparse.ArgumentParser(description="Generate synthetic thalassemia data")
     parser.add_argument("--n-samples", type=int, default=1000, help="Samples per hospital")
     parser.add_argument("--test-samples", type=int, default=300, help="Test samples")
+    parser.add_argument("--vectorized", action="store_true", help="Use the vectorized, chunked generator")
+    parser.add_argument("--chunk-rows", type=int, default=CHUNK_ROWS, help="Rows per chunk (vectorized)")
+    parser.add_argument("--workers", type=int, default=1, help="Worker processes (parallel generation)")
+    parser.add_argument("--synthetic-hospitals", type=int, default=0, help="Extra synthetic hospitals for FL simulation")
+    parser.add_argument("--seed", type=int, default=42, help="Root seed (parallel generation)")
     args = parser.parse_args()
     
     data_dir = settings.data_dir
+    hospitals = ["italy", "pakistan", "usa"]
+    
+    if args.workers > 1 or args.synthetic_hospitals > 0:
+        # Seed streams are spawned per hospital and chunk, so the data is
+        # the same for any --workers
+        hospitals += [f"synth_{i:04d}" for i in range(args.synthetic_hospitals)]
+        specs = [(hospital, args.n_samples, data_dir / f"hospital_{hospital}") for hospital in hospitals]
+        generate_hospitals_parallel(
+            specs,
+            seed=args.seed,
+            num_workers=args.workers,
+            chunk_rows=args.chunk_rows,
+            vectorized=args.vectorized
+        )
+        generate_hospitals_parallel(
+            [("test", args.test_samples, data_dir / "test")],
+            seed=9999,
+            num_workers=1,
+            chunk_rows=args.chunk_rows,
+            vectorized=args.vectorized
+        )
+        logger.info("Data generation complete!")
+        return
+    
+    def generate(hospital, n_samples, output_dir, seed=None):
+        if args.vectorized:
+            write_hospital_data(hospital, n_samples, output_dir, seed=seed, chunk_rows=args.chunk_rows)
+        else:
+            generate_hospital_data(hospital, n_samples, output_dir, seed=seed)
     
     # Generate hospital data
-    hospitals = ["italy", "pakistan", "usa"]
     for hospital in hospitals:
         logger.info(f"Generating data for hospital: {hospital}")
         hospital_dir = data_dir / f"hospital_{hospital}"
-        generate_hospital_data(hospital, args.n_samples, hospital_dir)
+        generate(hospital, args.n_samples, hospital_dir)
     
     # Generate test data
     logger.info("Generating test data")
     test_dir = data_dir / "test"
-    generate_hospital_data("test", args.test_samples, test_dir, seed=9999)
+    generate("test", args.test_samples, test_dir, seed=9999)
     
     logger.info("Data generation complete!")
 
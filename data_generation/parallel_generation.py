@@ -0,0 +1,149 @@
+"""Parallel synthetic data generation across hospitals and chunks."""
+
+import os
+import shutil
+import multiprocessing
+import numpy as np
+from pathlib import Path
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Optional, Sequence, Tuple
+from config.logging_config import get_logger
+from data_generation.thalassemia_data_generator import (
+    ThalassemiaDataGenerator,
+    HOSPITAL_DISTRIBUTIONS,
+    DEFAULT_DISTRIBUTION,
+    CHUNK_ROWS,
+    condition_counts,
+    split_condition_counts
+)
+
+logger = get_logger(__name__)
+
+# (hospital name, number of samples, output directory)
+HospitalSpec = Tuple[str, int, Path]
+
+
+def _generate_part(
+    part_path: Path,
+    counts: Dict[str, int],
+    first_id: int,
+    seed_seq: np.random.SeedSequence,
+    vectorized: bool = True
+) -> int:
+    """Generate one chunk of a hospital into a part file (runs in a worker)."""
+    if vectorized:
+        generator = ThalassemiaDataGenerator(rng=np.random.default_rng(seed_seq))
+        chunk = generator.generate_chunk(counts, first_id)
+    else:
+        generator = ThalassemiaDataGenerator(random_state=np.random.RandomState(np.random.MT19937(seed_seq)))
+        chunk = generator.generate_chunk_per_sample(counts, first_id)
+    chunk.to_csv(part_path, header=first_id == 1, index=False)
+    return len(chunk)
+
+
+def _plan_hospital(
+    spec: HospitalSpec,
+    seed_seq: np.random.SeedSequence,
+    chunk_rows: int,
+    vectorized: bool = True
+) -> List[Tuple]:
+    """
+    Split one hospital into part tasks.
+
+    The hospital's seed sequence spawns one stream for splitting the
+    condition counts and one per chunk. Chunk boundaries depend only on
+    ``chunk_rows``, so the data does not depend on the worker count.
+    """
+    name, n_samples, output_dir = spec
+    distribution = HOSPITAL_DISTRIBUTIONS.get(name.lower(), DEFAULT_DISTRIBUTION)
+    n_chunks = max(1, -(-n_samples // chunk_rows))
+    split_seq, *chunk_seqs = seed_seq.spawn(1 + n_chunks)
+
+    parts_dir = Path(output_dir) / "cbc_data.parts"
+    parts_dir.mkdir(parents=True, exist_ok=True)
+
+    chunks = split_condition_counts(
+        condition_counts(n_samples, distribution),
+        chunk_rows,
+        np.random.default_rng(split_seq)
+    )
+
+    tasks = []
+    first_id = 1
+    for i, (counts, chunk_seq) in enumerate(zip(chunks, chunk_seqs)):
+        tasks.append((parts_dir / f"part-{i:05d}.csv", counts, first_id, chunk_seq, vectorized))
+        first_id += sum(counts.values())
+    return tasks
+
+
+def _concatenate_parts(part_paths: List[Path], output_path: Path):
+    """Concatenate part files (only the first has a header) into the CSV."""
+    tmp_path = output_path.with_name(output_path.name + ".tmp")
+    with open(tmp_path, "wb") as out:
+        for part_path in part_paths:
+            with open(part_path, "rb") as part:
+                shutil.copyfileobj(part, out)
+    os.replace(tmp_path, output_path)
+    shutil.rmtree(part_paths[0].parent)
+
+
+def generate_hospitals_parallel(
+    specs: Sequence[HospitalSpec],
+    seed: int = 42,
+    num_workers: Optional[int] = None,
+    chunk_rows: int = CHUNK_ROWS,
+    vectorized: bool = True
+) -> List[Path]:
+    """
+    Generate CBC data for many hospitals across CPU cores.
+
+    Every hospital gets a stream spawned from ``SeedSequence(seed)`` by its
+    position in ``specs``, and every chunk within a hospital a stream
+    spawned from that. Chunks are generated in parallel into part files
+    and concatenated per hospital, so the output is bit-identical for any
+    ``num_workers``.
+
+    Args:
+        specs: (hospital name, samples, output directory) per hospital
+        seed: Root seed
+        num_workers: Worker processes (all cores if None, in-process if 1)
+        chunk_rows: Rows per chunk
+        vectorized: Draw each chunk with array calls instead of one
+            sample at a time
+
+    Returns:
+        Paths of the written CSV files, in ``specs`` order
+    """
+    num_workers = num_workers or os.cpu_count() or 1
+    hospital_seqs = np.random.SeedSequence(seed).spawn(len(specs))
+
+    plans = [_plan_hospital(spec, seq, chunk_rows, vectorized) for spec, seq in zip(specs, hospital_seqs)]
+    tasks = [task for plan in plans for task in plan]
+    logger.info(f"Generating {len(specs)} hospitals in {len(tasks)} chunks ({num_workers} workers)")
+
+    executor = None
+    if num_workers > 1:
+        executor = ProcessPoolExecutor(
+            max_workers=num_workers,
+            mp_context=multiprocessing.get_context("spawn")
+        )
+        results = executor.map(_generate_part, *zip(*tasks), chunksize=max(1, len(tasks) // (num_workers * 4)))
+    else:
+        results = (_generate_part(*task) for task in tasks)
+
+    # Results arrive in task order; a hospital is assembled once its last part is in
+    output_paths = []
+    try:
+        for spec, plan in zip(specs, plans):
+            rows = sum(next(results) for _ in plan)
+            output_path = Path(spec[2]) / "cbc_data.csv"
+            _concatenate_parts([task[0] for task in plan], output_path)
+            output_paths.append(output_path)
+            logger.debug(f"Saved dataset to {output_path} ({rows} samples)")
+    finally:
+        if executor is not None:
+            executor.shutdown()
+
+    logger.info(f"Generated {len(output_paths)} hospital datasets")
+
+    return output_paths
@@ -4,14 +4,82 @@ This module generates realistic Complete Blood Count (CBC) data for normal indiv
 and patients with thalassemia minor and major.
 """
 
+import zlib
 import numpy as np
 import pandas as pd
 from pathlib import Path
-from typing import Dict, List, Tuple
+from typing import Dict, List, Optional, Tuple
 from config.logging_config import get_logger
 
 logger = get_logger(__name__)
 
+# Condition mix per hospital (others use DEFAULT_DISTRIBUTION)
+HOSPITAL_DISTRIBUTIONS = {
+    "italy": {"normal": 0.7, "minor": 0.25, "major": 0.05},
+    "pakistan": {"normal": 0.5, "minor": 0.35, "major": 0.15},
+    "usa": {"normal": 0.75, "minor": 0.20, "major": 0.05},
+}
+DEFAULT_DISTRIBUTION = {"normal": 0.6, "minor": 0.3, "major": 0.1}
+
+# Rows generated and written per chunk on the vectorized path
+CHUNK_ROWS = 1_000_000
+
+# Output column order (same as generate_dataset)
+COLUMNS = ["hb", "rbc", "mcv", "mch", "mchc", "rdw", "wbc", "platelets",
+           "patient_id", "condition", "age", "gender"]
+
+
+def stable_seed(name: str) -> int:
+    """
+    Seed derived from a name, the same in every process.
+    
+    Built-in ``hash`` of a string is randomized per interpreter, so it
+    cannot be used to seed reproducible data.
+    """
+    return zlib.crc32(name.encode("utf-8")) % 10000
+
+
+def condition_counts(n_samples: int, distribution: Dict[str, float]) -> Dict[str, int]:
+    """Samples per condition, with the rounding remainder going to normal."""
+    counts = {
+        condition: int(n_samples * ratio)
+        for condition, ratio in distribution.items()
+    }
+    counts["normal"] = counts.get("normal", 0) + n_samples - sum(counts.values())
+    return counts
+
+
+def split_condition_counts(
+    counts: Dict[str, int],
+    chunk_rows: int,
+    rng: np.random.Generator
+) -> List[Dict[str, int]]:
+    """
+    Split condition totals over chunks of at most ``chunk_rows`` rows.
+    
+    Each chunk takes a multivariate hypergeometric draw from the remaining
+    counts, so chunk totals always add up to ``counts`` exactly.
+    
+    Args:
+        counts: Samples per condition
+        chunk_rows: Rows per chunk
+        rng: Random stream for the split
+        
+    Returns:
+        Samples per condition for each chunk (at least one chunk)
+    """
+    conditions = list(counts)
+    remaining = np.array([counts[c] for c in conditions], dtype=np.int64)
+    
+    chunks = []
+    while True:
+        n = int(min(chunk_rows, remaining.sum()))
+        draw = rng.multivariate_hypergeometric(remaining, n)
+        remaining -= draw
+        chunks.append(dict(zip(conditions, draw.tolist())))
+        if remaining.sum() == 0:
+            return chunks
+
 
 class ThalassemiaDataGenerator:
     """Generate synthetic CBC data for thalassemia detection."""
@@ -50,10 +118,24 @@ class ThalassemiaDataGenerator:
         }
     }
     
-    def __init__(self, seed: int = 42):
-        """Initialize the data generator."""
+    def __init__(
+        self,
+        seed: int = 42,
+        rng: Optional[np.random.Generator] = None,
+        random_state: Optional[np.random.RandomState] = None
+    ):
+        """
+        Initialize the data generator.
+        
+        Args:
+            seed: Seed of the default streams (and of the legacy shuffle)
+            rng: Random stream for the vectorized path (default: seeded from ``seed``)
+            random_state: Random stream for the per-sample path (default:
+                seeded from ``seed``, matching the former global numpy RNG)
+        """
         self.seed = seed
-        np.random.seed(seed)
+        self.rng = rng if rng is not None else np.random.default_rng(seed)
+        self.random_state = random_state if random_state is not None else np.random.RandomState(seed)
         
     def generate_sample(self, condition: str) -> Dict[str, float]:
         """Generate a single CBC sample."""
@@ -65,7 +147,7 @@ class ThalassemiaDataGenerator:
         
         for param_name, (min_val, max_val, std) in params.items():
             mean = (min_val + max_val) / 2
-            value = np.random.normal(mean, std)
+            value = self.random_state.normal(mean, std)
             value = np.clip(value, min_val - std, max_val + std)
             sample[param_name] = round(float(value), 2)
         
@@ -96,28 +178,157 @@ class ThalassemiaDataGenerator:
         total = sum(samples_per_condition.values())
         samples_per_condition["normal"] += n_samples - total
         
+        for condition, n in samples_per_condition.items():
+            logger.info(f"Generating {n} samples for {condition}")
+        
         # Generate samples
+        df = pd.DataFrame(self._generate_samples(samples_per_condition, first_id=1))
+        
+        # Shuffle
+        df = df.sample(frac=1, random_state=self.seed).reset_index(drop=True)
+        
+        return df
+    
+    def _generate_samples(self, counts: Dict[str, int], first_id: int) -> List[Dict]:
+        """Generate rows one sample at a time from ``self.random_state``."""
         data = []
-        patient_id = 1
+        patient_id = first_id
         
-        for condition, n in samples_per_condition.items():
-            logger.info(f"Generating {n} samples for {condition}")
-            
+        for condition, n in counts.items():
             for _ in range(n):
                 sample = self.generate_sample(condition)
                 sample["patient_id"] = f"P{patient_id:05d}"
                 sample["condition"] = condition
-                sample["age"] = np.random.randint(1, 80)
-                sample["gender"] = np.random.choice(["M", "F"])
+                sample["age"] = self.random_state.randint(1, 80)
+                sample["gender"] = self.random_state.choice(["M", "F"])
                 data.append(sample)
                 patient_id += 1
         
-        df = pd.DataFrame(data)
+        return data
+    
+    def generate_chunk_per_sample(self, counts: Dict[str, int], first_id: int) -> pd.DataFrame:
+        """
+        Generate and shuffle one chunk of rows on the per-sample path.
         
-        # Shuffle
-        df = df.sample(frac=1, random_state=self.seed).reset_index(drop=True)
+        Args:
+            counts: Samples per condition in this chunk
+            first_id: Patient number of the chunk's first row
+            
+        Returns:
+            Shuffled chunk DataFrame
+        """
+        df = pd.DataFrame(self._generate_samples(counts, first_id), columns=COLUMNS)
+        return df.iloc[self.random_state.permutation(len(df))].reset_index(drop=True)
+    
+    def generate_condition_block(self, condition: str, n: int) -> Dict[str, np.ndarray]:
+        """
+        Draw ``n`` CBC samples of one condition in single array calls.
         
-        return df
+        Args:
+            condition: Condition name
+            n: Number of samples
+            
+        Returns:
+            Dict of parameter name to array of ``n`` values
+        """
+        if condition not in self.CBC_PARAMETERS:
+            raise ValueError(f"Unknown condition: {condition}")
+        
+        names = list(self.CBC_PARAMETERS[condition])
+        bounds = np.array(list(self.CBC_PARAMETERS[condition].values()), dtype=np.float64)
+        min_val, max_val, std = bounds[:, 0], bounds[:, 1], bounds[:, 2]
+        
+        values = self.rng.normal((min_val + max_val) / 2, std, size=(n, len(names)))
+        values = np.clip(values, min_val - std, max_val + std).round(2)
+        
+        return {name: values[:, i] for i, name in enumerate(names)}
+    
+    def generate_chunk(self, counts: Dict[str, int], first_id: int) -> pd.DataFrame:
+        """
+        Generate and shuffle one chunk of rows.
+        
+        Args:
+            counts: Samples per condition in this chunk
+            first_id: Patient number of the chunk's first row
+            
+        Returns:
+            Shuffled chunk DataFrame
+        """
+        blocks = [self.generate_condition_block(condition, n) for condition, n in counts.items() if n > 0]
+        n_rows = sum(counts.values())
+        
+        columns = {
+            name: np.concatenate([block[name] for block in blocks]) if blocks else np.empty(0)
+            for name in self.CBC_PARAMETERS["normal"]
+        }
+        columns["patient_id"] = [f"P{i:05d}" for i in range(first_id, first_id + n_rows)]
+        columns["condition"] = np.repeat(list(counts), list(counts.values()))
+        columns["age"] = self.rng.integers(1, 80, size=n_rows)
+        columns["gender"] = np.where(self.rng.integers(0, 2, size=n_rows) == 0, "M", "F")
+        
+        df = pd.DataFrame(columns, columns=COLUMNS)
+        return df.iloc[self.rng.permutation(n_rows)].reset_index(drop=True)
+    
+    def generate_dataset_vectorized(
+        self,
+        n_samples: int,
+        distribution: Dict[str, float] = None
+    ) -> pd.DataFrame:
+        """
+        Generate a complete dataset with array draws from ``self.rng``.
+        
+        Same schema and condition counts as ``generate_dataset``, but
+        each condition is drawn in a handful of array calls instead of
+        one Python call per patient and parameter.
+        
+        Args:
+            n_samples: Total number of samples
+            distribution: Distribution of conditions
+        """
+        counts = condition_counts(n_samples, distribution or DEFAULT_DISTRIBUTION)
+        return self.generate_chunk(counts, first_id=1)
+    
+    def write_dataset_chunked(
+        self,
+        output_path: Path,
+        n_samples: int,
+        distribution: Dict[str, float] = None,
+        chunk_rows: int = CHUNK_ROWS
+    ) -> int:
+        """
+        Generate a dataset straight to CSV, one chunk at a time.
+        
+        Exact condition totals are kept by splitting the remaining counts
+        over chunks with a multivariate hypergeometric draw; rows are
+        shuffled within each chunk. Memory is bounded by ``chunk_rows``.
+        
+        Args:
+            output_path: CSV path
+            n_samples: Total number of samples
+            distribution: Distribution of conditions
+            chunk_rows: Rows per chunk
+            
+        Returns:
+            Number of rows written
+        """
+        output_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = output_path.with_name(output_path.name + ".tmp")
+        
+        written = 0
+        with open(tmp_path, "w", newline="") as f:
+            for counts in split_condition_counts(
+                condition_counts(n_samples, distribution or DEFAULT_DISTRIBUTION),
+                chunk_rows,
+                self.rng
+            ):
+                chunk = self.generate_chunk(counts, first_id=written + 1)
+                chunk.to_csv(f, header=written == 0, index=False)
+                written += len(chunk)
+        
+        tmp_path.replace(output_path)
+        logger.info(f"Saved dataset to {output_path} ({written} samples)")
+        
+        return written
     
     def save_dataset(self, df: pd.DataFrame, output_path: Path):
         """Save dataset to CSV."""
@@ -134,20 +345,46 @@ def generate_hospital_data(
 ) -> pd.DataFrame:
     """Generate data for a specific hospital."""
     if seed is None:
-        seed = hash(hospital_name) % 10000
+        seed = stable_seed(hospital_name)
     
     generator = ThalassemiaDataGenerator(seed=seed)
     
     # Different distributions for different hospitals
-    distributions = {
-        "italy": {"normal": 0.7, "minor": 0.25, "major": 0.05},
-        "pakistan": {"normal": 0.5, "minor": 0.35, "major": 0.15},
-        "usa": {"normal": 0.75, "minor": 0.20, "major": 0.05},
-    }
-    
-    distribution = distributions.get(hospital_name.lower(), {"normal": 0.6, "minor": 0.3, "major": 0.1})
+    distribution = HOSPITAL_DISTRIBUTIONS.get(hospital_name.lower(), DEFAULT_DISTRIBUTION)
     
     df = generator.generate_dataset(n_samples, distribution)
     generator.save_dataset(df, output_dir / f"cbc_data.csv")
     
     return df
+
+
+def write_hospital_data(
+    hospital_name: str,
+    n_samples: int,
+    output_dir: Path,
+    seed: int = None,
+    chunk_rows: int = CHUNK_ROWS
+) -> Path:
+    """
+    Generate data for a hospital on the vectorized path, writing in chunks.
+    
+    Args:
+        hospital_name: Hospital name (selects the condition distribution)
+        n_samples: Number of samples
+        output_dir: Hospital data directory
+        seed: Seed of the hospital's random stream
+        chunk_rows: Rows generated and written at once
+        
+    Returns:
+        Path of the written CSV
+    """
+    if seed is None:
+        seed = stable_seed(hospital_name)
+    
+    generator = ThalassemiaDataGenerator(seed=seed)
+    distribution = HOSPITAL_DISTRIBUTIONS.get(hospital_name.lower(), DEFAULT_DISTRIBUTION)
+    
+    output_path = output_dir / "cbc_data.csv"
+    generator.write_dataset_chunked(output_path, n_samples, distribution, chunk_rows=chunk_rows)
+    
+    return output_path
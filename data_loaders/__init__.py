@@ -1,7 +1,23 @@
 """Data loaders package for MedChain-FL."""
 
-from .cbc_dataset import CBCDataset
+from .cbc_dataset import CBCDataset, CBCBatchLoader
 from .image_dataset import ImageDataset
 from .hybrid_dataset import HybridDataset
+from .dataset_cache import ClientDatasetCache
+from .cbc_store import CBCColumnStore
+from .streaming_cbc import StreamingCBCDataset, StreamingCBCLoader
+from .partitioning import ClientPartition, ClientSubset, ClientBatchLoader
 
-__all__ = ["CBCDataset", "ImageDataset", "HybridDataset"]
+__all__ = [
+    "CBCDataset",
+    "CBCBatchLoader",
+    "ImageDataset",
+    "HybridDataset",
+    "ClientDatasetCache",
+    "CBCColumnStore",
+    "StreamingCBCDataset",
+    "StreamingCBCLoader",
+    "ClientPartition",
+    "ClientSubset",
+    "ClientBatchLoader",
+]
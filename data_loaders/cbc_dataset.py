@@ -4,22 +4,23 @@ import pandas as pd
 import torch
 from torch.utils.data import Dataset
 from pathlib import Path
-from typing import Tuple, Optional
+from typing import Iterator, Tuple, Optional
 from sklearn.preprocessing import StandardScaler
+from .cbc_store import CBCColumnStore
 
 
 class CBCDataset(Dataset):
     """Dataset for Complete Blood Count (CBC) data."""
     
-    FEATURE_COLUMNS = ["hb", "rbc", "mcv", "mch", "mchc", "rdw", "wbc", "platelets","Age"]
+    FEATURE_COLUMNS = ["hb", "rbc", "mcv", "mch", "mchc", "rdw", "wbc", "platelets"]
     LABEL_MAP = {"normal": 0, "minor": 1, "major": 2}
-    LABEL_MAP = {}
     
     def __init__(
         self,
         csv_path: Path,
         scaler: Optional[StandardScaler] = None,
-        fit_scaler: bool = True
+        fit_scaler: bool = True,
+        use_store: bool = False
     ):
         """
         Initialize CBC dataset.
@@ -28,12 +29,20 @@ class CBCDataset(Dataset):
             csv_path: Path to CSV file
             scaler: StandardScaler instance
             fit_scaler: Whether to fit the scaler on this data
+            use_store: Read the memory-mapped column store (synced from
+                the CSV) instead of parsing the CSV
         """
-        self.data = pd.read_csv(csv_path)
-        
-        # Extract features and labels
-        self.features = self.data[self.FEATURE_COLUMNS].values
-        self.labels = self.data["condition"].map(self.LABEL_MAP).values
+        if use_store:
+            store = CBCColumnStore.sync(csv_path)
+            self.data = None
+            self.features = store.features(self.FEATURE_COLUMNS)
+            self.labels = store.label_codes("condition", self.LABEL_MAP)
+        else:
+            self.data = pd.read_csv(csv_path)
+            
+            # Extract features and labels
+            self.features = self.data[self.FEATURE_COLUMNS].values
+            self.labels = self.data["condition"].map(self.LABEL_MAP).values
         
         # Initialize scaler
         if scaler is None:
@@ -46,10 +55,14 @@ class CBCDataset(Dataset):
             self.features = self.scaler.fit_transform(self.features)
         else:
             self.features = self.scaler.transform(self.features)
+        
+        # Build tensors once so items are cheap views instead of new tensors
+        self.features = torch.as_tensor(self.features, dtype=torch.float32)
+        self.labels = torch.tensor(self.labels, dtype=torch.long)
     
     def __len__(self) -> int:
         """Get dataset length."""
-        return len(self.data)
+        return len(self.labels)
     
     def __getitem__(self, idx: int) -> Tuple[torch.Tensor, torch.Tensor]:
         """
@@ -58,16 +71,100 @@ class CBCDataset(Dataset):
         Returns:
             Tuple of (features, label)
         """
-        features = torch.FloatTensor(self.features[idx])
-        label = torch.LongTensor([self.labels[idx]])[0]
-        
-        return features, label
+        return self.features[idx], self.labels[idx]
     
     def get_scaler(self) -> StandardScaler:
         """Get the fitted scaler."""
         return self.scaler
 
 
+class CBCBatchLoader:
+    """
+    Batch loader for tensor-backed CBC data.
+    
+    Features and labels stay in two contiguous tensors and each batch is
+    produced by one index gather (or a plain slice when not shuffling),
+    bypassing per-sample ``__getitem__`` calls and default collation. It
+    iterates like a DataLoader and exposes ``dataset`` and ``__len__``,
+    so it plugs into ``LocalTrainer`` unchanged.
+    """
+    
+    def __init__(
+        self,
+        dataset: Dataset,
+        batch_size: int = 32,
+        shuffle: bool = True,
+        drop_last: bool = False,
+        generator: Optional[torch.Generator] = None
+    ):
+        """
+        Initialize batch loader.
+        
+        Args:
+            dataset: Dataset with ``features`` and ``labels`` tensors
+            batch_size: Batch size
+            shuffle: Whether to reshuffle every epoch
+            drop_last: Drop the last incomplete batch
+            generator: Optional RNG for shuffling (global RNG if None)
+        """
+        self.dataset = dataset
+        self.features = dataset.features
+        self.labels = dataset.labels
+        self.batch_size = batch_size
+        self.shuffle = shuffle
+        self.drop_last = drop_last
+        self.generator = generator
+    
+    def __len__(self) -> int:
+        """Number of batches per epoch."""
+        n = len(self.labels)
+        if self.drop_last:
+            return n // self.batch_size
+        return (n + self.batch_size - 1) // self.batch_size
+    
+    def __iter__(self) -> Iterator[Tuple[torch.Tensor, torch.Tensor]]:
+        """Yield (features, labels) batches."""
+        n = len(self.labels)
+        end = (n // self.batch_size) * self.batch_size if self.drop_last else n
+        
+        if self.shuffle:
+            order = torch.randperm(n, generator=self.generator)
+            for start in range(0, end, self.batch_size):
+                idx = order[start:start + self.batch_size]
+                yield self.features[idx], self.labels[idx]
+        else:
+            for start in range(0, end, self.batch_size):
+                yield (
+                    self.features[start:start + self.batch_size],
+                    self.labels[start:start + self.batch_size]
+                )
+
+
+def create_cbc_batch_loader(
+    csv_path: Path,
+    batch_size: int = 32,
+    shuffle: bool = True,
+    scaler: Optional[StandardScaler] = None,
+    fit_scaler: bool = True
+) -> CBCBatchLoader:
+    """
+    Create a tensor-backed CBC batch loader.
+    
+    Args:
+        csv_path: Path to CSV file
+        batch_size: Batch size
+        shuffle: Whether to shuffle
+        scaler: StandardScaler instance
+        fit_scaler: Whether to fit scaler
+        
+    Returns:
+        CBCBatchLoader instance
+    """
+    dataset = CBCDataset(csv_path, scaler=scaler, fit_scaler=fit_scaler)
+    
+    return CBCBatchLoader(dataset, batch_size=batch_size, shuffle=shuffle)
+
+
 def create_cbc_dataloader(
     csv_path: Path,
     batch_size: int = 32,
@@ -92,12 +189,34 @@ def create_cbc_dataloader(
     """
     dataset = CBCDataset(csv_path, scaler=scaler, fit_scaler=fit_scaler)
     
-    dataloader = torch.utils.data.DataLoader(
+    return build_cbc_dataloader(dataset, batch_size, shuffle, num_workers)
+
+
+def build_cbc_dataloader(
+    dataset: CBCDataset,
+    batch_size: int = 32,
+    shuffle: bool = True,
+    num_workers: int = 4,
+    persistent_workers: bool = False
+) -> torch.utils.data.DataLoader:
+    """
+    Wrap an existing CBC dataset in a data loader.
+    
+    Args:
+        dataset: CBC dataset
+        batch_size: Batch size
+        shuffle: Whether to shuffle
+        num_workers: Number of workers
+        persistent_workers: Keep worker processes alive between epochs
+        
+    Returns:
+        DataLoader instance
+    """
+    return torch.utils.data.DataLoader(
         dataset,
         batch_size=batch_size,
         shuffle=shuffle,
         num_workers=num_workers,
-        pin_memory=True
+        pin_memory=torch.cuda.is_available(),
+        persistent_workers=persistent_workers and num_workers > 0
     )
-    
-    return dataloader
@@ -0,0 +1,424 @@
+"""Columnar binary storage for hospital CBC data."""
+
+import os
+import csv
+import json
+import hashlib
+import numpy as np
+import pandas as pd
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Dict, List, Optional
+from config.logging_config import get_logger
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+logger = get_logger(__name__)
+
+STORE_VERSION = 3
+META_FILE = "meta.json"
+
+# Rows parsed per CSV chunk while building or syncing a store
+CHUNK_ROWS = 1_000_000
+
+# The converted CSV prefix is hashed in blocks of this size, so an
+# append only re-hashes the last (partial) block and the new bytes
+HASH_BLOCK_BYTES = 4 << 20
+
+FLOAT_COLUMNS = ("hb", "rbc", "mcv", "mch", "mchc", "rdw", "wbc", "platelets")
+CATEGORY_COLUMNS = ("patient_id", "condition", "gender")
+
+
+def store_dir_for(csv_path: Path) -> Path:
+    """Default store directory for a CSV file (next to it)."""
+    csv_path = Path(csv_path)
+    return csv_path.parent / f"{csv_path.stem}_columns"
+
+
+def _hash_blocks(csv_path: Path, start: int, end: int) -> List[str]:
+    """
+    Digests of the ``HASH_BLOCK_BYTES`` blocks of the CSV bytes ``[start, end)``.
+
+    ``start`` must be block-aligned; the last digest may cover a partial block.
+    """
+    hashes = []
+    with open(csv_path, "rb") as f:
+        f.seek(start)
+        while start < end:
+            block = f.read(min(HASH_BLOCK_BYTES, end - start))
+            if not block:
+                break
+            hashes.append(hashlib.sha256(block).hexdigest())
+            start += len(block)
+    return hashes
+
+
+@contextmanager
+def _sync_lock(store_dir: Path):
+    """Exclusive inter-process lock for syncing a store."""
+    lock_path = store_dir.with_name(store_dir.name + ".lock")
+    lock_path.parent.mkdir(parents=True, exist_ok=True)
+    with open(lock_path, "a+b") as f:
+        if fcntl is not None:
+            fcntl.flock(f.fileno(), fcntl.LOCK_EX)
+        else:
+            f.seek(0)
+            msvcrt.locking(f.fileno(), msvcrt.LK_LOCK, 1)
+        try:
+            yield
+        finally:
+            if fcntl is not None:
+                fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+            else:
+                f.seek(0)
+                msvcrt.locking(f.fileno(), msvcrt.LK_UNLCK, 1)
+
+
+def _read_header(csv_path: Path) -> List[str]:
+    """Parse the CSV header line."""
+    with open(csv_path, "r", newline="", encoding="utf-8") as f:
+        return next(csv.reader(f), [])
+
+
+class CBCColumnStore:
+    """
+    Hospital CBC data as typed binary columns.
+
+    Numeric columns are raw little-endian float32 files and string
+    columns (patient id, condition, gender, ...) are int32 codes into a
+    per-column category list, both memory-mapped on read. A ``meta.json``
+    records the row count, how many CSV bytes have been converted, the
+    CSV mtime and per-block hashes of the converted prefix. An unchanged
+    mtime skips all checks. A grown CSV is treated as an append (e.g. by
+    ``/api/hospital/upload``): the first and last hashed blocks are
+    checked and only the new rows are converted and hashed. A CSV touched
+    without growing is re-hashed in full, and any mismatch (or a shrunk
+    CSV) triggers a full rebuild.
+    """
+
+    def __init__(self, store_dir: Path):
+        """
+        Open an existing store.
+
+        Args:
+            store_dir: Store directory written by ``sync``
+        """
+        self.store_dir = Path(store_dir)
+        with open(self.store_dir / META_FILE, "r") as f:
+            self.meta = json.load(f)
+
+        self._index = {spec["name"]: i for i, spec in enumerate(self.meta["columns"])}
+        self._categories: Dict[str, List[str]] = {}
+
+    @property
+    def num_rows(self) -> int:
+        """Number of rows."""
+        return self.meta["num_rows"]
+
+    @property
+    def columns(self) -> List[str]:
+        """Column names in CSV order."""
+        return [spec["name"] for spec in self.meta["columns"]]
+
+    def __len__(self) -> int:
+        return self.num_rows
+
+    def _spec(self, name: str) -> Dict:
+        if name not in self._index:
+            raise KeyError(f"Unknown column: {name}")
+        return self.meta["columns"][self._index[name]]
+
+    def column(self, name: str) -> np.ndarray:
+        """
+        Memory-map a column.
+
+        Args:
+            name: Column name
+
+        Returns:
+            float32 values, or int32 category codes (-1 = missing)
+        """
+        spec = self._spec(name)
+        dtype = np.dtype("<f4") if spec["kind"] == "float" else np.dtype("<i4")
+        if self.num_rows == 0:
+            return np.empty(0, dtype=dtype)
+        return np.memmap(
+            self.store_dir / spec["file"], dtype=dtype, mode="r", shape=(self.num_rows,)
+        )
+
+    def categories(self, name: str) -> List[str]:
+        """Category list of a string column."""
+        if name not in self._categories:
+            spec = self._spec(name)
+            with open(self.store_dir / spec["categories"], "r") as f:
+                self._categories[name] = json.load(f)
+        return self._categories[name]
+
+    def decode(self, name: str) -> np.ndarray:
+        """Get a string column as an object array (NaN for missing)."""
+        codes = self.column(name)
+        lookup = np.array(self.categories(name) + [np.nan], dtype=object)
+        return lookup[codes]
+
+    def features(self, columns: List[str]) -> np.ndarray:
+        """
+        Stack numeric columns into a row-major matrix.
+
+        Args:
+            columns: Numeric column names
+
+        Returns:
+            (num_rows, len(columns)) float32 array
+        """
+        features = np.empty((self.num_rows, len(columns)), dtype=np.float32)
+        for i, name in enumerate(columns):
+            features[:, i] = self.column(name)
+        return features
+
+    def label_codes(self, name: str, label_map: Dict[str, int]) -> np.ndarray:
+        """
+        Map a categorical column to integer labels.
+
+        Args:
+            name: Label column name
+            label_map: Category -> label index
+
+        Returns:
+            int64 labels
+        """
+        categories = self.categories(name)
+        lookup = np.array([label_map.get(c, -1) for c in categories] + [-1], dtype=np.int64)
+        labels = lookup[self.column(name)]
+        if (labels < 0).any():
+            raise ValueError(f"Unknown or missing values in column '{name}'")
+        return labels
+
+    def to_frame(self, columns: Optional[List[str]] = None) -> pd.DataFrame:
+        """
+        Build a pandas DataFrame (string columns as Categorical).
+
+        Args:
+            columns: Columns to include (all if None)
+
+        Returns:
+            DataFrame
+        """
+        data = {}
+        for name in columns or self.columns:
+            if self._spec(name)["kind"] == "float":
+                data[name] = np.asarray(self.column(name))
+            else:
+                data[name] = pd.Categorical.from_codes(
+                    np.asarray(self.column(name)), categories=self.categories(name)
+                )
+        return pd.DataFrame(data)
+
+    @classmethod
+    def sync(
+        cls,
+        csv_path: Path,
+        store_dir: Optional[Path] = None,
+        chunk_rows: int = CHUNK_ROWS
+    ) -> "CBCColumnStore":
+        """
+        Bring the store up to date with its CSV and open it.
+
+        Assumes the CSV is only appended to by one writer at a time.
+        Concurrent syncs of the same store (API, training processes,
+        pool workers) are serialized with a file lock.
+
+        Args:
+            csv_path: Hospital CSV file
+            store_dir: Store directory (default: next to the CSV)
+            chunk_rows: Rows parsed per chunk
+
+        Returns:
+            Up-to-date store
+        """
+        csv_path = Path(csv_path)
+        store_dir = Path(store_dir) if store_dir is not None else store_dir_for(csv_path)
+        with _sync_lock(store_dir):
+            cls._sync_locked(csv_path, store_dir, chunk_rows)
+        return cls(store_dir)
+
+    @classmethod
+    def _sync_locked(cls, csv_path: Path, store_dir: Path, chunk_rows: int):
+        """Sync with the store lock held (see ``sync``)."""
+        stat = csv_path.stat()
+        size = stat.st_size
+        header = _read_header(csv_path)
+
+        meta = None
+        if (store_dir / META_FILE).exists():
+            with open(store_dir / META_FILE, "r") as f:
+                meta = json.load(f)
+
+        fresh = (
+            meta is not None
+            and meta.get("version") == STORE_VERSION
+            and [spec["name"] for spec in meta["columns"]] == header
+            and meta["csv_offset"] <= size
+        )
+
+        if fresh and meta["csv_mtime"] == stat.st_mtime_ns and meta["csv_offset"] == size:
+            return
+
+        if fresh:
+            offset = meta["csv_offset"]
+            hashes = meta["block_hashes"]
+            if offset < size:
+                # Appended: check the first and last hashed blocks only
+                last = max(len(hashes) - 1, 0) * HASH_BLOCK_BYTES
+                fresh = (
+                    _hash_blocks(csv_path, 0, min(HASH_BLOCK_BYTES, offset)) == hashes[:1]
+                    and _hash_blocks(csv_path, last, offset) == hashes[-1:]
+                )
+            else:
+                # Touched without growing: the whole prefix must be byte-identical
+                fresh = _hash_blocks(csv_path, 0, offset) == hashes
+
+        if fresh and meta["csv_offset"] == size:
+            cls._commit_meta(store_dir, meta, stat.st_mtime_ns)
+            return
+
+        if not fresh:
+            if meta is not None:
+                logger.info(f"CSV rewritten, rebuilding column store for {csv_path}")
+            meta = cls._create(store_dir, header)
+
+        cls._append(store_dir, meta, csv_path, size, stat.st_mtime_ns, chunk_rows)
+
+    @staticmethod
+    def _create(store_dir: Path, header: List[str]) -> Dict:
+        """Start an empty store (removing any previous files)."""
+        store_dir.mkdir(parents=True, exist_ok=True)
+        for path in store_dir.iterdir():
+            path.unlink()
+
+        columns = []
+        for i, name in enumerate(header):
+            spec = {"name": name, "kind": None, "file": f"col_{i}.bin"}
+            if name in FLOAT_COLUMNS:
+                spec["kind"] = "float"
+            elif name in CATEGORY_COLUMNS:
+                spec["kind"] = "category"
+                spec["categories"] = f"col_{i}.categories.json"
+            columns.append(spec)
+
+        return {
+            "version": STORE_VERSION,
+            "num_rows": 0,
+            "csv_offset": 0,
+            "csv_mtime": None,
+            "block_hashes": [],
+            "columns": columns
+        }
+
+    @staticmethod
+    def _append(store_dir: Path, meta: Dict, csv_path: Path, size: int, mtime: int, chunk_rows: int):
+        """Convert CSV rows from ``meta['csv_offset']`` up to ``size``."""
+        columns = meta["columns"]
+        num_rows = meta["num_rows"]
+
+        categories: Dict[str, List[str]] = {}
+        for spec in columns:
+            if spec["kind"] == "category":
+                path = store_dir / spec["categories"]
+                if path.exists():
+                    with open(path, "r") as f:
+                        categories[spec["name"]] = json.load(f)
+                else:
+                    categories[spec["name"]] = []
+
+        # Drop bytes of an interrupted sync beyond the committed row count
+        for spec in columns:
+            path = store_dir / spec["file"]
+            if path.exists():
+                os.truncate(path, num_rows * 4)
+
+        string_columns = {
+            spec["name"]: str for spec in columns
+            if spec["kind"] == "category" or spec["name"] in CATEGORY_COLUMNS
+        }
+
+        with open(csv_path, "rb") as f:
+            if meta["csv_offset"] == 0:
+                reader = pd.read_csv(f, dtype=string_columns, chunksize=chunk_rows)
+            else:
+                f.seek(meta["csv_offset"])
+                reader = pd.read_csv(
+                    f,
+                    header=None,
+                    names=[spec["name"] for spec in columns],
+                    dtype=string_columns,
+                    chunksize=chunk_rows
+                )
+
+            for chunk in reader:
+                for spec in columns:
+                    values = chunk[spec["name"]]
+
+                    # Type of other columns is inferred from the first chunk
+                    if spec["kind"] is None:
+                        spec["kind"] = "float" if pd.api.types.is_numeric_dtype(values) else "category"
+                    if spec["kind"] == "category" and spec["name"] not in categories:
+                        spec["categories"] = f"{Path(spec['file']).stem}.categories.json"
+                        categories[spec["name"]] = []
+
+                    if spec["kind"] == "float":
+                        data = pd.to_numeric(values, errors="coerce").to_numpy().astype("<f4")
+                    else:
+                        # Existing codes stay fixed; new values are appended
+                        known = categories[spec["name"]]
+                        new = pd.Index(values.dropna().unique()).difference(known, sort=False)
+                        known.extend(new.astype(str).tolist())
+                        data = pd.Categorical(values, categories=known).codes.astype("<i4")
+
+                    with open(store_dir / spec["file"], "ab") as out:
+                        out.write(data.tobytes())
+
+                num_rows += len(chunk)
+
+        for spec in columns:
+            if spec["kind"] is None:
+                spec["kind"] = "float"  # no data rows yet
+            if spec["kind"] == "category":
+                with open(store_dir / spec["categories"], "w") as f:
+                    json.dump(categories[spec["name"]], f)
+
+        # Committing meta last makes a sync atomic for readers
+        meta["num_rows"] = num_rows
+        meta["csv_offset"] = size
+        # Only the last (partial) block and the appended bytes are re-hashed
+        hashes = meta["block_hashes"]
+        last = max(len(hashes) - 1, 0) * HASH_BLOCK_BYTES
+        meta["block_hashes"] = hashes[:-1] + _hash_blocks(csv_path, last, size)
+        CBCColumnStore._commit_meta(store_dir, meta, mtime)
+
+        logger.debug(f"Column store {store_dir} synced to {num_rows} rows")
+
+    @staticmethod
+    def _commit_meta(store_dir: Path, meta: Dict, mtime: int):
+        """Atomically write ``meta.json`` with the CSV mtime it matches."""
+        meta["csv_mtime"] = mtime
+        tmp_meta = store_dir / (META_FILE + ".tmp")
+        with open(tmp_meta, "w") as f:
+            json.dump(meta, f)
+        os.replace(tmp_meta, store_dir / META_FILE)
+
+
+def load_cbc_frame(csv_path: Path) -> pd.DataFrame:
+    """
+    Load a hospital CSV through its (synced) column store.
+
+    Args:
+        csv_path: Hospital CSV file
+
+    Returns:
+        DataFrame with the CSV's columns
+    """
+    return CBCColumnStore.sync(csv_path).to_frame()
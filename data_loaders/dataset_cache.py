@@ -0,0 +1,182 @@
+"""In-memory cache of client datasets across federated learning rounds."""
+
+import os
+import hashlib
+import torch
+from pathlib import Path
+from typing import Dict, Optional, Tuple
+from sklearn.preprocessing import StandardScaler
+from config.logging_config import get_logger
+from .cbc_dataset import CBCDataset, CBCBatchLoader, build_cbc_dataloader
+from .streaming_cbc import StreamingCBCDataset, StreamingCBCLoader
+
+logger = get_logger(__name__)
+
+
+class _CacheEntry:
+    """Cached dataset for one CSV file plus the loaders built on it."""
+
+    def __init__(self, stamp: Tuple[int, int], dataset: CBCDataset):
+        self.stamp = stamp
+        self.dataset = dataset
+        self.loaders: Dict[Tuple, torch.utils.data.DataLoader] = {}
+
+
+class ClientDatasetCache:
+    """
+    Per-client CBC dataset cache.
+
+    Each hospital CSV is read and scaled once per simulation and the
+    resulting tensors (and any persistent loader workers) are reused in
+    every later round. An entry is reloaded when the file's mtime or size
+    changes, e.g. after ``/api/hospital/upload`` appends a sample.
+    """
+
+    def __init__(self, use_store: bool = False, out_of_core_bytes: Optional[int] = None):
+        """
+        Initialize an empty cache.
+
+        Args:
+            use_store: Load datasets from the CBC column store
+            out_of_core_bytes: CSVs larger than this are loaded out of core
+                (StreamingCBCDataset); None to always load in memory
+        """
+        self.use_store = use_store
+        self.out_of_core_bytes = out_of_core_bytes
+        self._entries: Dict[Tuple, _CacheEntry] = {}
+
+    @staticmethod
+    def _file_stamp(csv_path: Path) -> Tuple[int, int]:
+        """Get (mtime_ns, size) of a file."""
+        stat = os.stat(csv_path)
+        return stat.st_mtime_ns, stat.st_size
+
+    def get_dataset(
+        self,
+        csv_path: Path,
+        scaler: Optional[StandardScaler] = None,
+        fit_scaler: bool = True
+    ) -> CBCDataset:
+        """
+        Get a cached CBC dataset, loading it if missing or stale.
+
+        Args:
+            csv_path: Path to CSV file
+            scaler: StandardScaler instance
+            fit_scaler: Whether to fit the scaler on this data
+
+        Returns:
+            CBC dataset
+        """
+        return self._get_entry(csv_path, scaler, fit_scaler).dataset
+
+    def get_loader(
+        self,
+        csv_path: Path,
+        batch_size: int = 32,
+        shuffle: bool = True,
+        num_workers: int = 4,
+        scaler: Optional[StandardScaler] = None,
+        fit_scaler: bool = True,
+        batch_loader: bool = False
+    ) -> torch.utils.data.DataLoader:
+        """
+        Get a cached CBC data loader with persistent workers.
+
+        Args:
+            csv_path: Path to CSV file
+            batch_size: Batch size
+            shuffle: Whether to shuffle
+            num_workers: Number of workers
+            scaler: StandardScaler instance
+            fit_scaler: Whether to fit scaler
+            batch_loader: Use the tensor-slicing CBCBatchLoader
+                (``num_workers`` is ignored)
+
+        Returns:
+            DataLoader (or CBCBatchLoader) instance
+        """
+        entry = self._get_entry(csv_path, scaler, fit_scaler)
+        loader_key = (batch_size, shuffle, 0 if batch_loader else num_workers, batch_loader)
+
+        if loader_key not in entry.loaders:
+            if isinstance(entry.dataset, StreamingCBCDataset):
+                loader = StreamingCBCLoader(entry.dataset, batch_size=batch_size, shuffle=shuffle)
+            elif batch_loader:
+                loader = CBCBatchLoader(entry.dataset, batch_size=batch_size, shuffle=shuffle)
+            else:
+                loader = build_cbc_dataloader(
+                    entry.dataset,
+                    batch_size=batch_size,
+                    shuffle=shuffle,
+                    num_workers=num_workers,
+                    persistent_workers=True
+                )
+            entry.loaders[loader_key] = loader
+
+        return entry.loaders[loader_key]
+
+    @staticmethod
+    def _scaler_key(scaler: Optional[StandardScaler], fit_scaler: bool) -> Optional[str]:
+        """
+        Cache key part for the scaler.
+
+        A fitted scaler that is only applied is keyed by its parameters, so
+        a global scaler unpickled afresh in every round (e.g. in pool
+        workers) still hits the cache. A scaler being fitted is keyed by
+        identity.
+        """
+        if scaler is None:
+            return None
+        if not fit_scaler and hasattr(scaler, "mean_"):
+            digest = hashlib.sha256(scaler.mean_.tobytes())
+            digest.update(scaler.scale_.tobytes())
+            return digest.hexdigest()
+        return str(id(scaler))
+
+    def _get_entry(
+        self,
+        csv_path: Path,
+        scaler: Optional[StandardScaler],
+        fit_scaler: bool
+    ) -> _CacheEntry:
+        """Look up an entry, (re)loading it when the file changed."""
+        csv_path = Path(csv_path).resolve()
+        key = (str(csv_path), self._scaler_key(scaler, fit_scaler), fit_scaler)
+        stamp = self._file_stamp(csv_path)
+
+        entry = self._entries.get(key)
+        if entry is not None and entry.stamp == stamp:
+            return entry
+
+        if entry is not None:
+            logger.info(f"Dataset changed on disk, reloading: {csv_path}")
+
+        if self.out_of_core_bytes is not None and stamp[1] > self.out_of_core_bytes:
+            dataset = StreamingCBCDataset(csv_path, scaler=scaler, fit_scaler=fit_scaler)
+        else:
+            dataset = CBCDataset(csv_path, scaler=scaler, fit_scaler=fit_scaler, use_store=self.use_store)
+        entry = _CacheEntry(stamp, dataset)
+        self._entries[key] = entry
+        logger.debug(f"Cached dataset {csv_path} ({len(dataset)} samples)")
+
+        return entry
+
+    def invalidate(self, csv_path: Optional[Path] = None):
+        """
+        Drop cached entries.
+
+        Args:
+            csv_path: Only drop entries for this file (all entries if None)
+        """
+        if csv_path is None:
+            self._entries.clear()
+            return
+
+        path_key = str(Path(csv_path).resolve())
+        for key in [key for key in self._entries if key[0] == path_key]:
+            del self._entries[key]
+
+    def __len__(self) -> int:
+        """Number of cached datasets."""
+        return len(self._entries)
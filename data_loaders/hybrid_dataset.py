@@ -1,16 +1,22 @@
 """PyTorch dataset for hybrid CBC + image data."""
 
+import os
+import json
 import pandas as pd
 import torch
 from torch.utils.data import Dataset
 from pathlib import Path
 from PIL import Image
-from typing import Tuple, Optional, Callable
+from typing import Dict, List, Tuple, Optional, Callable
 import numpy as np
 from sklearn.preprocessing import StandardScaler
 import albumentations as A
 from .cbc_dataset import CBCDataset
-from .image_dataset import ImageDataset
+from .image_dataset import ImageDataset, open_image_shard
+from .cbc_store import CBCColumnStore
+from config.logging_config import get_logger
+
+logger = get_logger(__name__)
 
 
 class HybridDataset(Dataset):
@@ -26,7 +32,10 @@ class HybridDataset(Dataset):
         scaler: Optional[StandardScaler] = None,
         fit_scaler: bool = True,
         transform: Optional[Callable] = None,
-        image_size: int = 224
+        image_size: int = 224,
+        index_path: Optional[Path] = None,
+        shard_dir: Optional[Path] = None,
+        use_store: bool = False
     ):
         """
         Initialize Hybrid dataset.
@@ -38,14 +47,26 @@ class HybridDataset(Dataset):
             fit_scaler: Whether to fit scaler
             transform: Image transformations
             image_size: Target image size
+            index_path: Optional JSON file to persist the image directory
+                index in (e.g. next to the data)
+            shard_dir: Optional pre-resized image shard (see build_image_shards.py)
+            use_store: Read the memory-mapped CBC column store instead of
+                parsing the CSV
         """
         # Load CBC data
-        self.cbc_data = pd.read_csv(csv_path)
-        
-        # Extract features and labels
-        self.cbc_features = self.cbc_data[self.FEATURE_COLUMNS].values
-        self.labels = self.cbc_data["condition"].map(self.LABEL_MAP).values
-        self.patient_ids = self.cbc_data["patient_id"].values
+        if use_store:
+            store = CBCColumnStore.sync(csv_path)
+            self.cbc_data = None
+            self.cbc_features = store.features(self.FEATURE_COLUMNS)
+            self.labels = store.label_codes("condition", self.LABEL_MAP)
+            self.patient_ids = store.decode("patient_id")
+        else:
+            self.cbc_data = pd.read_csv(csv_path)
+            
+            # Extract features and labels
+            self.cbc_features = self.cbc_data[self.FEATURE_COLUMNS].values
+            self.labels = self.cbc_data["condition"].map(self.LABEL_MAP).values
+            self.patient_ids = self.cbc_data["patient_id"].values
         
         # Initialize scaler
         if scaler is None:
@@ -61,16 +82,23 @@ class HybridDataset(Dataset):
         
         # Image directory
         self.image_dir = Path(image_dir)
+        self.image_size = image_size
+        self.shard = open_image_shard(shard_dir, image_size)
+        
+        # Resolve every sample's image once; __getitem__ does no filesystem probing
+        self.index_path = Path(index_path) if index_path is not None else None
+        self.image_index = self._load_image_index()
+        self.image_paths = self._resolve_image_paths()
         
         # Image transform
         if transform is None:
-            self.transform = ImageDataset.get_default_transform(image_size)
+            self.transform = ImageDataset.get_default_transform(image_size, resize=self.shard is None)
         else:
             self.transform = transform
     
     def __len__(self) -> int:
         """Get dataset length."""
-        return len(self.cbc_data)
+        return len(self.labels)
     
     def __getitem__(self, idx: int) -> Tuple[torch.Tensor, torch.Tensor, torch.Tensor]:
         """
@@ -85,40 +113,130 @@ class HybridDataset(Dataset):
         # Get label
         label = torch.LongTensor([self.labels[idx]])[0]
         
-        # Get patient ID and find corresponding image
-        patient_id = self.patient_ids[idx]
-        condition = list(self.LABEL_MAP.keys())[self.labels[idx]]
-        
-        # Try to find image for this patient
-        image_path = self.image_dir / condition / f"{patient_id}.png"
-        if not image_path.exists():
-            image_path = self.image_dir / condition / f"{patient_id}.jpg"
-        
-        # If still doesn't exist, use a placeholder or random image from same class
-        if not image_path.exists():
-            # Find any image from the same class
-            class_dir = self.image_dir / condition
-            if class_dir.exists():
-                available_images = list(class_dir.glob("*.png")) + list(class_dir.glob("*.jpg"))
-                if available_images:
-                    image_path = available_images[0]
+        # Find the image for this patient
+        image_path = self.get_image_path(idx)
         
         # Load and transform image
-        if image_path.exists():
-            image = Image.open(image_path).convert("RGB")
-            image = np.array(image)
+        if image_path is not None:
+            if self.shard is not None:
+                image = self.shard.read(image_path, self.image_dir)
+            else:
+                image = Image.open(image_path).convert("RGB")
+                image = np.array(image)
             
             if self.transform:
                 augmented = self.transform(image=image)
                 image = augmented["image"]
         else:
             # Create blank image if no image found
-            blank_image = np.zeros((224, 224, 3), dtype=np.uint8)
+            blank_image = np.zeros((self.image_size, self.image_size, 3), dtype=np.uint8)
             augmented = self.transform(image=blank_image)
             image = augmented["image"]
         
         return cbc_features, image, label
     
+    def _scan_class_dir(self, condition: str) -> Optional[Dict]:
+        """
+        List one class directory.
+        
+        Returns:
+            Dict with the directory mtime, a patient_id -> file name map
+            (.png preferred over .jpg) and the class fallback image, or
+            None if the directory does not exist
+        """
+        class_dir = self.image_dir / condition
+        if not class_dir.is_dir():
+            return None
+        
+        png, jpg = [], []
+        with os.scandir(class_dir) as entries:
+            for entry in entries:
+                if entry.name.endswith(".png"):
+                    png.append(entry.name)
+                elif entry.name.endswith(".jpg"):
+                    jpg.append(entry.name)
+        png.sort()
+        jpg.sort()
+        
+        files = {}
+        for name in jpg + png:  # png overrides jpg for the same patient
+            files[name.rsplit(".", 1)[0]] = name
+        
+        return {
+            "mtime_ns": class_dir.stat().st_mtime_ns,
+            "files": files,
+            "fallback": (png + jpg)[0] if png or jpg else None
+        }
+    
+    def _load_image_index(self) -> Dict[str, Optional[Dict]]:
+        """
+        Build the per-class image index, reusing a persisted one if fresh.
+        
+        A persisted class entry is reused while its directory mtime is
+        unchanged (adding or removing an image updates it).
+        """
+        stored = {}
+        if self.index_path is not None and self.index_path.exists():
+            with open(self.index_path, "r") as f:
+                stored = json.load(f)
+            if stored.get("image_dir") != str(self.image_dir.resolve()):
+                stored = {}
+        
+        stored_classes = stored.get("classes", {})
+        index = {}
+        changed = not stored
+        for condition in self.LABEL_MAP:
+            class_dir = self.image_dir / condition
+            mtime_ns = class_dir.stat().st_mtime_ns if class_dir.is_dir() else None
+            
+            # A missing directory is stored as None (mtime None)
+            if condition in stored_classes and (stored_classes[condition] or {}).get("mtime_ns") == mtime_ns:
+                index[condition] = stored_classes[condition]
+            else:
+                index[condition] = self._scan_class_dir(condition)
+                changed = True
+        
+        if self.index_path is not None and changed:
+            self.index_path.parent.mkdir(parents=True, exist_ok=True)
+            with open(self.index_path, "w") as f:
+                json.dump({"image_dir": str(self.image_dir.resolve()), "classes": index}, f)
+            logger.debug(f"Saved image index to {self.index_path}")
+        
+        return index
+    
+    def _resolve_image_paths(self) -> List[Optional[Path]]:
+        """Resolve the image of every sample from the index."""
+        conditions = list(self.LABEL_MAP.keys())
+        image_paths = []
+        
+        for patient_id, label in zip(self.patient_ids, self.labels):
+            condition = conditions[label]
+            entry = self.image_index[condition]
+            if entry is None:
+                image_paths.append(None)
+                continue
+            
+            # Patient's own image, else any image from the same class
+            name = entry["files"].get(str(patient_id), entry["fallback"])
+            image_paths.append(self.image_dir / condition / name if name else None)
+        
+        return image_paths
+    
+    def get_image_path(self, idx: int) -> Optional[Path]:
+        """
+        Get the blood smear image for a sample.
+        
+        Falls back to an image of the same class when the patient has
+        none (resolved when the index is built).
+        
+        Args:
+            idx: Sample index
+            
+        Returns:
+            Image path, or None if the class has no images
+        """
+        return self.image_paths[idx]
+    
     def get_scaler(self) -> StandardScaler:
         """Get the fitted scaler."""
         return self.scaler
@@ -133,7 +251,9 @@ def create_hybrid_dataloader(
     scaler: Optional[StandardScaler] = None,
     fit_scaler: bool = True,
     image_size: int = 224,
-    training: bool = True
+    training: bool = True,
+    index_path: Optional[Path] = None,
+    shard_dir: Optional[Path] = None
 ) -> torch.utils.data.DataLoader:
     """
     Create hybrid data loader.
@@ -148,18 +268,22 @@ def create_hybrid_dataloader(
         fit_scaler: Whether to fit scaler
         image_size: Target image size
         training: Whether training mode
+        index_path: Optional JSON file to persist the image index in
+        shard_dir: Optional pre-resized image shard
         
     Returns:
         DataLoader instance
     """
-    transform = ImageDataset.get_default_transform(image_size, training)
+    transform = ImageDataset.get_default_transform(image_size, training, resize=shard_dir is None)
     dataset = HybridDataset(
         csv_path,
         image_dir,
         scaler=scaler,
         fit_scaler=fit_scaler,
         transform=transform,
-        image_size=image_size
+        image_size=image_size,
+        index_path=index_path,
+        shard_dir=shard_dir
     )
     
     dataloader = torch.utils.data.DataLoader(
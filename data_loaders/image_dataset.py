@@ -7,6 +7,7 @@ from PIL import Image
 from typing import Tuple, Optional, Callable
 import albumentations as A
 from albumentations.pytorch import ToTensorV2
+from .image_shards import ImageShard
 
 
 class ImageDataset(Dataset):
@@ -18,7 +19,8 @@ class ImageDataset(Dataset):
         self,
         image_dir: Path,
         transform: Optional[Callable] = None,
-        image_size: int = 224
+        image_size: int = 224,
+        shard_dir: Optional[Path] = None
     ):
         """
         Initialize Image dataset.
@@ -27,13 +29,15 @@ class ImageDataset(Dataset):
             image_dir: Directory containing images organized by class
             transform: Image transformations
             image_size: Target image size
+            shard_dir: Optional pre-resized image shard (see build_image_shards.py)
         """
         self.image_dir = Path(image_dir)
         self.transform = transform
+        self.shard = open_image_shard(shard_dir, image_size)
         
         # If no transform provided, use default
         if self.transform is None:
-            self.transform = self.get_default_transform(image_size)
+            self.transform = self.get_default_transform(image_size, resize=self.shard is None)
         
         # Collect image paths and labels
         self.samples = []
@@ -46,11 +50,19 @@ class ImageDataset(Dataset):
                     self.samples.append((img_path, label_idx))
     
     @staticmethod
-    def get_default_transform(image_size: int = 224, training: bool = True):
-        """Get default image transformations."""
+    def get_default_transform(image_size: int = 224, training: bool = True, resize: bool = True):
+        """
+        Get default image transformations.
+        
+        Args:
+            image_size: Target image size
+            training: Include augmentation
+            resize: Include the resize step (not needed for shard images)
+        """
+        resize_ops = [A.Resize(image_size, image_size)] if resize else []
+        
         if training:
-            transform = A.Compose([
-                A.Resize(image_size, image_size),
+            transform = A.Compose(resize_ops + [
                 A.HorizontalFlip(p=0.5),
                 A.RandomRotate90(p=0.5),
                 A.ShiftScaleRotate(shift_limit=0.1, scale_limit=0.1, rotate_limit=15, p=0.5),
@@ -66,8 +78,7 @@ class ImageDataset(Dataset):
                 ToTensorV2(),
             ])
         else:
-            transform = A.Compose([
-                A.Resize(image_size, image_size),
+            transform = A.Compose(resize_ops + [
                 A.Normalize(mean=[0.485, 0.456, 0.406], std=[0.229, 0.224, 0.225]),
                 ToTensorV2(),
             ])
@@ -88,8 +99,11 @@ class ImageDataset(Dataset):
         img_path, label = self.samples[idx]
         
         # Load image
-        image = Image.open(img_path).convert("RGB")
-        image = np.array(image)
+        if self.shard is not None:
+            image = self.shard.read(img_path, self.image_dir)
+        else:
+            image = Image.open(img_path).convert("RGB")
+            image = np.array(image)
         
         # Apply transformations
         if self.transform:
@@ -104,13 +118,37 @@ class ImageDataset(Dataset):
 import numpy as np
 
 
+def open_image_shard(shard_dir: Optional[Path], image_size: int) -> Optional[ImageShard]:
+    """
+    Open an image shard and check it matches the requested image size.
+    
+    Args:
+        shard_dir: Shard directory (None to decode images from disk)
+        image_size: Image size the dataset expects
+        
+    Returns:
+        ImageShard or None
+    """
+    if shard_dir is None:
+        return None
+    
+    shard = ImageShard(shard_dir)
+    if shard.image_size != image_size:
+        raise ValueError(
+            f"Image shard {shard_dir} has size {shard.image_size}, expected {image_size}"
+        )
+    
+    return shard
+
+
 def create_image_dataloader(
     image_dir: Path,
     batch_size: int = 32,
     shuffle: bool = True,
     num_workers: int = 4,
     image_size: int = 224,
-    training: bool = True
+    training: bool = True,
+    shard_dir: Optional[Path] = None
 ) -> torch.utils.data.DataLoader:
     """
     Create image data loader.
@@ -122,12 +160,13 @@ def create_image_dataloader(
         num_workers: Number of workers
         image_size: Target image size
         training: Whether training mode (affects augmentation)
+        shard_dir: Optional pre-resized image shard
         
     Returns:
         DataLoader instance
     """
-    transform = ImageDataset.get_default_transform(image_size, training)
-    dataset = ImageDataset(image_dir, transform=transform, image_size=image_size)
+    transform = ImageDataset.get_default_transform(image_size, training, resize=shard_dir is None)
+    dataset = ImageDataset(image_dir, transform=transform, image_size=image_size, shard_dir=shard_dir)
     
     dataloader = torch.utils.data.DataLoader(
         dataset,
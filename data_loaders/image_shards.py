@@ -0,0 +1,178 @@
+"""Pre-decoded, pre-resized image shard store."""
+
+import os
+import json
+import numpy as np
+import albumentations as A
+from pathlib import Path
+from PIL import Image
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional
+from config.logging_config import get_logger
+
+logger = get_logger(__name__)
+
+SHARD_FILE = "images.npy"
+INDEX_FILE = "index.json"
+
+
+def list_class_images(image_dir: Path, class_names: List[str]) -> List[Path]:
+    """
+    List the .png/.jpg images of every class directory.
+
+    Args:
+        image_dir: Directory containing one subdirectory per class
+        class_names: Class subdirectory names
+
+    Returns:
+        Image paths
+    """
+    image_paths = []
+    for class_name in class_names:
+        class_dir = Path(image_dir) / class_name
+        if class_dir.is_dir():
+            image_paths.extend(sorted(class_dir.glob("*.png")))
+            image_paths.extend(sorted(class_dir.glob("*.jpg")))
+    return image_paths
+
+
+def build_image_shard(
+    image_dir: Path,
+    shard_dir: Path,
+    image_paths: List[Path],
+    image_size: int = 224,
+    num_workers: int = 4
+) -> "ImageShard":
+    """
+    Decode, convert to RGB and resize images into one uint8 memmap shard.
+
+    Images are resized with the same ``A.Resize`` used by the default
+    transforms, so shard mode yields the same pixels as decoding.
+
+    Args:
+        image_dir: Root image directory (index keys are relative to it)
+        shard_dir: Output directory
+        image_paths: Images to include
+        image_size: Target image size
+        num_workers: Decode threads
+
+    Returns:
+        ImageShard over the written files
+    """
+    image_dir = Path(image_dir)
+    shard_dir = Path(shard_dir)
+    shard_dir.mkdir(parents=True, exist_ok=True)
+
+    resize = A.Resize(image_size, image_size)
+    tmp_shard = shard_dir / (SHARD_FILE + ".tmp")
+    images = np.lib.format.open_memmap(
+        tmp_shard,
+        mode="w+",
+        dtype=np.uint8,
+        shape=(len(image_paths), image_size, image_size, 3)
+    )
+
+    def load(row: int):
+        image = np.array(Image.open(image_paths[row]).convert("RGB"))
+        images[row] = resize(image=image)["image"]
+
+    with ThreadPoolExecutor(max_workers=max(1, num_workers)) as executor:
+        list(executor.map(load, range(len(image_paths))))
+
+    images.flush()
+    del images
+
+    index = {
+        "image_size": image_size,
+        "rows": {
+            Path(path).relative_to(image_dir).as_posix(): row
+            for row, path in enumerate(image_paths)
+        }
+    }
+    tmp_index = shard_dir / (INDEX_FILE + ".tmp")
+    with open(tmp_index, "w") as f:
+        json.dump(index, f)
+
+    os.replace(tmp_shard, shard_dir / SHARD_FILE)
+    os.replace(tmp_index, shard_dir / INDEX_FILE)
+
+    logger.info(f"Wrote {len(image_paths)} images ({image_size}px) to {shard_dir}")
+
+    return ImageShard(shard_dir)
+
+
+class ImageShard:
+    """
+    Read-only view of an image shard.
+
+    The shard is memory-mapped lazily in each process, so datasets holding
+    an ImageShard can be sent to DataLoader workers without copying the
+    pixel data.
+    """
+
+    def __init__(self, shard_dir: Path):
+        """
+        Open an image shard.
+
+        Args:
+            shard_dir: Directory written by ``build_image_shard``
+        """
+        self.shard_dir = Path(shard_dir)
+
+        with open(self.shard_dir / INDEX_FILE, "r") as f:
+            index = json.load(f)
+
+        self.image_size: int = index["image_size"]
+        self.rows: Dict[str, int] = index["rows"]
+        self._images: Optional[np.ndarray] = None
+
+    @property
+    def images(self) -> np.ndarray:
+        """Memory-mapped (N, H, W, 3) uint8 array."""
+        if self._images is None:
+            self._images = np.load(self.shard_dir / SHARD_FILE, mmap_mode="r")
+        return self._images
+
+    def __getstate__(self) -> Dict:
+        state = self.__dict__.copy()
+        state["_images"] = None
+        return state
+
+    def __len__(self) -> int:
+        """Number of images."""
+        return len(self.rows)
+
+    def __contains__(self, key: str) -> bool:
+        return key in self.rows
+
+    def get(self, key: str) -> np.ndarray:
+        """
+        Get an image without decoding or copying.
+
+        Args:
+            key: Image path relative to the image directory (posix)
+
+        Returns:
+            (H, W, 3) uint8 view into the shard
+        """
+        return self.images[self.rows[key]]
+
+    def read(self, image_path: Path, image_dir: Path) -> np.ndarray:
+        """
+        Read an image from the shard, decoding it from disk if absent.
+
+        Images added after the shard was built are resized on the fly.
+
+        Args:
+            image_path: Image file path
+            image_dir: Root image directory the shard was built from
+
+        Returns:
+            (H, W, 3) uint8 image at the shard's size
+        """
+        key = Path(image_path).relative_to(image_dir).as_posix()
+        if key in self.rows:
+            return self.get(key)
+
+        image = np.array(Image.open(image_path).convert("RGB"))
+        return A.Resize(self.image_size, self.image_size)(image=image)["image"]
@@ -0,0 +1,338 @@
+"""Non-IID client partitions over one shared base dataset."""
+
+import os
+import json
+import numpy as np
+import torch
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+from config.logging_config import get_logger
+
+logger = get_logger(__name__)
+
+META_FILE = "partition.json"
+INDICES_FILE = "indices.npy"
+OFFSETS_FILE = "offsets.npy"
+
+PARTITION_METHODS = ("dirichlet", "quantity", "feature")
+
+
+def dirichlet_label_partition(
+    labels: np.ndarray,
+    num_clients: int,
+    alpha: float = 0.5,
+    seed: int = 0
+) -> List[np.ndarray]:
+    """
+    Label-skew partition: each class is split over clients by Dirichlet(alpha).
+
+    Small ``alpha`` gives clients dominated by a few classes; large
+    ``alpha`` approaches an IID split.
+
+    Args:
+        labels: Label of every base row
+        num_clients: Number of clients
+        alpha: Dirichlet concentration
+        seed: Random seed
+
+    Returns:
+        Row indices of each client
+    """
+    rng = np.random.default_rng(seed)
+    labels = np.asarray(labels)
+    parts: List[List[np.ndarray]] = [[] for _ in range(num_clients)]
+
+    for label in np.unique(labels):
+        rows = rng.permutation(np.flatnonzero(labels == label))
+        proportions = rng.dirichlet(np.full(num_clients, alpha))
+        cuts = (np.cumsum(proportions)[:-1] * len(rows)).astype(np.int64)
+        for client, split in enumerate(np.split(rows, cuts)):
+            parts[client].append(split)
+
+    return [np.concatenate(p) for p in parts]
+
+
+def quantity_skew_partition(
+    num_rows: int,
+    num_clients: int,
+    alpha: float = 0.5,
+    min_size: int = 1,
+    seed: int = 0
+) -> List[np.ndarray]:
+    """
+    Quantity-skew partition: client sizes follow Dirichlet(alpha) proportions.
+
+    Args:
+        num_rows: Number of base rows
+        num_clients: Number of clients
+        alpha: Dirichlet concentration (small = very unequal sizes)
+        min_size: Rows every client gets at least
+        seed: Random seed
+
+    Returns:
+        Row indices of each client
+    """
+    if num_clients * min_size > num_rows:
+        raise ValueError(f"Cannot give {num_clients} clients {min_size} of {num_rows} rows each")
+
+    rng = np.random.default_rng(seed)
+    proportions = rng.dirichlet(np.full(num_clients, alpha))
+    sizes = min_size + rng.multinomial(num_rows - num_clients * min_size, proportions)
+
+    return np.split(rng.permutation(num_rows), np.cumsum(sizes)[:-1])
+
+
+def feature_shift_partition(
+    features: np.ndarray,
+    num_clients: int,
+    feature: int = 0,
+    noise: float = 0.1,
+    seed: int = 0
+) -> List[np.ndarray]:
+    """
+    Feature-shift partition: clients get contiguous ranges of one feature.
+
+    Rows are ordered by ``feature`` plus Gaussian noise (in units of the
+    feature's standard deviation) and cut into equal parts, so each client
+    covers a shifted slice of the covariate distribution.
+
+    Args:
+        features: Base feature matrix (rows, features)
+        num_clients: Number of clients
+        feature: Column to shift on
+        noise: Noise scale; larger values blur the client ranges
+        seed: Random seed
+
+    Returns:
+        Row indices of each client
+    """
+    rng = np.random.default_rng(seed)
+    column = np.asarray(features[:, feature], dtype=np.float64)
+    key = column + noise * column.std() * rng.standard_normal(len(column))
+
+    return np.array_split(np.argsort(key, kind="stable"), num_clients)
+
+
+class ClientPartition:
+    """
+    Index files assigning base dataset rows to simulated clients.
+
+    All client indices live in one ``indices.npy`` (sorted within each
+    client) with ``offsets.npy`` marking client boundaries, so any number
+    of clients costs one index entry per row and is opened memory-mapped.
+    """
+
+    def __init__(self, partition_dir: Path):
+        """
+        Open a saved partition.
+
+        Args:
+            partition_dir: Directory written by ``ClientPartition.save``
+        """
+        self.partition_dir = Path(partition_dir)
+        with open(self.partition_dir / META_FILE, "r") as f:
+            self.meta = json.load(f)
+
+        self.indices = np.load(self.partition_dir / INDICES_FILE, mmap_mode="r")
+        self.offsets = np.load(self.partition_dir / OFFSETS_FILE)
+
+    @classmethod
+    def save(
+        cls,
+        partition_dir: Path,
+        client_indices: Sequence[np.ndarray],
+        num_rows: int,
+        meta: Optional[Dict] = None
+    ) -> "ClientPartition":
+        """
+        Write client index files.
+
+        Args:
+            partition_dir: Output directory
+            client_indices: Row indices of each client
+            num_rows: Number of rows in the base dataset
+            meta: Extra metadata (method, parameters, base dataset)
+
+        Returns:
+            The opened partition
+        """
+        partition_dir = Path(partition_dir)
+        partition_dir.mkdir(parents=True, exist_ok=True)
+
+        dtype = np.int32 if num_rows < 2 ** 31 else np.int64
+        sizes = np.array([len(idx) for idx in client_indices], dtype=np.int64)
+        offsets = np.concatenate([[0], np.cumsum(sizes)])
+        indices = np.concatenate([np.sort(idx) for idx in client_indices]).astype(dtype)
+
+        np.save(partition_dir / INDICES_FILE, indices)
+        np.save(partition_dir / OFFSETS_FILE, offsets)
+
+        # Metadata last: a directory without it is an incomplete partition
+        tmp_path = partition_dir / (META_FILE + ".tmp")
+        with open(tmp_path, "w") as f:
+            json.dump({
+                **(meta or {}),
+                "num_clients": len(client_indices),
+                "num_rows": int(num_rows)
+            }, f, indent=2)
+        os.replace(tmp_path, partition_dir / META_FILE)
+
+        logger.info(f"Saved {len(client_indices)}-client partition to {partition_dir}")
+
+        return cls(partition_dir)
+
+    @property
+    def num_clients(self) -> int:
+        """Number of clients."""
+        return len(self.offsets) - 1
+
+    def client_sizes(self) -> np.ndarray:
+        """Number of rows of every client."""
+        return np.diff(self.offsets)
+
+    def client_indices(self, client: int) -> np.ndarray:
+        """Base row indices of a client (memory-mapped view)."""
+        if not 0 <= client < self.num_clients:
+            raise ValueError(f"Unknown client {client} (partition has {self.num_clients})")
+        return self.indices[self.offsets[client]:self.offsets[client + 1]]
+
+    def label_counts(self, labels: np.ndarray, num_classes: int) -> np.ndarray:
+        """
+        Per-client label histogram.
+
+        Args:
+            labels: Label of every base row
+            num_classes: Number of classes
+
+        Returns:
+            Array of shape (num_clients, num_classes)
+        """
+        clients = np.repeat(np.arange(self.num_clients), self.client_sizes())
+        flat = clients * num_classes + np.asarray(labels)[self.indices]
+        return np.bincount(flat, minlength=self.num_clients * num_classes).reshape(-1, num_classes)
+
+
+def _gather(array, idx: np.ndarray) -> torch.Tensor:
+    """Gather rows from a tensor or (memory-mapped) numpy array."""
+    if isinstance(array, torch.Tensor):
+        return array[torch.from_numpy(idx.astype(np.int64))]
+    return torch.from_numpy(np.asarray(array[idx]))
+
+
+class ClientSubset(torch.utils.data.Dataset):
+    """One client's view of a shared base dataset (no rows are copied)."""
+
+    def __init__(self, base, indices: np.ndarray):
+        """
+        Initialize client subset.
+
+        Args:
+            base: Dataset with ``features`` and ``labels`` (tensors or
+                memory-mapped arrays, e.g. StreamingCBCDataset)
+            indices: Base row indices of the client
+        """
+        self.base = base
+        self.indices = indices
+
+    def __len__(self) -> int:
+        """Get dataset length."""
+        return len(self.indices)
+
+    def __getitem__(self, idx: int) -> Tuple[torch.Tensor, torch.Tensor]:
+        """
+        Get item by index.
+
+        Returns:
+            Tuple of (features, label)
+        """
+        return self.base[int(self.indices[idx])]
+
+
+class ClientBatchLoader:
+    """
+    Batch loader over a client partition of a shared base dataset.
+
+    Each batch is one gather from the base features and labels, with the
+    batch indices sorted for memory-map locality. Like CBCBatchLoader it
+    exposes ``dataset`` and ``__len__`` for ``LocalTrainer``.
+    """
+
+    def __init__(
+        self,
+        dataset: ClientSubset,
+        batch_size: int = 32,
+        shuffle: bool = True,
+        generator: Optional[torch.Generator] = None
+    ):
+        """
+        Initialize client batch loader.
+
+        Args:
+            dataset: Client subset
+            batch_size: Batch size
+            shuffle: Whether to reshuffle every epoch
+            generator: Optional RNG for shuffling (global RNG if None)
+        """
+        self.dataset = dataset
+        self.batch_size = batch_size
+        self.shuffle = shuffle
+        self.generator = generator
+
+    def __len__(self) -> int:
+        """Number of batches per epoch."""
+        return (len(self.dataset) + self.batch_size - 1) // self.batch_size
+
+    def __iter__(self) -> Iterator[Tuple[torch.Tensor, torch.Tensor]]:
+        """Yield (features, labels) batches."""
+        indices = self.dataset.indices
+        n = len(indices)
+        if self.shuffle:
+            order = torch.randperm(n, generator=self.generator).numpy()
+
+        base = self.dataset.base
+        for start in range(0, n, self.batch_size):
+            if self.shuffle:
+                idx = np.sort(indices[order[start:start + self.batch_size]])
+            else:
+                idx = np.asarray(indices[start:start + self.batch_size])
+            yield _gather(base.features, idx), _gather(base.labels, idx).long()
+
+
+def partition_dataset(
+    base,
+    partition_dir: Path,
+    num_clients: int,
+    method: str = "dirichlet",
+    alpha: float = 0.5,
+    feature: int = 0,
+    seed: int = 0,
+    meta: Optional[Dict] = None
+) -> ClientPartition:
+    """
+    Partition a base dataset into clients and save the index files.
+
+    Args:
+        base: Dataset with ``features`` and ``labels``
+        partition_dir: Output directory
+        num_clients: Number of clients
+        method: "dirichlet" (label skew), "quantity" or "feature" (shift)
+        alpha: Dirichlet concentration (dirichlet and quantity)
+        feature: Feature column (feature shift)
+        seed: Random seed
+        meta: Extra metadata to record (e.g. base dataset path)
+
+    Returns:
+        The saved partition
+    """
+    labels = np.asarray(base.labels)
+    if method == "dirichlet":
+        client_indices = dirichlet_label_partition(labels, num_clients, alpha=alpha, seed=seed)
+    elif method == "quantity":
+        client_indices = quantity_skew_partition(len(labels), num_clients, alpha=alpha, seed=seed)
+    elif method == "feature":
+        client_indices = feature_shift_partition(base.features, num_clients, feature=feature, seed=seed)
+    else:
+        raise ValueError(f"Unknown partition method: {method} (expected one of {PARTITION_METHODS})")
+
+    params = {"method": method, "alpha": alpha, "feature": feature, "seed": seed}
+    return ClientPartition.save(partition_dir, client_indices, len(labels), {**params, **(meta or {})})
@@ -0,0 +1,62 @@
+"""Serialization of fitted StandardScaler parameters."""
+
+import os
+import json
+import numpy as np
+from pathlib import Path
+from typing import Dict, Optional
+from sklearn.preprocessing import StandardScaler
+
+
+def scaler_to_dict(scaler: StandardScaler) -> Dict:
+    """
+    Get the fitted parameters of a scaler as a JSON-serializable dict.
+
+    Args:
+        scaler: Fitted StandardScaler
+
+    Returns:
+        Dict with mean, var, scale and n_samples_seen
+    """
+    return {
+        "mean": scaler.mean_.tolist(),
+        "var": scaler.var_.tolist(),
+        "scale": scaler.scale_.tolist(),
+        "n_samples_seen": int(np.max(scaler.n_samples_seen_))
+    }
+
+
+def scaler_from_dict(state: Dict, scaler: Optional[StandardScaler] = None) -> StandardScaler:
+    """
+    Load fitted parameters into a scaler.
+
+    Args:
+        state: Dict from ``scaler_to_dict``
+        scaler: Scaler to restore into (new one if None)
+
+    Returns:
+        Fitted scaler
+    """
+    scaler = scaler if scaler is not None else StandardScaler()
+    scaler.mean_ = np.array(state["mean"], dtype=np.float64)
+    scaler.var_ = np.array(state["var"], dtype=np.float64)
+    scaler.scale_ = np.array(state["scale"], dtype=np.float64)
+    scaler.n_samples_seen_ = state["n_samples_seen"]
+    scaler.n_features_in_ = len(state["mean"])
+    return scaler
+
+
+def save_scaler(scaler: StandardScaler, path: Path):
+    """Atomically write a fitted scaler to a JSON file."""
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_name(path.name + ".tmp")
+    with open(tmp_path, "w") as f:
+        json.dump(scaler_to_dict(scaler), f, indent=2)
+    os.replace(tmp_path, path)
+
+
+def load_scaler(path: Path) -> StandardScaler:
+    """Read a fitted scaler from a JSON file."""
+    with open(path, "r") as f:
+        return scaler_from_dict(json.load(f))
@@ -0,0 +1,278 @@
+"""Out-of-core CBC loading for hospital CSVs larger than memory."""
+
+import os
+import json
+import numpy as np
+import pandas as pd
+import torch
+from pathlib import Path
+from typing import Dict, Iterator, Optional, Tuple
+from sklearn.preprocessing import StandardScaler
+from config.logging_config import get_logger
+from .cbc_dataset import CBCDataset
+from .scaler_io import scaler_to_dict, scaler_from_dict
+
+logger = get_logger(__name__)
+
+# Rows held in memory at once while fitting, scaling and batching
+CHUNK_ROWS = 500_000
+
+META_FILE = "meta.json"
+FEATURES_FILE = "features.f32"
+LABELS_FILE = "labels.i8"
+
+
+def _read_chunks(csv_path: Path, chunk_rows: int) -> Iterator[pd.DataFrame]:
+    """Iterate feature and label columns of a CSV in chunks."""
+    return pd.read_csv(
+        csv_path,
+        usecols=CBCDataset.FEATURE_COLUMNS + ["condition"],
+        chunksize=chunk_rows
+    )
+
+
+def fit_scaler_chunked(
+    csv_path: Path,
+    scaler: Optional[StandardScaler] = None,
+    chunk_rows: int = CHUNK_ROWS
+) -> StandardScaler:
+    """
+    Fit a StandardScaler on a CSV with ``partial_fit`` over chunks.
+
+    Args:
+        csv_path: Path to CSV file
+        scaler: Scaler to fit (new one if None)
+        chunk_rows: Rows per chunk
+
+    Returns:
+        Fitted scaler
+    """
+    scaler = scaler if scaler is not None else StandardScaler()
+    for chunk in _read_chunks(csv_path, chunk_rows):
+        scaler.partial_fit(chunk[CBCDataset.FEATURE_COLUMNS].to_numpy(dtype=np.float64))
+    return scaler
+
+
+class StreamingCBCDataset:
+    """
+    CBC data scaled into memory-mapped files, built chunk by chunk.
+
+    The CSV is read twice in chunks of ``chunk_rows`` rows: once to fit the
+    scaler incrementally (skipped when an already fitted scaler is given)
+    and once to write scaled float32 features and int8 labels to
+    ``<stem>_scaled/`` next to the CSV. Peak memory is bounded by the chunk
+    size. The files, and the fitted scaler, are reused while the CSV and
+    scaler are unchanged.
+    """
+
+    FEATURE_COLUMNS = CBCDataset.FEATURE_COLUMNS
+    LABEL_MAP = CBCDataset.LABEL_MAP
+
+    def __init__(
+        self,
+        csv_path: Path,
+        scaler: Optional[StandardScaler] = None,
+        fit_scaler: bool = True,
+        chunk_rows: int = CHUNK_ROWS,
+        cache_dir: Optional[Path] = None
+    ):
+        """
+        Initialize streaming dataset.
+
+        Args:
+            csv_path: Path to CSV file
+            scaler: StandardScaler instance
+            fit_scaler: Whether to fit the scaler on this data
+            chunk_rows: Rows per chunk
+            cache_dir: Directory for the scaled files (default: next to the CSV)
+        """
+        csv_path = Path(csv_path)
+        self.csv_path = csv_path
+        self.chunk_rows = chunk_rows
+        self.cache_dir = Path(cache_dir) if cache_dir else csv_path.parent / f"{csv_path.stem}_scaled"
+        self.scaler = scaler if scaler is not None else StandardScaler()
+
+        stat = csv_path.stat()
+        csv_stamp = [stat.st_mtime_ns, stat.st_size]
+        meta = self._read_meta()
+
+        reusable = meta is not None and meta["csv_stamp"] == csv_stamp
+        if reusable and fit_scaler:
+            scaler_from_dict(meta["scaler"], self.scaler)
+        elif reusable:
+            reusable = meta["scaler"] == scaler_to_dict(self.scaler)
+
+        if reusable:
+            self.num_rows = meta["num_rows"]
+            logger.debug(f"Reusing scaled features in {self.cache_dir}")
+        else:
+            if fit_scaler:
+                fit_scaler_chunked(csv_path, self.scaler, chunk_rows)
+            self.num_rows = self._write_scaled()
+            self._write_meta({
+                "csv_stamp": csv_stamp,
+                "num_rows": self.num_rows,
+                "scaler": scaler_to_dict(self.scaler)
+            })
+
+        self.features = self._open(FEATURES_FILE, np.float32, (self.num_rows, len(self.FEATURE_COLUMNS)))
+        self.labels = self._open(LABELS_FILE, np.int8, (self.num_rows,))
+
+    def _read_meta(self) -> Optional[Dict]:
+        meta_path = self.cache_dir / META_FILE
+        if not meta_path.exists():
+            return None
+        with open(meta_path, "r") as f:
+            return json.load(f)
+
+    def _write_meta(self, meta: Dict):
+        tmp_path = self.cache_dir / (META_FILE + ".tmp")
+        with open(tmp_path, "w") as f:
+            json.dump(meta, f)
+        os.replace(tmp_path, self.cache_dir / META_FILE)
+
+    def _open(self, name: str, dtype, shape: Tuple[int, ...]) -> np.ndarray:
+        if self.num_rows == 0:
+            return np.empty(shape, dtype=dtype)
+        return np.memmap(self.cache_dir / name, dtype=dtype, mode="r", shape=shape)
+
+    def _write_scaled(self) -> int:
+        """Scale the CSV chunk by chunk into the feature/label files."""
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        meta_path = self.cache_dir / META_FILE
+        if meta_path.exists():
+            meta_path.unlink()  # invalid until the new files are complete
+
+        num_rows = 0
+        with open(self.cache_dir / FEATURES_FILE, "wb") as features_file, \
+                open(self.cache_dir / LABELS_FILE, "wb") as labels_file:
+            for chunk in _read_chunks(self.csv_path, self.chunk_rows):
+                labels = chunk["condition"].map(self.LABEL_MAP)
+                if labels.isna().any():
+                    raise ValueError(f"Unknown condition labels in {self.csv_path}")
+
+                features = self.scaler.transform(chunk[self.FEATURE_COLUMNS].to_numpy(dtype=np.float64))
+                features_file.write(features.astype(np.float32).tobytes())
+                labels_file.write(labels.to_numpy(dtype=np.int8).tobytes())
+                num_rows += len(chunk)
+
+        logger.info(f"Wrote {num_rows} scaled rows to {self.cache_dir}")
+
+        return num_rows
+
+    def __len__(self) -> int:
+        """Get dataset length."""
+        return self.num_rows
+
+    def __getitem__(self, idx: int) -> Tuple[torch.Tensor, torch.Tensor]:
+        """
+        Get item by index.
+
+        Returns:
+            Tuple of (features, label)
+        """
+        return torch.from_numpy(np.array(self.features[idx])), torch.tensor(int(self.labels[idx]))
+
+    def get_scaler(self) -> StandardScaler:
+        """Get the fitted scaler."""
+        return self.scaler
+
+
+class StreamingCBCLoader:
+    """
+    Batch loader streaming over a StreamingCBCDataset.
+
+    Rows are read one block of ``block_rows`` at a time. With shuffling,
+    the block order is permuted and rows are shuffled within each block,
+    so memory stays bounded by the block size. Like CBCBatchLoader it
+    exposes ``dataset`` and ``__len__`` for ``LocalTrainer``.
+    """
+
+    def __init__(
+        self,
+        dataset: StreamingCBCDataset,
+        batch_size: int = 32,
+        shuffle: bool = True,
+        block_rows: int = CHUNK_ROWS,
+        generator: Optional[torch.Generator] = None
+    ):
+        """
+        Initialize streaming loader.
+
+        Args:
+            dataset: Streaming dataset
+            batch_size: Batch size
+            shuffle: Whether to shuffle every epoch
+            block_rows: Rows loaded into memory at once
+            generator: Optional RNG for shuffling (global RNG if None)
+        """
+        self.dataset = dataset
+        self.batch_size = batch_size
+        self.shuffle = shuffle
+        # Whole batches per block, so only the final batch can be short
+        self.block_rows = max(batch_size, block_rows - block_rows % batch_size)
+        self.generator = generator
+
+    def __len__(self) -> int:
+        """Number of batches per epoch."""
+        return (len(self.dataset) + self.batch_size - 1) // self.batch_size
+
+    def __iter__(self) -> Iterator[Tuple[torch.Tensor, torch.Tensor]]:
+        """Yield (features, labels) batches."""
+        n = len(self.dataset)
+        starts = torch.arange(0, n, self.block_rows)
+        if self.shuffle:
+            starts = starts[torch.randperm(len(starts), generator=self.generator)]
+
+        carry_features, carry_labels = None, None
+        for start in starts.tolist():
+            end = min(start + self.block_rows, n)
+            features = torch.from_numpy(np.array(self.dataset.features[start:end]))
+            labels = torch.from_numpy(self.dataset.labels[start:end].astype(np.int64))
+
+            if self.shuffle:
+                order = torch.randperm(end - start, generator=self.generator)
+                features, labels = features[order], labels[order]
+
+            # The short last block may land anywhere; merge its rows forward
+            if carry_features is not None:
+                features = torch.cat([carry_features, features])
+                labels = torch.cat([carry_labels, labels])
+                carry_features, carry_labels = None, None
+
+            full = (len(labels) // self.batch_size) * self.batch_size
+            for i in range(0, full, self.batch_size):
+                yield features[i:i + self.batch_size], labels[i:i + self.batch_size]
+
+            if full < len(labels):
+                carry_features, carry_labels = features[full:], labels[full:]
+
+        if carry_features is not None:
+            yield carry_features, carry_labels
+
+
+def create_streaming_cbc_loader(
+    csv_path: Path,
+    batch_size: int = 32,
+    shuffle: bool = True,
+    scaler: Optional[StandardScaler] = None,
+    fit_scaler: bool = True,
+    chunk_rows: int = CHUNK_ROWS
+) -> StreamingCBCLoader:
+    """
+    Create an out-of-core CBC loader.
+
+    Args:
+        csv_path: Path to CSV file
+        batch_size: Batch size
+        shuffle: Whether to shuffle
+        scaler: StandardScaler instance
+        fit_scaler: Whether to fit scaler
+        chunk_rows: Rows held in memory at once
+
+    Returns:
+        StreamingCBCLoader instance
+    """
+    dataset = StreamingCBCDataset(csv_path, scaler=scaler, fit_scaler=fit_scaler, chunk_rows=chunk_rows)
+
+    return StreamingCBCLoader(dataset, batch_size=batch_size, shuffle=shuffle, block_rows=chunk_rows)
@@ -3,6 +3,7 @@
 import pandas as pd
 import numpy as np
 from pathlib import Path
+from data_loaders.cbc_store import load_cbc_frame
 
 print("=" * 70)
 print("MedChain-FL Functional Demonstration")
@@ -10,9 +11,9 @@ print("=" * 70)
 
 # Demo 1: Load and analyze data
 print("\n[DEMO 1] Loading hospital data...")
-df_italy = pd.read_csv("data/hospital_italy/cbc_data.csv")
-df_pakistan = pd.read_csv("data/hospital_pakistan/cbc_data.csv")
-df_usa = pd.read_csv("data/hospital_usa/cbc_data.csv")
+df_italy = load_cbc_frame("data/hospital_italy/cbc_data.csv")
+df_pakistan = load_cbc_frame("data/hospital_pakistan/cbc_data.csv")
+df_usa = load_cbc_frame("data/hospital_usa/cbc_data.csv")
 
 print(f"✓ Loaded data from 3 hospitals:")
 print(f"  - Italy: {len(df_italy)} samples")
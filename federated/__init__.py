@@ -2,5 +2,6 @@
 
 from .aggregator import FederatedAggregator
 from .orchestrator import FederatedOrchestrator
+from .feature_stats import FeatureStats, compute_feature_stats
 
-__all__ = ["FederatedAggregator", "FederatedOrchestrator"]
+__all__ = ["FederatedAggregator", "FederatedOrchestrator", "FeatureStats", "compute_feature_stats"]
@@ -4,6 +4,7 @@ import torch
 import numpy as np
 from typing import List, Dict
 from config.logging_config import get_logger
+from .flat_buffer import FlatStateLayout
 
 logger = get_logger(__name__)
 
@@ -11,15 +12,134 @@ logger = get_logger(__name__)
 class FederatedAggregator:
     """Federated learning model aggregator."""
     
-    def __init__(self, aggregation_method: str = "fedavg"):
+    def __init__(self, aggregation_method: str = "fedavg", use_flat_buffer: bool = False):
         """
         Initialize aggregator.
         
         Args:
             aggregation_method: Aggregation method (fedavg, fedprox, weighted)
+            use_flat_buffer: Pack client weights into flat buffers and reduce
+                them with a single fused weighted sum
         """
         self.aggregation_method = aggregation_method
-        logger.info(f"Initialized aggregator with method: {aggregation_method}")
+        self.use_flat_buffer = use_flat_buffer
+        self._layout = None
+        self._matrices = None
+        
+        # Streaming aggregation state
+        self._running_float = None
+        self._running_int = None
+        self._scratch = None
+        self._total_weight = 0.0
+        self._num_accumulated = 0
+        self._round_open = False
+        
+        logger.info(
+            f"Initialized aggregator with method: {aggregation_method}"
+            f"{' (flat buffer)' if use_flat_buffer else ''}"
+        )
+    
+    def get_layout(self, state_dict: Dict) -> FlatStateLayout:
+        """
+        Get the cached flat layout for a state dict, rebuilding on mismatch.
+        
+        Args:
+            state_dict: Reference model state dict
+            
+        Returns:
+            Flat state layout
+        """
+        if self._layout is None or not self._layout.matches(state_dict):
+            self._layout = FlatStateLayout(state_dict)
+            self._matrices = None
+            logger.debug(
+                f"Built flat layout: {len(self._layout.keys)} tensors, "
+                f"{self._layout.float_numel} float / {self._layout.int_numel} int elements"
+            )
+        return self._layout
+    
+    def _flat_weighted_sum(
+        self,
+        client_weights: List[Dict],
+        normalized_weights: List[float]
+    ) -> Dict:
+        """Reduce all clients with one weighted sum over packed flat buffers."""
+        layout = self.get_layout(client_weights[0])
+        if layout.device is None:
+            # Tensors on several devices cannot share one buffer
+            return self._loop_weighted_sum(client_weights, normalized_weights)
+        
+        # Reuse packing matrices across rounds to avoid re-faulting fresh pages
+        if self._matrices is None or self._matrices[0].shape[0] != len(client_weights):
+            self._matrices = layout.allocate(len(client_weights))
+        float_matrix, int_matrix = layout.pack_many(client_weights, out=self._matrices)
+        
+        return self.reduce_flat(float_matrix, int_matrix, normalized_weights)
+    
+    def reduce_flat(
+        self,
+        float_matrix: torch.Tensor,
+        int_matrix: torch.Tensor,
+        normalized_weights: List[float]
+    ) -> Dict:
+        """
+        Reduce packed (num_clients, numel) client matrices into a state dict.
+        
+        The matrices must follow the layout returned by ``get_layout``.
+        
+        Args:
+            float_matrix: Packed float sections, one row per client
+            int_matrix: Packed integer sections, one row per client
+            normalized_weights: Normalized client weights
+            
+        Returns:
+            Aggregated model weights (float entries are views of one buffer)
+        """
+        layout = self._layout
+        float_coeffs = torch.tensor(normalized_weights, dtype=layout.float_dtype, device=layout.device)
+        int_coeffs = torch.tensor(normalized_weights, dtype=layout.INT_DTYPE, device=layout.device)
+        
+        float_flat = torch.mv(float_matrix.t(), float_coeffs)
+        int_flat = torch.mv(int_matrix.t(), int_coeffs)
+        
+        return layout.unpack(float_flat, int_flat)
+    
+    def _loop_weighted_sum(
+        self,
+        client_weights: List[Dict],
+        normalized_weights: List[float]
+    ) -> Dict:
+        """Reduce clients key by key."""
+        aggregated_weights = {}
+        
+        # Get the structure from first client; integer buffers
+        # (e.g. num_batches_tracked) are accumulated in float64
+        for key, value in client_weights[0].items():
+            if value.is_floating_point():
+                aggregated_weights[key] = torch.zeros_like(value)
+            else:
+                aggregated_weights[key] = torch.zeros_like(value, dtype=torch.float64)
+        
+        for client_weight, weight in zip(client_weights, normalized_weights):
+            for key in aggregated_weights.keys():
+                aggregated_weights[key] += client_weight[key] * weight
+        
+        # Cast integer buffers back to their original dtype
+        for key, value in client_weights[0].items():
+            if not value.is_floating_point():
+                aggregated_weights[key] = aggregated_weights[key].round().to(value.dtype)
+        
+        return aggregated_weights
+    
+    def _weighted_sum(
+        self,
+        client_weights: List[Dict],
+        normalized_weights: List[float]
+    ) -> Dict:
+        """Weighted sum of client weights using the configured engine."""
+        if self.use_flat_buffer:
+            return self._flat_weighted_sum(client_weights, normalized_weights)
+        return self._loop_weighted_sum(client_weights, normalized_weights)
     
     def federated_averaging(
         self,
@@ -38,19 +158,9 @@ class FederatedAggregator:
         """
         total_size = sum(client_data_sizes)
         
-        # Initialize aggregated weights with zeros
-        aggregated_weights = {}
-        
-        # Get the structure from first client
-        for key in client_weights[0].keys():
-            aggregated_weights[key] = torch.zeros_like(client_weights[0][key])
-        
         # Weighted average
-        for client_weight, data_size in zip(client_weights, client_data_sizes):
-            weight = data_size / total_size
-            
-            for key in aggregated_weights.keys():
-                aggregated_weights[key] += client_weight[key] * weight
+        normalized_weights = [data_size / total_size for data_size in client_data_sizes]
+        aggregated_weights = self._weighted_sum(client_weights, normalized_weights)
         
         logger.info(f"Aggregated {len(client_weights)} client models using FedAvg")
         
@@ -75,15 +185,8 @@ class FederatedAggregator:
         total_weight = sum(weights)
         normalized_weights = [w / total_weight for w in weights]
         
-        # Initialize aggregated weights
-        aggregated_weights = {}
-        for key in client_weights[0].keys():
-            aggregated_weights[key] = torch.zeros_like(client_weights[0][key])
-        
         # Weighted average
-        for client_weight, weight in zip(client_weights, normalized_weights):
-            for key in aggregated_weights.keys():
-                aggregated_weights[key] += client_weight[key] * weight
+        aggregated_weights = self._weighted_sum(client_weights, normalized_weights)
         
         logger.info(f"Aggregated {len(client_weights)} client models with custom weights")
         
@@ -120,6 +223,101 @@ class FederatedAggregator:
         else:
             raise ValueError(f"Unknown aggregation method: {self.aggregation_method}")
     
+    def begin_round(self):
+        """
+        Start a streaming aggregation round.
+        
+        Only a running weighted sum and the total weight are kept, so peak
+        memory is O(model) regardless of how many clients report. Both
+        methods reduce to a weighted average here; the caller passes the
+        client weights (see ``FederatedOrchestrator.accumulate_client_update``).
+        """
+        if self.aggregation_method not in ("fedavg", "weighted"):
+            raise ValueError(f"Unknown aggregation method: {self.aggregation_method}")
+        
+        self._running_float = None
+        self._running_int = None
+        self._total_weight = 0.0
+        self._num_accumulated = 0
+        self._round_open = True
+    
+    def accumulate(self, client_weights: Dict, size: float):
+        """
+        Add one client's weights to the running weighted sum.
+        
+        Args:
+            client_weights: Client model weights
+            size: Client weight (dataset size for FedAvg)
+        """
+        if not self._round_open:
+            raise RuntimeError("begin_round() must be called before accumulate()")
+        
+        layout = self.get_layout(client_weights)
+        if layout.device is None:
+            raise ValueError("Streaming aggregation needs all client tensors on one device")
+        
+        if self._running_float is None:
+            self._running_float = torch.zeros(layout.float_numel, dtype=layout.float_dtype, device=layout.device)
+            self._running_int = torch.zeros(layout.int_numel, dtype=layout.INT_DTYPE, device=layout.device)
+        elif (
+            self._running_float.numel() != layout.float_numel
+            or self._running_float.dtype != layout.float_dtype
+            or self._running_float.device != layout.device
+        ):
+            raise ValueError("Client weights do not match the structure of this round")
+        
+        # Pack into a reused scratch row, then one fused multiply-add
+        if self._scratch is None or self._scratch[0].shape[1] != layout.float_numel:
+            self._scratch = layout.allocate(1)
+        float_flat, int_flat = layout.pack(
+            client_weights,
+            float_out=self._scratch[0][0],
+            int_out=self._scratch[1][0]
+        )
+        
+        self._running_float.add_(float_flat, alpha=size)
+        self._running_int.add_(int_flat, alpha=size)
+        self._total_weight += size
+        self._num_accumulated += 1
+    
+    def abort_round(self):
+        """Discard the current streaming round without aggregating."""
+        self._running_float = None
+        self._running_int = None
+        self._total_weight = 0.0
+        self._num_accumulated = 0
+        self._round_open = False
+    
+    @property
+    def num_accumulated(self) -> int:
+        """Number of clients accumulated in the current streaming round."""
+        return self._num_accumulated
+    
+    def finalize(self) -> Dict:
+        """
+        Finish the streaming round.
+        
+        Returns:
+            Aggregated model weights
+        """
+        if not self._round_open or self._num_accumulated == 0:
+            raise ValueError("No client updates accumulated in this round")
+        if self._total_weight <= 0:
+            raise ValueError(f"Total client weight must be positive, got {self._total_weight}")
+        
+        float_flat = self._running_float.div_(self._total_weight)
+        int_flat = self._running_int.div_(self._total_weight)
+        aggregated_weights = self._layout.unpack(float_flat, int_flat)
+        
+        logger.info(f"Aggregated {self._num_accumulated} client models using streaming {self.aggregation_method}")
+        
+        # Hand the buffers over to the result; the next round allocates fresh ones
+        self._running_float = None
+        self._running_int = None
+        self._round_open = False
+        
+        return aggregated_weights
+    
     def compute_model_diff(
         self,
         old_weights: Dict,
@@ -138,7 +336,7 @@ class FederatedAggregator:
         diff_norm = 0.0
         
         for key in old_weights.keys():
-            diff = new_weights[key] - old_weights[key]
+            diff = new_weights[key].double() - old_weights[key].double()
             diff_norm += torch.norm(diff).item() ** 2
         
         diff_norm = np.sqrt(diff_norm)
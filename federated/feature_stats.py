@@ -0,0 +1,175 @@
+"""Federated feature statistics for a shared global scaler."""
+
+import numpy as np
+import pandas as pd
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence
+from sklearn.preprocessing import StandardScaler
+from data_loaders.cbc_dataset import CBCDataset
+from data_loaders.cbc_store import CBCColumnStore
+
+# Cached global scaler, written next to the global model checkpoints
+GLOBAL_SCALER_FILE = "global_scaler.json"
+
+# Rows per chunk when computing statistics from a CSV
+CHUNK_ROWS = 500_000
+
+
+class FeatureStats:
+    """
+    Per-feature count, sum and sum of squares.
+
+    Clients share only these sufficient statistics; the server adds them
+    up and derives the global mean and variance, so no client ever sends
+    raw rows and no scaler is refit per client. Missing values (blank CSV
+    cells) are skipped per feature, as ``StandardScaler.fit`` does.
+    """
+
+    def __init__(
+        self,
+        count: int,
+        total: np.ndarray,
+        total_sq: np.ndarray,
+        counts: Optional[np.ndarray] = None
+    ):
+        """
+        Initialize statistics.
+
+        Args:
+            count: Number of rows
+            total: Per-feature sum
+            total_sq: Per-feature sum of squares
+            counts: Per-feature number of non-missing values
+                (defaults to ``count`` for every feature)
+        """
+        self.count = int(count)
+        self.total = np.asarray(total, dtype=np.float64)
+        self.total_sq = np.asarray(total_sq, dtype=np.float64)
+        if counts is None:
+            counts = np.full(len(self.total), self.count)
+        self.counts = np.asarray(counts, dtype=np.int64)
+
+    @classmethod
+    def zeros(cls, num_features: int) -> "FeatureStats":
+        """Empty statistics."""
+        return cls(0, np.zeros(num_features), np.zeros(num_features))
+
+    @classmethod
+    def from_array(cls, features: np.ndarray) -> "FeatureStats":
+        """Statistics of a (rows, features) array; NaNs are skipped."""
+        features = np.asarray(features, dtype=np.float64)
+        return cls(
+            len(features),
+            np.nansum(features, axis=0),
+            np.nansum(np.square(features), axis=0),
+            counts=np.count_nonzero(~np.isnan(features), axis=0)
+        )
+
+    def __add__(self, other: "FeatureStats") -> "FeatureStats":
+        return FeatureStats(
+            self.count + other.count,
+            self.total + other.total,
+            self.total_sq + other.total_sq,
+            counts=self.counts + other.counts
+        )
+
+    @classmethod
+    def merge(cls, stats: Sequence["FeatureStats"]) -> "FeatureStats":
+        """
+        Merge statistics from several clients.
+
+        Args:
+            stats: Client statistics (same feature order)
+
+        Returns:
+            Merged statistics
+        """
+        if not stats:
+            raise ValueError("No feature statistics to merge")
+
+        merged = cls.zeros(len(stats[0].total))
+        for client_stats in stats:
+            merged = merged + client_stats
+        return merged
+
+    @property
+    def mean(self) -> np.ndarray:
+        return self.total / self.counts
+
+    @property
+    def var(self) -> np.ndarray:
+        # Population variance (what StandardScaler uses), clamped for round-off
+        return np.maximum(self.total_sq / self.counts - np.square(self.mean), 0.0)
+
+    def to_scaler(self) -> StandardScaler:
+        """
+        Build a fitted StandardScaler.
+
+        Returns:
+            Scaler equivalent to fitting on the union of the clients' rows
+        """
+        if self.count == 0:
+            raise ValueError("Cannot build a scaler from empty statistics")
+        if (self.counts == 0).any():
+            missing = np.flatnonzero(self.counts == 0).tolist()
+            raise ValueError(f"No values for features {missing}")
+
+        var = self.var
+        scale = np.sqrt(var)
+        scale[scale < 10 * np.finfo(np.float64).eps] = 1.0  # constant features, like sklearn
+
+        scaler = StandardScaler()
+        scaler.mean_ = self.mean
+        scaler.var_ = var
+        scaler.scale_ = scale
+        # Like sklearn: an int unless missing values left per-feature counts
+        scaler.n_samples_seen_ = self.count if (self.counts == self.count).all() else self.counts
+        scaler.n_features_in_ = len(self.total)
+        return scaler
+
+    def to_dict(self) -> Dict:
+        """JSON-serializable form (what a client sends)."""
+        return {
+            "count": self.count,
+            "counts": self.counts.tolist(),
+            "sum": self.total.tolist(),
+            "sum_sq": self.total_sq.tolist()
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> "FeatureStats":
+        """Load from ``to_dict`` output."""
+        return cls(data["count"], data["sum"], data["sum_sq"], counts=data.get("counts"))
+
+
+def compute_feature_stats(
+    csv_path: Path,
+    feature_columns: List[str] = CBCDataset.FEATURE_COLUMNS,
+    use_store: bool = False,
+    chunk_rows: int = CHUNK_ROWS
+) -> FeatureStats:
+    """
+    Compute a client's feature statistics in one chunked pass.
+
+    Args:
+        csv_path: Hospital CSV file
+        feature_columns: Feature columns, in model input order
+        use_store: Read the CBC column store instead of parsing the CSV
+        chunk_rows: Rows per chunk
+
+    Returns:
+        Client feature statistics
+    """
+    stats = FeatureStats.zeros(len(feature_columns))
+
+    if use_store:
+        store = CBCColumnStore.sync(csv_path)
+        for start in range(0, store.num_rows, chunk_rows):
+            end = min(start + chunk_rows, store.num_rows)
+            block = np.stack([store.column(name)[start:end] for name in feature_columns], axis=1)
+            stats = stats + FeatureStats.from_array(block)
+    else:
+        for chunk in pd.read_csv(csv_path, usecols=feature_columns, chunksize=chunk_rows):
+            stats = stats + FeatureStats.from_array(chunk[feature_columns].to_numpy())
+
+    return stats
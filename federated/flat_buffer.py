@@ -0,0 +1,173 @@
+"""Flat-buffer packing of model state dicts for fused aggregation."""
+
+import torch
+from typing import Dict, List, Optional, Tuple
+
+
+class FlatStateLayout:
+    """
+    Key/shape/offset layout for packing a state_dict into flat buffers.
+
+    Floating point entries are packed into one buffer of their widest
+    dtype (float32 for a plain model, float64 if any entry is float64),
+    so no entry loses precision. Integer entries (e.g. BatchNorm
+    ``num_batches_tracked``) are packed into a separate float64 buffer so
+    counts survive weighted averaging exactly and can be rounded back to
+    their original dtype. Buffers live on the state dict's device; a
+    state dict spread over several devices has ``device`` None and
+    cannot be packed.
+    """
+
+    INT_DTYPE = torch.float64
+
+    def __init__(self, state_dict: Dict[str, torch.Tensor]):
+        """
+        Build layout from a reference state dict.
+
+        Args:
+            state_dict: Reference model state dict
+        """
+        self.signature = self.compute_signature(state_dict)
+        self.keys: List[str] = []
+        self.shapes: Dict[str, torch.Size] = {}
+        self.dtypes: Dict[str, torch.dtype] = {}
+        self.float_keys: List[str] = []
+        self.int_keys: List[str] = []
+        self.offsets: Dict[str, Tuple[int, int]] = {}
+
+        float_dtypes = [t.dtype for t in state_dict.values() if t.is_floating_point()]
+        self.float_dtype = torch.float32
+        for dtype in float_dtypes:
+            self.float_dtype = torch.promote_types(self.float_dtype, dtype)
+
+        devices = {t.device for t in state_dict.values()}
+        self.device: Optional[torch.device] = devices.pop() if len(devices) == 1 else None
+
+        float_offset = 0
+        int_offset = 0
+
+        for key, tensor in state_dict.items():
+            self.keys.append(key)
+            self.shapes[key] = tensor.shape
+            self.dtypes[key] = tensor.dtype
+            numel = tensor.numel()
+
+            if tensor.is_floating_point():
+                self.float_keys.append(key)
+                self.offsets[key] = (float_offset, float_offset + numel)
+                float_offset += numel
+            else:
+                self.int_keys.append(key)
+                self.offsets[key] = (int_offset, int_offset + numel)
+                int_offset += numel
+
+        self.float_numel = float_offset
+        self.int_numel = int_offset
+
+    @staticmethod
+    def compute_signature(state_dict: Dict[str, torch.Tensor]) -> Tuple:
+        """Get a hashable (key, shape, dtype, device) signature of a state dict."""
+        return tuple(
+            (key, tuple(tensor.shape), tensor.dtype, tensor.device)
+            for key, tensor in state_dict.items()
+        )
+
+    def matches(self, state_dict: Dict[str, torch.Tensor]) -> bool:
+        """Check whether a state dict has the same structure as this layout."""
+        return self.compute_signature(state_dict) == self.signature
+
+    def pack(
+        self,
+        state_dict: Dict[str, torch.Tensor],
+        float_out: Optional[torch.Tensor] = None,
+        int_out: Optional[torch.Tensor] = None
+    ) -> Tuple[torch.Tensor, torch.Tensor]:
+        """
+        Pack a state dict into flat buffers.
+
+        Args:
+            state_dict: Model state dict with this layout
+            float_out: Optional preallocated float buffer (e.g. a matrix row)
+            int_out: Optional preallocated integer-section buffer
+
+        Returns:
+            Tuple of (float_buffer, int_buffer)
+        """
+        if self.device is None:
+            raise ValueError("Cannot pack a state dict whose tensors are on different devices")
+        if float_out is None:
+            float_out = torch.empty(self.float_numel, dtype=self.float_dtype, device=self.device)
+        if int_out is None:
+            int_out = torch.empty(self.int_numel, dtype=self.INT_DTYPE, device=self.device)
+
+        # torch.cat promotes into the output dtype, so one kernel per section
+        if self.float_keys:
+            torch.cat([state_dict[key].reshape(-1) for key in self.float_keys], out=float_out)
+        if self.int_keys:
+            torch.cat([state_dict[key].reshape(-1) for key in self.int_keys], out=int_out)
+
+        return float_out, int_out
+
+    def allocate(self, num_rows: int) -> Tuple[torch.Tensor, torch.Tensor]:
+        """Allocate (num_rows, numel) float and integer-section matrices."""
+        float_matrix = torch.empty(num_rows, self.float_numel, dtype=self.float_dtype, device=self.device)
+        int_matrix = torch.empty(num_rows, self.int_numel, dtype=self.INT_DTYPE, device=self.device)
+        return float_matrix, int_matrix
+
+    def pack_many(
+        self,
+        state_dicts: List[Dict[str, torch.Tensor]],
+        out: Optional[Tuple[torch.Tensor, torch.Tensor]] = None
+    ) -> Tuple[torch.Tensor, torch.Tensor]:
+        """
+        Pack several state dicts into stacked (num_clients, numel) matrices.
+
+        Args:
+            state_dicts: List of model state dicts with this layout
+            out: Optional preallocated matrices from ``allocate``
+
+        Returns:
+            Tuple of (float_matrix, int_matrix)
+        """
+        float_matrix, int_matrix = out if out is not None else self.allocate(len(state_dicts))
+
+        for i, state_dict in enumerate(state_dicts):
+            self.pack(state_dict, float_out=float_matrix[i], int_out=int_matrix[i])
+
+        return float_matrix, int_matrix
+
+    def unpack(
+        self,
+        float_flat: torch.Tensor,
+        int_flat: torch.Tensor
+    ) -> Dict[str, torch.Tensor]:
+        """
+        Unpack flat buffers into a state dict.
+
+        Entries of the buffer dtype are returned as views into
+        ``float_flat``; other floating dtypes are cast back. Integer entries are rounded to the
+        nearest integer and cast back to their original dtype.
+
+        Args:
+            float_flat: Flat float buffer
+            int_flat: Flat integer-section buffer
+
+        Returns:
+            State dict in the original key order
+        """
+        state_dict = {}
+
+        for key in self.keys:
+            start, end = self.offsets[key]
+            dtype = self.dtypes[key]
+
+            if dtype.is_floating_point:
+                value = float_flat[start:end].view(self.shapes[key])
+                if dtype != self.float_dtype:
+                    value = value.to(dtype)
+            else:
+                value = int_flat[start:end].round().to(dtype).view(self.shapes[key])
+
+            state_dict[key] = value
+
+        return state_dict
@@ -3,10 +3,13 @@
 import torch
 from pathlib import Path
 from typing import List, Dict, Optional
+from sklearn.preprocessing import StandardScaler
 from config.logging_config import get_logger
 from config.settings import settings
 from .aggregator import FederatedAggregator
+from .feature_stats import FeatureStats, GLOBAL_SCALER_FILE
 from models.model_utils import save_model
+from data_loaders.scaler_io import save_scaler, scaler_to_dict
 
 logger = get_logger(__name__)
 
@@ -19,7 +22,8 @@ class FederatedOrchestrator:
         global_model: torch.nn.Module,
         aggregation_method: str = "fedavg",
         min_clients: int = 2,
-        checkpoint_dir: Optional[Path] = None
+        checkpoint_dir: Optional[Path] = None,
+        use_flat_buffer: bool = False
     ):
         """
         Initialize orchestrator.
@@ -29,19 +33,25 @@ class FederatedOrchestrator:
             aggregation_method: Aggregation method
             min_clients: Minimum number of clients
             checkpoint_dir: Directory to save checkpoints
+            use_flat_buffer: Use the flat-buffer aggregation engine
         """
         self.global_model = global_model
-        self.aggregator = FederatedAggregator(aggregation_method)
+        self.aggregator = FederatedAggregator(aggregation_method, use_flat_buffer=use_flat_buffer)
         self.min_clients = min_clients
         self.checkpoint_dir = checkpoint_dir or settings.checkpoints_dir
         
         self.current_round = 0
+        self.global_scaler: Optional[StandardScaler] = None
         self.history = {
             "rounds": [],
             "num_clients": [],
             "global_metrics": []
         }
         
+        # Streaming round bookkeeping (sizes and metrics only, never weights)
+        self._round_sizes: List[int] = []
+        self._round_metrics: List[Dict] = []
+        
         logger.info(f"Initialized FL orchestrator (min_clients={min_clients})")
     
     def get_global_weights(self) -> Dict:
@@ -53,6 +63,36 @@ class FederatedOrchestrator:
         logger.info(f"Round {self.current_round}: Distributing global model")
         return self.get_global_weights()
     
+    def aggregate_feature_stats(self, client_stats: List[FeatureStats]) -> StandardScaler:
+        """
+        Merge client feature statistics into the global scaler.
+        
+        Run once before training: clients send count/sum/sum-of-squares
+        vectors and every client (and inference) then uses the same
+        scaler. It is cached to ``global_scaler.json`` in the checkpoint
+        directory and stored in every checkpoint.
+        
+        Args:
+            client_stats: Feature statistics of each client
+            
+        Returns:
+            Global scaler
+        """
+        merged = FeatureStats.merge(client_stats)
+        self.global_scaler = merged.to_scaler()
+        
+        save_scaler(self.global_scaler, self.checkpoint_dir / GLOBAL_SCALER_FILE)
+        logger.info(
+            f"Global scaler from {len(client_stats)} clients "
+            f"({merged.count} samples)"
+        )
+        
+        return self.global_scaler
+    
+    def get_global_scaler(self) -> Optional[StandardScaler]:
+        """Get the global scaler (None before the statistics round)."""
+        return self.global_scaler
+    
     def aggregate_client_updates(
         self,
         client_weights: List[Dict],
@@ -82,22 +122,128 @@ class FederatedOrchestrator:
             client_data_sizes=client_data_sizes
         )
         
-        # Update global model
-        old_weights = self.get_global_weights()
-        self.global_model.load_state_dict(aggregated_weights)
+        self._apply_aggregated_weights(
+            aggregated_weights,
+            len(client_weights),
+            client_data_sizes,
+            client_metrics
+        )
         
-        # Compute update magnitude
+        return aggregated_weights
+    
+    def _apply_aggregated_weights(
+        self,
+        aggregated_weights: Dict,
+        num_clients: int,
+        client_data_sizes: List[int],
+        client_metrics: Optional[List[Dict]] = None
+    ):
+        """Load aggregated weights into the global model and update history."""
+        # Compute update magnitude before the global tensors are overwritten
+        old_weights = self.get_global_weights()
         diff_norm = self.aggregator.compute_model_diff(old_weights, aggregated_weights)
+        
+        # Update global model
+        self.global_model.load_state_dict(aggregated_weights)
         logger.info(f"Round {self.current_round}: Model update L2 norm = {diff_norm:.4f}")
         
         # Update history
         self.history["rounds"].append(self.current_round)
-        self.history["num_clients"].append(len(client_weights))
+        self.history["num_clients"].append(num_clients)
         
         if client_metrics:
             avg_metrics = self._average_client_metrics(client_metrics, client_data_sizes)
             self.history["global_metrics"].append(avg_metrics)
             logger.info(f"Round {self.current_round}: Avg metrics: {avg_metrics}")
+    
+    def begin_round(self):
+        """
+        Start a streaming federated learning round.
+        
+        Client updates are then folded in one at a time with
+        ``accumulate_client_update`` and the round is closed with
+        ``finalize_round``, so client state dicts never need to be held
+        together in memory.
+        """
+        self.aggregator.begin_round()
+        self.current_round += 1
+        logger.info(f"=== Federated Learning Round {self.current_round} (streaming) ===")
+        
+        self._round_sizes = []
+        self._round_metrics = []
+    
+    def accumulate_client_update(
+        self,
+        client_weights: Dict,
+        data_size: int,
+        client_metrics: Optional[Dict] = None
+    ):
+        """
+        Fold a single client update into the current streaming round.
+        
+        FedAvg weights the client by its data size; "weighted" uses equal
+        weights, as ``aggregate_client_updates`` does without custom weights.
+        
+        Args:
+            client_weights: Client model weights
+            data_size: Client dataset size
+            client_metrics: Optional client metrics
+        """
+        weight = data_size if self.aggregator.aggregation_method == "fedavg" else 1.0
+        self.aggregator.accumulate(client_weights, weight)
+        self._round_sizes.append(data_size)
+        if client_metrics:
+            self._round_metrics.append(client_metrics)
+    
+    def abort_round(self):
+        """
+        Discard the current streaming round (e.g. too few clients reported).
+        
+        The accumulated updates are dropped, the global model is left
+        unchanged and the round number is released for the next round.
+        """
+        self.aggregator.abort_round()
+        self._round_sizes = []
+        self._round_metrics = []
+        self.current_round -= 1
+        logger.warning(f"Round {self.current_round + 1} aborted")
+    
+    @property
+    def num_round_clients(self) -> int:
+        """Number of clients accumulated in the current streaming round."""
+        return self.aggregator.num_accumulated
+    
+    def finalize_round(self, save_checkpoint: bool = True) -> Dict:
+        """
+        Finish the current streaming round and update the global model.
+        
+        Args:
+            save_checkpoint: Whether to save checkpoint
+            
+        Returns:
+            Aggregated global weights
+        """
+        num_clients = self.aggregator.num_accumulated
+        if num_clients < self.min_clients:
+            self.abort_round()
+            raise ValueError(
+                f"Not enough clients: got {num_clients}, "
+                f"need at least {self.min_clients}"
+            )
+        
+        aggregated_weights = self.aggregator.finalize()
+        
+        # Metrics are only averaged when every client reported them
+        client_metrics = self._round_metrics if len(self._round_metrics) == num_clients else None
+        self._apply_aggregated_weights(
+            aggregated_weights,
+            num_clients,
+            self._round_sizes,
+            client_metrics
+        )
+        
+        if save_checkpoint:
+            self._save_checkpoint()
         
         return aggregated_weights
     
@@ -154,16 +300,21 @@ class FederatedOrchestrator:
         
         # Save checkpoint
         if save_checkpoint:
-            checkpoint_path = self.checkpoint_dir / f"global_model_round_{self.current_round}.pth"
-            save_model(
-                self.global_model,
-                checkpoint_path,
-                epoch=self.current_round,
-                metrics=self.history["global_metrics"][-1] if self.history["global_metrics"] else None
-            )
+            self._save_checkpoint()
         
         return global_weights
     
+    def _save_checkpoint(self):
+        """Save the global model checkpoint for the current round."""
+        checkpoint_path = self.checkpoint_dir / f"global_model_round_{self.current_round}.pth"
+        save_model(
+            self.global_model,
+            checkpoint_path,
+            epoch=self.current_round,
+            metrics=self.history["global_metrics"][-1] if self.history["global_metrics"] else None,
+            extra={"scaler": scaler_to_dict(self.global_scaler)} if self.global_scaler is not None else None
+        )
+    
     def get_history(self) -> Dict:
         """Get training history."""
         return self.history
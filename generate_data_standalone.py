@@ -1,5 +1,6 @@
 """Standalone data generator - no external dependencies needed."""
 
+import zlib
 import numpy as np
 import pandas as pd
 from pathlib import Path
@@ -112,7 +113,7 @@ if __name__ == "__main__":
         hospital_dir.mkdir(parents=True, exist_ok=True)
         
         # Generate data
-        seed = hash(hospital) % 10000
+        seed = zlib.crc32(hospital.encode("utf-8")) % 10000  # hash() is randomized per process
         df = generate_hospital_data(hospital, n_samples=1000, seed=seed)
         
         # Save
@@ -1,5 +1,6 @@
 """Models package for MedChain-FL."""
 
 from .thalassemia_models import CBCModel, ImageModel, HybridModel
+from .embedding_cache import ImageEmbeddingCache
 
-__all__ = ["CBCModel", "ImageModel", "HybridModel"]
+__all__ = ["CBCModel", "ImageModel", "HybridModel", "ImageEmbeddingCache"]
@@ -0,0 +1,226 @@
+"""Persistent cache of frozen image-branch embeddings for HybridModel."""
+
+import hashlib
+import numpy as np
+import torch
+from pathlib import Path
+from PIL import Image
+from typing import Dict, List, Optional, Tuple
+from torch.utils.data import TensorDataset
+from config.logging_config import get_logger
+from data_loaders.image_dataset import ImageDataset
+from .thalassemia_models import HybridModel
+
+logger = get_logger(__name__)
+
+# Key used for samples without any image (HybridDataset feeds a blank image)
+BLANK_IMAGE_KEY = "blank"
+
+
+def hash_image_file(image_path: Path) -> str:
+    """SHA-256 of an image file's bytes."""
+    sha = hashlib.sha256()
+    with open(image_path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            sha.update(chunk)
+    return sha.hexdigest()
+
+
+def hash_module_weights(module: torch.nn.Module, exclude_prefix: Optional[str] = None) -> str:
+    """
+    SHA-256 over a module's state dict (names, shapes and raw tensor bytes).
+    
+    Args:
+        module: Module to hash
+        exclude_prefix: Skip entries whose name starts with this prefix
+        
+    Returns:
+        Hex digest
+    """
+    sha = hashlib.sha256()
+    for key, value in module.state_dict().items():
+        if exclude_prefix and key.startswith(exclude_prefix):
+            continue
+        tensor = value.detach().cpu().contiguous()
+        sha.update(f"{key}|{tensor.dtype}|{tuple(tensor.shape)}".encode())
+        sha.update(tensor.view(-1).view(torch.uint8).numpy().tobytes())
+    return sha.hexdigest()
+
+
+class ImageEmbeddingCache:
+    """
+    Image-branch outputs of a frozen HybridModel backbone, persisted to disk.
+    
+    Entries are keyed by image SHA-256 and stored in one file per backbone
+    weight hash, so any change to the backbone weights selects a fresh
+    file and stale files are removed. Two modes are supported:
+    
+    * ``pre_fc=False``: final 128-d embeddings; the whole image branch
+      must stay frozen.
+    * ``pre_fc=True``: 512-d pooled ResNet features; the image branch fc
+      layer may keep training (it is excluded from the backbone hash).
+    
+    Embeddings are computed with the deterministic (eval) transform at a
+    given image size, so image augmentation is not applied in cached mode.
+    """
+    
+    def __init__(self, cache_dir: Path, batch_size: int = 64):
+        """
+        Initialize embedding cache.
+        
+        Args:
+            cache_dir: Directory for cache files
+            batch_size: Images per backbone forward pass
+        """
+        self.cache_dir = Path(cache_dir)
+        self.batch_size = batch_size
+        self.stats = {"hits": 0, "misses": 0}
+        
+        self._backbone_hash: Optional[str] = None
+        self._mode: Optional[str] = None
+        self._transform = None
+        self._embeddings: Dict[str, torch.Tensor] = {}
+        # (path, mtime_ns, size) -> image hash, avoids re-reading files every round
+        self._image_hashes: Dict[Tuple[str, int, int], str] = {}
+    
+    @staticmethod
+    def _mode_name(pre_fc: bool, image_size: int) -> str:
+        return f"{'features' if pre_fc else 'embeddings'}_{image_size}"
+    
+    def _cache_file(self, mode: str, backbone_hash: str) -> Path:
+        return self.cache_dir / f"{mode}_{backbone_hash[:16]}.pt"
+    
+    def _image_key(self, image_path: Optional[Path]) -> str:
+        """Content hash of an image, memoized by file stamp."""
+        if image_path is None:
+            return BLANK_IMAGE_KEY
+        
+        stat = image_path.stat()
+        stamp = (str(image_path), stat.st_mtime_ns, stat.st_size)
+        if stamp not in self._image_hashes:
+            self._image_hashes[stamp] = hash_image_file(image_path)
+        return self._image_hashes[stamp]
+    
+    def _select(self, model: HybridModel, pre_fc: bool, image_size: int):
+        """Load the entries for the model's current backbone weights."""
+        mode = self._mode_name(pre_fc, image_size)
+        backbone_hash = hash_module_weights(
+            model.image_branch, exclude_prefix="fc." if pre_fc else None
+        )
+        if backbone_hash == self._backbone_hash and mode == self._mode:
+            return
+        
+        cache_file = self._cache_file(mode, backbone_hash)
+        if cache_file.exists():
+            stored = torch.load(cache_file)
+            self._embeddings = dict(zip(stored["keys"], stored["embeddings"]))
+            logger.info(f"Loaded {len(self._embeddings)} cached image {mode}")
+        else:
+            if self._backbone_hash is not None:
+                logger.info(f"Backbone weights changed, invalidating image {mode} cache")
+            self._embeddings = {}
+        
+        # Embeddings of any other backbone can never be used again
+        for stale in self.cache_dir.glob(f"{mode}_*.pt"):
+            if stale != cache_file:
+                stale.unlink()
+        
+        self._backbone_hash = backbone_hash
+        self._mode = mode
+        self._transform = ImageDataset.get_default_transform(image_size, training=False)
+    
+    def _save(self):
+        """Persist the current entries."""
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        keys = list(self._embeddings.keys())
+        torch.save(
+            {"keys": keys, "embeddings": torch.stack([self._embeddings[k] for k in keys])},
+            self._cache_file(self._mode, self._backbone_hash)
+        )
+    
+    def _load_image(self, image_path: Optional[Path]) -> torch.Tensor:
+        """Load and transform one image (blank if missing)."""
+        if image_path is None:
+            image = np.zeros((224, 224, 3), dtype=np.uint8)
+        else:
+            image = np.array(Image.open(image_path).convert("RGB"))
+        return self._transform(image=image)["image"]
+    
+    @torch.no_grad()
+    def get_embeddings(
+        self,
+        model: HybridModel,
+        image_paths: List[Optional[Path]],
+        image_size: int = 224,
+        pre_fc: bool = False
+    ) -> torch.Tensor:
+        """
+        Get image-branch outputs for a list of images, computing misses.
+        
+        Args:
+            model: Hybrid model whose (frozen) image branch is used
+            image_paths: Image path per sample (None for a blank image)
+            image_size: Image size fed to the backbone
+            pre_fc: Cache pre-fc backbone features instead of embeddings
+            
+        Returns:
+            Tensor (num_samples, 512 if pre_fc else 128)
+        """
+        self._select(model, pre_fc, image_size)
+        
+        keys = [self._image_key(path) for path in image_paths]
+        missing = {}
+        for key, path in zip(keys, image_paths):
+            if key not in self._embeddings and key not in missing:
+                missing[key] = path
+        
+        self.stats["hits"] += len(keys) - len(missing)
+        self.stats["misses"] += len(missing)
+        
+        if missing:
+            device = next(model.parameters()).device
+            was_training = model.training
+            model.eval()
+            
+            missing_items = list(missing.items())
+            for start in range(0, len(missing_items), self.batch_size):
+                chunk = missing_items[start:start + self.batch_size]
+                images = torch.stack([self._load_image(path) for _, path in chunk]).to(device)
+                if pre_fc:
+                    outputs = model.backbone_features(images)
+                else:
+                    outputs = model.image_branch(images)
+                for (key, _), output in zip(chunk, outputs.cpu()):
+                    self._embeddings[key] = output.clone()
+            
+            model.train(was_training)
+            self._save()
+            logger.info(f"Computed {len(missing)} image {self._mode}")
+        
+        return torch.stack([self._embeddings[key] for key in keys])
+    
+    def embed_dataset(self, model: HybridModel, dataset, pre_fc: bool = False) -> TensorDataset:
+        """
+        Turn a HybridDataset into a dataset of (cbc_features, embedding, label).
+        
+        The result feeds ``LocalTrainer`` directly; ``HybridModel.forward``
+        recognizes the 2-D image input and skips the backbone.
+        
+        Args:
+            model: Hybrid model
+            dataset: HybridDataset
+            pre_fc: Cache pre-fc backbone features instead of embeddings
+            
+        Returns:
+            TensorDataset
+        """
+        image_paths = [dataset.get_image_path(i) for i in range(len(dataset))]
+        embeddings = self.get_embeddings(
+            model, image_paths, image_size=dataset.image_size, pre_fc=pre_fc
+        )
+        
+        return TensorDataset(
+            torch.as_tensor(dataset.cbc_features, dtype=torch.float32),
+            embeddings,
+            torch.as_tensor(dataset.labels, dtype=torch.long)
+        )
@@ -14,7 +14,8 @@ def save_model(
     path: Path,
     epoch: Optional[int] = None,
     optimizer: Optional[torch.optim.Optimizer] = None,
-    metrics: Optional[Dict] = None
+    metrics: Optional[Dict] = None,
+    extra: Optional[Dict] = None
 ):
     """
     Save model checkpoint.
@@ -25,6 +26,7 @@ def save_model(
         epoch: Current epoch
         optimizer: Optimizer state
         metrics: Training metrics
+        extra: Additional checkpoint entries (e.g. the global scaler)
     """
     path.parent.mkdir(parents=True, exist_ok=True)
     
@@ -41,6 +43,9 @@ def save_model(
     if metrics is not None:
         checkpoint["metrics"] = metrics
     
+    if extra is not None:
+        checkpoint.update(extra)
+    
     torch.save(checkpoint, path)
     logger.info(f"Saved model checkpoint to {path}")
 
@@ -103,7 +103,7 @@ class HybridModel(nn.Module):
         
         # Fusion layer
         self.fusion = nn.Sequential(
-            nn.Linear(256, 128),  # 128 from CBC + 128 from image
+            nn.Linear(cbc_hidden_dims[-1] + 128, 128),  # CBC features + 128 from image
             nn.ReLU(),
             nn.Dropout(0.3),
             nn.Linear(128, 64),
@@ -112,10 +112,39 @@ class HybridModel(nn.Module):
             nn.Linear(64, num_classes)
         )
     
+    def backbone_features(self, image_data: torch.Tensor) -> torch.Tensor:
+        """
+        Pooled ResNet features of the image branch, before its fc layer.
+        
+        Args:
+            image_data: Blood smear images (batch_size, 3, H, W)
+            
+        Returns:
+            Features (batch_size, 512)
+        """
+        backbone = self.image_branch
+        x = backbone.maxpool(backbone.relu(backbone.bn1(backbone.conv1(image_data))))
+        x = backbone.layer4(backbone.layer3(backbone.layer2(backbone.layer1(x))))
+        return torch.flatten(backbone.avgpool(x), 1)
+    
+    def freeze_image_branch(self, keep_fc: bool = False):
+        """
+        Freeze the image branch so its outputs can be cached.
+        
+        Args:
+            keep_fc: Keep the 512->128 fc layer trainable (cache pre-fc features)
+        """
+        for name, param in self.image_branch.named_parameters():
+            param.requires_grad = keep_fc and name.startswith("fc.")
+    
     def forward(self, cbc_data: torch.Tensor, image_data: torch.Tensor) -> torch.Tensor:
         """
         Forward pass.
         
+        ``image_data`` may also be precomputed image features: 2-D input of
+        width 512 is treated as pre-fc backbone features and 2-D input of
+        width 128 as final image embeddings (see ``ImageEmbeddingCache``).
+        
         Args:
             cbc_data: CBC features (batch_size, cbc_input_dim)
             image_data: Blood smear images (batch_size, 3, H, W)
@@ -124,7 +153,13 @@ class HybridModel(nn.Module):
             Class logits (batch_size, num_classes)
         """
         cbc_features = self.cbc_branch(cbc_data)
-        image_features = self.image_branch(image_data)
+        
+        if image_data.dim() == 4:
+            image_features = self.image_branch(image_data)
+        elif image_data.shape[1] == self.image_branch.fc.in_features:
+            image_features = self.image_branch.fc(image_data)
+        else:
+            image_features = image_data
         
         # Concatenate features
         combined = torch.cat([cbc_features, image_features], dim=1)
@@ -10,12 +10,11 @@ from pathlib import Path
 from sklearn.preprocessing import StandardScaler
 from sklearn.metrics import accuracy_score, precision_score, recall_score, f1_score
 import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+import torch.multiprocessing as mp  # tensors returned by workers travel via shared memory
 from datetime import datetime
 
-print("=" * 80)
-print("MedChain-FL: Federated Learning Simulation")
-print("=" * 80)
-
 # Simple CBC Model
 class CBCModel(nn.Module):
     def __init__(self, input_dim=8, num_classes=3):
@@ -65,9 +64,12 @@ class CBCDataset(Dataset):
         return self.scaler
 
 # Training function
-def train_hospital(hospital_name, global_weights, epochs=2):
+def train_hospital(hospital_name, global_weights, epochs=2, seed=None):
     print(f"\n>>> Training {hospital_name.upper()} Hospital...")
     
+    if seed is not None:
+        torch.manual_seed(seed)
+    
     data_path = Path(f"data/hospital_{hospital_name}/cbc_data.csv")
     if not data_path.exists():
         print(f"  ⚠ Data not found for {hospital_name}")
@@ -111,6 +113,19 @@ def train_hospital(hospital_name, global_weights, epochs=2):
     metrics = {"loss": avg_loss, "accuracy": accuracy / 100}
     return model.state_dict(), len(dataset), metrics
 
+# Parallel training helpers
+def init_worker(num_threads):
+    """Pin torch intra-op threads in each pool worker."""
+    torch.set_num_threads(num_threads)
+
+
+def train_hospital_shared(hospital_name, global_weights, epochs=2, seed=None):
+    """Train in a worker and move the weights to shared memory for the trip back."""
+    weights, size, metrics = train_hospital(hospital_name, global_weights, epochs, seed)
+    if weights is not None:
+        weights = {key: value.clone().share_memory_() for key, value in weights.items()}
+    return weights, size, metrics
+
 # Federated aggregation
 def fedavg_aggregate(client_weights, client_sizes):
     """FedAvg aggregation."""
@@ -158,18 +173,31 @@ class SimpleLedger:
             json.dump(self.chain, f, indent=2)
 
 # Main FL Simulation
-def run_fl_simulation(rounds=3, local_epochs=2):
+def run_fl_simulation(rounds=3, local_epochs=2, workers=1, seed=42):
     print("\n" + "=" * 80)
     print(f"Configuration: {rounds} FL rounds, {local_epochs} local epochs per round")
     print("=" * 80)
     
     # Initialize
+    torch.manual_seed(seed)
     global_model = CBCModel()
     ledger = SimpleLedger()
     hospitals = ["italy", "pakistan", "usa"]
     
     print(f"\nParticipating hospitals: {', '.join([h.upper() for h in hospitals])}")
     
+    # Optional worker pool: one process per client, cores split evenly
+    pool = None
+    if workers > 1:
+        threads = max(1, (os.cpu_count() or 1) // workers)
+        pool = ProcessPoolExecutor(
+            max_workers=workers,
+            mp_context=mp.get_context("spawn"),
+            initializer=init_worker,
+            initargs=(threads,)
+        )
+        print(f"Training clients in parallel: {workers} workers x {threads} threads")
+    
     # FL Rounds
     for round_num in range(rounds):
         print(f"\n{'='*80}")
@@ -183,9 +211,21 @@ def run_fl_simulation(rounds=3, local_epochs=2):
         client_sizes = []
         client_metrics = []
         
-        for hospital in hospitals:
-            weights, size, metrics = train_hospital(hospital, global_weights, local_epochs)
-            
+        # Per-client seeds make parallel and serial runs identical
+        seeds = [seed + round_num * len(hospitals) + i for i in range(len(hospitals))]
+        if pool is not None:
+            futures = [
+                pool.submit(train_hospital_shared, hospital, global_weights, local_epochs, client_seed)
+                for hospital, client_seed in zip(hospitals, seeds)
+            ]
+            results = [future.result() for future in futures]
+        else:
+            results = [
+                train_hospital(hospital, global_weights, local_epochs, client_seed)
+                for hospital, client_seed in zip(hospitals, seeds)
+            ]
+        
+        for hospital, (weights, size, metrics) in zip(hospitals, results):
             if weights is not None:
                 client_weights.append(weights)
                 client_sizes.append(size)
@@ -223,6 +263,9 @@ def run_fl_simulation(rounds=3, local_epochs=2):
         else:
             print(f"\n  ⚠ Not enough clients (need at least 2)")
     
+    if pool is not None:
+        pool.shutdown()
+    
     # Save results
     print(f"\n{'='*80}")
     print("SAVING RESULTS")
@@ -248,4 +291,22 @@ def run_fl_simulation(rounds=3, local_epochs=2):
 
 # Run it!
 if __name__ == "__main__":
-    run_fl_simulation(rounds=3, local_epochs=2)
+    import argparse
+    
+    parser = argparse.ArgumentParser(description="Standalone FL simulation")
+    parser.add_argument("--rounds", type=int, default=3, help="FL rounds")
+    parser.add_argument("--local-epochs", type=int, default=2, help="Local epochs")
+    parser.add_argument("--workers", type=int, default=1, help="Parallel client worker processes")
+    parser.add_argument("--seed", type=int, default=42, help="Base random seed")
+    args = parser.parse_args()
+    
+    print("=" * 80)
+    print("MedChain-FL: Federated Learning Simulation")
+    print("=" * 80)
+    
+    run_fl_simulation(
+        rounds=args.rounds,
+        local_epochs=args.local_epochs,
+        workers=args.workers,
+        seed=args.seed
+    )
@@ -0,0 +1,73 @@
+"""Benchmark per-key vs flat-buffer FedAvg aggregation."""
+
+import time
+import torch
+import argparse
+from config.logging_config import setup_logging
+from models.thalassemia_models import get_model
+from federated.aggregator import FederatedAggregator
+
+logger = setup_logging(log_level="INFO")
+
+
+def time_aggregation(
+    aggregator: FederatedAggregator,
+    client_weights: list,
+    client_sizes: list,
+    repeats: int
+) -> float:
+    """Return the best wall-clock time of several aggregation rounds."""
+    best = float("inf")
+    for _ in range(repeats):
+        start = time.perf_counter()
+        aggregator.aggregate(client_weights, client_data_sizes=client_sizes)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    """Benchmark aggregation engines."""
+    parser = argparse.ArgumentParser(description="Benchmark FedAvg aggregation")
+    parser.add_argument("--model-type", type=str, default="hybrid", help="Model type")
+    parser.add_argument("--clients", type=int, default=20, help="Number of clients")
+    parser.add_argument("--repeats", type=int, default=3, help="Timed rounds per engine")
+    args = parser.parse_args()
+
+    model_kwargs = {"num_classes": 3}
+    if args.model_type != "cbc":
+        model_kwargs["pretrained"] = False
+
+    logger.info(f"Building {args.clients} {args.model_type} client models")
+    client_weights = [
+        {k: v.clone() for k, v in get_model(args.model_type, **model_kwargs).state_dict().items()}
+        for _ in range(args.clients)
+    ]
+    client_sizes = list(range(100, 100 + args.clients))
+
+    loop_time = time_aggregation(
+        FederatedAggregator("fedavg"), client_weights, client_sizes, args.repeats
+    )
+    flat_time = time_aggregation(
+        FederatedAggregator("fedavg", use_flat_buffer=True), client_weights, client_sizes, args.repeats
+    )
+
+    # Reduction alone, as when clients ship already-packed flat buffers
+    flat_aggregator = FederatedAggregator("fedavg", use_flat_buffer=True)
+    layout = flat_aggregator.get_layout(client_weights[0])
+    float_matrix, int_matrix = layout.pack_many(client_weights)
+    normalized = [size / sum(client_sizes) for size in client_sizes]
+    reduce_time = float("inf")
+    for _ in range(args.repeats):
+        start = time.perf_counter()
+        flat_aggregator.reduce_flat(float_matrix, int_matrix, normalized)
+        reduce_time = min(reduce_time, time.perf_counter() - start)
+
+    logger.info(f"Per-key loop:         {loop_time * 1000:.1f} ms/round")
+    logger.info(f"Flat buffer:          {flat_time * 1000:.1f} ms/round "
+                f"({loop_time / flat_time:.2f}x)")
+    logger.info(f"Pre-packed reduction: {reduce_time * 1000:.1f} ms/round "
+                f"({loop_time / reduce_time:.2f}x)")
+
+
+if __name__ == "__main__":
+    main()
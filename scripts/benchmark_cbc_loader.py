@@ -0,0 +1,50 @@
+"""Benchmark DataLoader vs tensor-slicing CBCBatchLoader epoch time."""
+
+import time
+import torch
+import argparse
+from config.logging_config import setup_logging
+from models.thalassemia_models import CBCModel
+from training.local_trainer import LocalTrainer
+from data_loaders.cbc_dataset import CBCDataset, CBCBatchLoader, build_cbc_dataloader
+
+logger = setup_logging(log_level="INFO")
+
+
+def time_epochs(loader, epochs: int) -> float:
+    """Return the best wall-clock time of several training epochs."""
+    torch.manual_seed(0)
+    trainer = LocalTrainer(CBCModel(), device="cpu")
+    best = float("inf")
+    for _ in range(epochs):
+        start = time.perf_counter()
+        trainer.train_epoch(loader)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    """Compare CBC loader epoch times."""
+    parser = argparse.ArgumentParser(description="Benchmark CBC data loaders")
+    parser.add_argument("--data-path", type=str, default="data/hospital_usa/cbc_data.csv",
+                        help="CBC CSV file")
+    parser.add_argument("--batch-size", type=int, default=32, help="Batch size")
+    parser.add_argument("--epochs", type=int, default=3, help="Timed epochs per loader")
+    args = parser.parse_args()
+
+    dataset = CBCDataset(args.data_path)
+    logger.info(f"Benchmarking on {len(dataset)} samples")
+
+    dataloader = build_cbc_dataloader(dataset, batch_size=args.batch_size, shuffle=True, num_workers=0)
+    batch_loader = CBCBatchLoader(dataset, batch_size=args.batch_size, shuffle=True)
+
+    dataloader_time = time_epochs(dataloader, args.epochs)
+    batch_loader_time = time_epochs(batch_loader, args.epochs)
+
+    logger.info(f"DataLoader:     {dataloader_time * 1000:.1f} ms/epoch")
+    logger.info(f"CBCBatchLoader: {batch_loader_time * 1000:.1f} ms/epoch "
+                f"({dataloader_time / batch_loader_time:.2f}x)")
+
+
+if __name__ == "__main__":
+    main()
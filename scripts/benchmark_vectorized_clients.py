@@ -0,0 +1,95 @@
+"""Benchmark per-client loop vs vectorized (vmap) CBC client simulation."""
+
+import time
+import torch
+import torch.nn as nn
+import argparse
+from torch.utils.data import DataLoader, TensorDataset
+from config.logging_config import setup_logging
+from models.thalassemia_models import CBCModel
+from federated.aggregator import FederatedAggregator
+from federated.vectorized import VectorizedClientSimulator
+
+logger = setup_logging(log_level="INFO")
+
+
+def loop_round(
+    global_weights: dict,
+    features: torch.Tensor,
+    labels: torch.Tensor,
+    client_sizes: list,
+    local_steps: int,
+    batch_size: int
+) -> dict:
+    """One round the way run_fl_standalone.py does it: a model per client."""
+    client_weights = []
+    start = 0
+    for size in client_sizes:
+        dataset = TensorDataset(features[start:start + size], labels[start:start + size])
+        loader = DataLoader(dataset, batch_size=batch_size, shuffle=True, drop_last=True)
+        start += size
+
+        model = CBCModel()
+        model.load_state_dict(global_weights)
+        model.train()
+        optimizer = torch.optim.Adam(model.parameters(), lr=0.001)
+        criterion = nn.CrossEntropyLoss()
+
+        steps = 0
+        while steps < local_steps:
+            for batch_features, batch_labels in loader:
+                loss = criterion(model(batch_features), batch_labels)
+                optimizer.zero_grad()
+                loss.backward()
+                optimizer.step()
+                steps += 1
+                if steps == local_steps:
+                    break
+
+        client_weights.append(model.state_dict())
+
+    return FederatedAggregator("fedavg").aggregate(client_weights, client_sizes)
+
+
+def main():
+    """Compare clients/second of the two simulation engines."""
+    parser = argparse.ArgumentParser(description="Benchmark vectorized client simulation")
+    parser.add_argument("--clients", type=int, default=1000, help="Vectorized clients per round")
+    parser.add_argument("--loop-clients", type=int, default=50, help="Clients timed in the loop engine")
+    parser.add_argument("--samples-per-client", type=int, default=200, help="Rows per client")
+    parser.add_argument("--local-steps", type=int, default=10, help="Optimizer steps per client")
+    parser.add_argument("--batch-size", type=int, default=32, help="Per-client batch size")
+    args = parser.parse_args()
+
+    torch.manual_seed(0)
+    global_weights = CBCModel().state_dict()
+
+    n_clients = max(args.clients, args.loop_clients)
+    features = torch.randn(n_clients * args.samples_per_client, 8)
+    labels = torch.randint(0, 3, (n_clients * args.samples_per_client,))
+
+    loop_sizes = [args.samples_per_client] * args.loop_clients
+    start = time.perf_counter()
+    loop_round(global_weights, features, labels, loop_sizes, args.local_steps, args.batch_size)
+    loop_rate = args.loop_clients / (time.perf_counter() - start)
+
+    sizes = [args.samples_per_client] * args.clients
+    simulator = VectorizedClientSimulator(CBCModel(), num_clients=args.clients)
+    start = time.perf_counter()
+    simulator.run_round(
+        global_weights,
+        features[:sum(sizes)],
+        labels[:sum(sizes)],
+        sizes,
+        args.local_steps,
+        batch_size=args.batch_size
+    )
+    vectorized_rate = args.clients / (time.perf_counter() - start)
+
+    logger.info(f"Per-client loop: {loop_rate:.1f} clients/s ({args.loop_clients} clients)")
+    logger.info(f"Vectorized:      {vectorized_rate:.1f} clients/s ({args.clients} clients)")
+    logger.info(f"Speedup:         {vectorized_rate / loop_rate:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,42 @@
+"""Script to pre-decode and pre-resize blood smear images into a shard."""
+
+import argparse
+from pathlib import Path
+from config.settings import settings
+from config.logging_config import setup_logging
+from data_loaders.image_dataset import ImageDataset
+from data_loaders.image_shards import build_image_shard, list_class_images
+
+logger = setup_logging(log_level="INFO")
+
+
+def main():
+    """Build an image shard for ImageDataset/HybridDataset shard mode."""
+    parser = argparse.ArgumentParser(description="Build image shard")
+    parser.add_argument("--image-dir", type=str, required=True,
+                        help="Directory with one subdirectory per class")
+    parser.add_argument("--output", type=str, default=None,
+                        help="Shard directory (default: <image-dir>_shard_<size>)")
+    parser.add_argument("--image-size", type=int, default=settings.image_size, help="Target image size")
+    parser.add_argument("--workers", type=int, default=settings.num_workers, help="Decode threads")
+    args = parser.parse_args()
+
+    image_dir = Path(args.image_dir)
+    output = Path(args.output) if args.output else image_dir.parent / f"{image_dir.name}_shard_{args.image_size}"
+
+    image_paths = list_class_images(image_dir, list(ImageDataset.LABEL_MAP.keys()))
+    logger.info(f"Found {len(image_paths)} images in {image_dir}")
+
+    build_image_shard(
+        image_dir,
+        output,
+        image_paths,
+        image_size=args.image_size,
+        num_workers=args.workers
+    )
+
+    logger.info(f"Use shard_dir={output} with ImageDataset or HybridDataset")
+
+
+if __name__ == "__main__":
+    main()
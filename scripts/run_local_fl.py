@@ -6,18 +6,29 @@ import argparse
 from config.settings import settings
 from config.logging_config import setup_logging
 from models.thalassemia_models import get_model
-from data_loaders.cbc_dataset import create_cbc_dataloader
+from data_loaders.dataset_cache import ClientDatasetCache
 from training.local_trainer import LocalTrainer
 from federated.orchestrator import FederatedOrchestrator
+from federated.feature_stats import compute_feature_stats
+from federated.client_pool import ClientProcessPool
 from blockchain.ledger import BlockchainLedger
+from blockchain.blockchain_utils import hash_model_weights_merkle
 
 logger = setup_logging(log_level=settings.log_level, log_dir=settings.logs_dir)
 
+# Hospital datasets are loaded and scaled once per process, then reused each round
+dataset_cache = ClientDatasetCache(
+    use_store=settings.cbc_column_store,
+    out_of_core_bytes=settings.out_of_core_mb * 1024 * 1024
+)
+
 
 def train_hospital_client(
     hospital_name: str,
     global_weights: dict,
-    local_epochs: int = 5
+    local_epochs: int = 5,
+    seed: int = None,
+    scaler=None
 ) -> tuple:
     """
     Train a hospital client locally.
@@ -26,12 +37,17 @@ def train_hospital_client(
         hospital_name: Hospital name
         global_weights: Global model weights
         local_epochs: Number of local epochs
+        seed: Torch seed for shuffling and dropout (makes runs reproducible)
+        scaler: Global scaler from the statistics round (fit locally if None)
         
     Returns:
         Tuple of (weights, data_size, metrics)
     """
     logger.info(f"Training client: {hospital_name}")
     
+    if seed is not None:
+        torch.manual_seed(seed)
+    
     # Load data
     data_path = settings.data_dir / f"hospital_{hospital_name}" / "cbc_data.csv"
     
@@ -39,10 +55,13 @@ def train_hospital_client(
         logger.warning(f"Data not found for {hospital_name}")
         return None, 0, {}
     
-    train_loader = create_cbc_dataloader(
+    train_loader = dataset_cache.get_loader(
         data_path,
         batch_size=settings.batch_size,
-        num_workers=settings.num_workers
+        num_workers=settings.num_workers,
+        scaler=scaler,
+        fit_scaler=scaler is None,
+        batch_loader=settings.cbc_batch_loader
     )
     
     # Create model and load global weights
@@ -71,6 +90,8 @@ def main():
     parser = argparse.ArgumentParser(description="Run local FL simulation")
     parser.add_argument("--rounds", type=int, default=None, help="FL rounds")
     parser.add_argument("--local-epochs", type=int, default=None, help="Local epochs")
+    parser.add_argument("--workers", type=int, default=1, help="Parallel client worker processes")
+    parser.add_argument("--seed", type=int, default=42, help="Base random seed")
     args = parser.parse_args()
     
     fl_rounds = args.rounds or settings.fl_rounds
@@ -81,17 +102,40 @@ def main():
     logger.info("=" * 60)
     
     # Initialize global model
+    torch.manual_seed(args.seed)
     global_model = get_model("cbc", num_classes=settings.num_classes)
     
     # Initialize orchestrator
     orchestrator = FederatedOrchestrator(
         global_model,
         aggregation_method=settings.aggregation_method,
-        min_clients=settings.min_clients
+        min_clients=settings.min_clients,
+        use_flat_buffer=settings.flat_aggregation
+    )
+    
+    # Initialize blockchain (blocks are appended to the on-disk log or database
+    # by a background writer, off the aggregation path)
+    blockchain = BlockchainLedger(
+        log_path=settings.ledger_path,
+        storage=settings.ledger_storage,
+        fsync=settings.ledger_fsync,
+        fsync_every=settings.ledger_fsync_every,
+        snapshot_every=settings.ledger_snapshot_every,
+        batch_client_updates=settings.ledger_batch_updates,
+        async_commits=settings.ledger_async_commits
     )
     
-    # Initialize blockchain
-    blockchain = BlockchainLedger()
+    # Statistics round: every hospital shares feature count/sum/sum-of-squares
+    # once, and all rounds are trained with the resulting global scaler
+    client_stats = []
+    for hospital in settings.hospitals:
+        data_path = settings.data_dir / f"hospital_{hospital}" / "cbc_data.csv"
+        if data_path.exists():
+            client_stats.append(compute_feature_stats(data_path, use_store=settings.cbc_column_store))
+    global_scaler = orchestrator.aggregate_feature_stats(client_stats) if client_stats else None
+    
+    # Train clients in a worker pool when more than one worker is requested
+    pool = ClientProcessPool(args.workers) if args.workers > 1 else None
     
     # Federated learning rounds
     for round_num in range(fl_rounds):
@@ -102,22 +146,23 @@ def main():
         # Get global weights
         global_weights = orchestrator.get_global_weights()
         
-        # Train each hospital client
-        client_weights = []
-        client_sizes = []
-        client_metrics = []
+        # Stream each hospital's update into the aggregator as soon as it is
+        # trained, so only one client state dict is resident at a time
+        orchestrator.begin_round()
         
-        for hospital in settings.hospitals:
-            weights, size, metrics = train_hospital_client(
-                hospital,
-                global_weights,
-                local_epochs
-            )
-            
+        client_args = [
+            (hospital, global_weights, local_epochs, args.seed + round_num * len(settings.hospitals) + i, global_scaler)
+            for i, hospital in enumerate(settings.hospitals)
+        ]
+        if pool is not None:
+            results = pool.map(train_hospital_client, client_args)
+        else:
+            results = (train_hospital_client(*client) for client in client_args)
+        
+        for hospital, (weights, size, metrics) in zip(settings.hospitals, results):
             if weights is not None:
-                client_weights.append(weights)
-                client_sizes.append(size)
-                client_metrics.append(metrics)
+                orchestrator.accumulate_client_update(weights, size, metrics)
+                del weights
                 
                 # Record on blockchain
                 blockchain.record_client_update(
@@ -128,35 +173,43 @@ def main():
                 )
         
         # Aggregate
-        if len(client_weights) >= settings.min_clients:
-            global_weights = orchestrator.run_round(
-                client_weights,
-                client_sizes,
-                client_metrics
-            )
+        num_clients = orchestrator.num_round_clients
+        if num_clients >= settings.min_clients:
+            global_weights = orchestrator.finalize_round()
             
             # Record on blockchain
             avg_metrics = orchestrator.history['global_metrics'][-1]
             blockchain.record_fl_round(
                 round_num + 1,
-                len(client_weights),
-                avg_metrics
+                num_clients,
+                avg_metrics,
+                model_hash=hash_model_weights_merkle(global_weights)
             )
         else:
+            orchestrator.abort_round()
+            blockchain.commit_client_updates(round_num + 1)
             logger.warning(f"Not enough clients in round {round_num + 1}")
+        
+        # Archive old rounds behind a state block to bound ledger memory
+        if settings.ledger_prune_every and (round_num + 1) % settings.ledger_prune_every == 0:
+            blockchain.prune()
+    
+    if pool is not None:
+        pool.shutdown()
     
     # Save final model
     final_model_path = settings.models_dir / "final_global_model.pth"
     torch.save(global_model.state_dict(), final_model_path)
     logger.info(f"Saved final model to {final_model_path}")
     
-    # Save blockchain
+    # Export blockchain (the blocks are already in storage)
     blockchain_path = settings.project_root / "blockchain_ledger.json"
     blockchain.save_to_file(str(blockchain_path))
     
     logger.info("\nFederated learning complete!")
     logger.info(f"Total rounds: {fl_rounds}")
     logger.info(f"Blockchain validation: {blockchain.is_valid()}")
+    blockchain.close()
 
 
 if __name__ == "__main__":
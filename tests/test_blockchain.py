@@ -1,7 +1,12 @@
 """Unit tests for blockchain."""
 
+import json
 import pytest
+import torch
 from blockchain.ledger import BlockchainLedger, Block
+from config.settings import DEFAULT_SECRET_KEY
+from blockchain.blockchain_utils import hash_model_weights_stream, hash_model_weights_merkle
+from models.thalassemia_models import CBCModel
 from blockchain.smart_contract import SmartContract
 
 
@@ -48,3 +53,408 @@ def test_smart_contract():
     # Test aggregation permission
     assert contract.can_aggregate(["client1", "client2"])
     assert not contract.can_aggregate(["client1"])  # Not enough clients
+
+
+def test_ledger_log_resume(tmp_path):
+    """Test blocks are appended to the log and the chain resumes from it."""
+    log_path = tmp_path / "chain.jsonl"
+    blockchain = BlockchainLedger(log_path=log_path, fsync="always")
+    for i in range(5):
+        blockchain.record_client_update(1, f"hospital_{i}", 100, {"accuracy": 0.9})
+    blockchain.close()
+    
+    assert len(log_path.read_text().splitlines()) == 6
+    
+    resumed = BlockchainLedger(log_path=log_path)
+    assert resumed.get_chain() == blockchain.get_chain()
+    
+    resumed.record_fl_round(1, 5, {"accuracy": 0.9})
+    assert resumed.is_valid()
+    resumed.close()
+
+
+def test_ledger_snapshot_and_torn_tail(tmp_path):
+    """Test snapshots compact the log and a torn last line is dropped."""
+    log_path = tmp_path / "chain.jsonl"
+    blockchain = BlockchainLedger(log_path=log_path, snapshot_every=4)
+    for i in range(6):
+        blockchain.add_block({"i": i})
+    blockchain.close()
+    
+    assert (tmp_path / "chain.jsonl.snapshot").exists()
+    assert len(log_path.read_text().splitlines()) == 3
+    
+    with open(log_path, "a") as f:
+        f.write('{"index": 7, "timest')
+    
+    resumed = BlockchainLedger(log_path=log_path)
+    assert len(resumed.chain) == 7
+    assert resumed.is_valid()
+    resumed.close()
+
+
+def test_incremental_validation_from_anchor(monkeypatch):
+    """Test validation re-hashes only blocks after the latest anchor."""
+    blockchain = BlockchainLedger(anchor_key="test-key")
+    for i in range(10):
+        blockchain.add_block({"i": i})
+    assert blockchain.is_valid()
+    
+    calls = []
+    original = Block.calculate_hash
+    monkeypatch.setattr(Block, "calculate_hash", lambda self: calls.append(self.index) or original(self))
+    
+    blockchain.add_block({"i": 10})
+    calls.clear()
+    assert blockchain.is_valid()
+    assert calls == [11]
+    
+    # Tampering after the anchor is caught incrementally, before it only by the audit
+    blockchain.add_block({"i": 11})
+    blockchain.chain[12].data["i"] = -1
+    assert not blockchain.is_valid()
+    blockchain.chain[12].data["i"] = 11
+    blockchain.chain[3].data["i"] = -1
+    assert blockchain.is_valid()
+    assert not blockchain.audit()
+    assert blockchain.last_audit["valid"] is False
+
+
+def test_anchor_signatures(tmp_path):
+    """Test persisted anchors are reused and forged anchors are ignored."""
+    log_path = tmp_path / "chain.jsonl"
+    blockchain = BlockchainLedger(log_path=log_path, anchor_key="test-key")
+    blockchain.add_block({"i": 1})
+    assert blockchain.is_valid()
+    blockchain.close()
+    
+    anchors_path = tmp_path / "chain.jsonl.anchors"
+    with open(anchors_path, "a") as f:
+        f.write('{"index": 1, "hash": "forged", "signature": "00"}\n')
+    
+    resumed = BlockchainLedger(log_path=log_path, anchor_key="test-key")
+    assert resumed.anchors.latest()["hash"] == blockchain.chain[1].hash
+    assert resumed.is_valid()
+    resumed.close()
+    
+    other_key = BlockchainLedger(log_path=log_path, anchor_key="other-key")
+    assert other_key.anchors.latest() is None
+    
+    # Anchors signed with the placeholder key are never written to disk
+    default_path = tmp_path / "default.jsonl"
+    default_key = BlockchainLedger(log_path=default_path, anchor_key=DEFAULT_SECRET_KEY)
+    assert default_key.is_valid()
+    assert default_key.anchors.latest() is not None
+    assert not (tmp_path / "default.jsonl.anchors").exists()
+    other_key.close()
+
+
+def test_load_trusts_stored_hashes(tmp_path, monkeypatch):
+    """Test loading streams the export without re-hashing unless verifying."""
+    blockchain = BlockchainLedger()
+    for i in range(20):
+        blockchain.record_client_update(1, f"hospital_{i}", 100, {"accuracy": 0.5})
+    path = tmp_path / "ledger.json"
+    blockchain.save_to_file(str(path))
+    
+    calls = []
+    original = Block.calculate_hash
+    monkeypatch.setattr(Block, "calculate_hash", lambda self: calls.append(self.index) or original(self))
+    
+    loaded = BlockchainLedger()
+    calls.clear()
+    loaded.load_from_file(str(path))
+    assert calls == []
+    assert loaded.get_chain() == blockchain.get_chain()
+    assert loaded.is_valid()
+    
+    data = path.read_text().replace('"hospital_7"', '"hospital_X"')
+    path.write_text(data)
+    with pytest.raises(ValueError):
+        BlockchainLedger().load_from_file(str(path), verify=True)
+
+
+def test_iter_json_array_small_chunks(tmp_path):
+    """Test the streaming array parser across chunk boundaries."""
+    from blockchain.ledger_log import iter_json_array
+    
+    items = [{"index": i, "data": {"text": "x" * i}} for i in range(30)] + [12345, "tail"]
+    path = tmp_path / "array.json"
+    path.write_text(json.dumps(items, indent=2))
+    
+    assert list(iter_json_array(path, chunk_size=7)) == items
+
+
+def test_model_weight_hashes():
+    """Test streaming and Merkle weight hashes are deterministic and sensitive."""
+    weights = CBCModel().state_dict()
+    
+    assert hash_model_weights_stream(weights) == hash_model_weights_stream(dict(reversed(list(weights.items()))))
+    assert hash_model_weights_merkle(weights) == hash_model_weights_merkle(weights, num_threads=4)
+    
+    changed = {key: value.clone() for key, value in weights.items()}
+    key = next(iter(changed))
+    changed[key].view(-1)[0] += 1
+    assert hash_model_weights_stream(changed) != hash_model_weights_stream(weights)
+    assert hash_model_weights_merkle(changed) != hash_model_weights_merkle(weights)
+    
+    # Same bytes under a different dtype/shape must not collide
+    flat = torch.zeros(4, dtype=torch.float32)
+    assert hash_model_weights_stream({"w": flat}) != hash_model_weights_stream({"w": flat.view(2, 2)})
+    assert hash_model_weights_stream({"w": flat}) != hash_model_weights_stream({"w": flat.view(torch.int32)})
+
+
+def test_batched_client_updates_inclusion_proofs():
+    """Test a round's updates share one block and every client has a valid proof."""
+    blockchain = BlockchainLedger(batch_client_updates=True)
+    clients = [f"hospital_{i}" for i in range(7)]
+    for client in clients:
+        assert blockchain.record_client_update(1, client, 100, {"accuracy": 0.5}) is None
+    blockchain.record_fl_round(1, len(clients), {"accuracy": 0.5})
+    
+    assert len(blockchain.chain) == 3
+    assert blockchain.chain[1].data["type"] == "client_updates"
+    assert blockchain.is_valid()
+    
+    for client in clients:
+        proof = blockchain.get_inclusion_proof(1, client)
+        assert len(proof["proof"]) <= 3
+        assert BlockchainLedger.verify_inclusion_proof(proof)
+    
+    proof["record"]["data_size"] = 999
+    assert not BlockchainLedger.verify_inclusion_proof(proof)
+    with pytest.raises(ValueError):
+        blockchain.get_inclusion_proof(1, "hospital_unknown")
+
+
+def test_merkle_proofs_all_sizes():
+    """Test Merkle proofs for every leaf of odd and even trees."""
+    import hashlib
+    from blockchain.blockchain_utils import merkle_root, merkle_proof, verify_merkle_proof
+    
+    for n in range(1, 10):
+        leaves = [hashlib.sha256(bytes([i])).digest() for i in range(n)]
+        root = merkle_root(leaves)
+        for i in range(n):
+            assert verify_merkle_proof(leaves[i], merkle_proof(leaves, i), root)
+        if n > 1:
+            assert not verify_merkle_proof(leaves[0], merkle_proof(leaves, n - 1), root)
+    
+    # Duplicating the odd last leaf or passing a node off as a leaf changes the root
+    leaves = [hashlib.sha256(bytes([i])).digest() for i in range(3)]
+    assert merkle_root(leaves) != merkle_root(leaves + leaves[-1:])
+    pair_root = merkle_root(leaves[:2])
+    assert merkle_root([pair_root]) != pair_root
+
+
+def test_get_blocks_filters_and_pages():
+    """Test indexed block queries by type, round and client with pagination."""
+    blockchain = BlockchainLedger()
+    for round_number in range(1, 4):
+        for client in ("italy", "usa"):
+            blockchain.record_client_update(round_number, client, 100, {"accuracy": 0.5})
+        blockchain.record_fl_round(round_number, 2, {"accuracy": 0.5})
+    
+    assert [b["data"]["round"] for b in blockchain.get_fl_rounds()] == [1, 2, 3]
+    assert len(blockchain.get_blocks(client_id="usa")) == 3
+    assert len(blockchain.get_blocks(block_type="client_update", round_number=2)) == 2
+    assert blockchain.get_blocks(round_number=2, client_id="italy")[0]["index"] == 4
+    
+    page = blockchain.get_blocks(block_type="client_update", offset=1, limit=2)
+    assert [b["index"] for b in page] == [2, 4]
+    assert [b["index"] for b in blockchain.get_blocks(offset=8, limit=5)] == [8, 9]
+    assert blockchain.count_blocks() == {"total": 10, "client_update": 6, "fl_round": 3}
+
+
+def test_index_persisted_and_resumed(tmp_path):
+    """Test the saved index is reused and extended, and batched clients are indexed."""
+    log_path = tmp_path / "chain.jsonl"
+    blockchain = BlockchainLedger(log_path=log_path, batch_client_updates=True)
+    for client in ("italy", "pakistan"):
+        blockchain.record_client_update(1, client, 100, {})
+    blockchain.record_fl_round(1, 2, {})
+    blockchain.close()
+    
+    resumed = BlockchainLedger(log_path=log_path, batch_client_updates=True)
+    assert resumed.chain.index.height == 2
+    assert [b["index"] for b in resumed.get_blocks(client_id="pakistan")] == [1]
+    assert resumed.get_inclusion_proof(1, "italy")["block_index"] == 1
+    
+    resumed.record_client_update(2, "italy", 100, {})
+    resumed.record_fl_round(2, 1, {})
+    
+    reader = BlockchainLedger(log_path=log_path, read_only=True)
+    assert len(reader.get_blocks(client_id="italy")) == 2
+    assert reader.count_blocks()["fl_round"] == 2
+    with pytest.raises(ValueError):
+        reader.add_block({"type": "test"})
+    
+    # A refresh reads only the appended lines; a snapshot makes it re-read
+    first = reader.chain.blocks[0]
+    resumed.record_fl_round(3, 1, {})
+    reader.refresh()
+    assert reader.chain.blocks[0] is first
+    assert reader.count_blocks()["fl_round"] == 3
+    resumed.snapshot()
+    resumed.record_fl_round(4, 1, {})
+    reader.refresh()
+    assert reader.get_chain() == resumed.get_chain()
+    assert reader.count_blocks()["fl_round"] == 4
+    resumed.close()
+
+
+def test_sqlite_storage(tmp_path):
+    """Test the SQLite backend resumes, queries by range and index, and shares the file with readers."""
+    import sqlite3
+    
+    db_path = tmp_path / "chain.db"
+    blockchain = BlockchainLedger(log_path=db_path, storage="sqlite", batch_client_updates=True)
+    for round_number in range(1, 4):
+        for client in ("italy", "usa"):
+            blockchain.record_client_update(round_number, client, 100, {"accuracy": 0.5})
+        blockchain.record_fl_round(round_number, 2, {"accuracy": 0.5})
+    assert blockchain.is_valid()
+    
+    conn = sqlite3.connect(db_path)
+    assert conn.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+    conn.close()
+    
+    reader = BlockchainLedger(log_path=db_path, storage="sqlite", read_only=True)
+    assert len(reader.chain) == 7
+    blockchain.add_block({"type": "test"})
+    assert len(reader.chain) == 8
+    assert reader.count_blocks() == {"total": 8, "client_updates": 3, "fl_round": 3, "test": 1}
+    assert [b["index"] for b in reader.get_blocks(client_id="usa", offset=1)] == [3, 5]
+    assert [b.index for b in reader.chain[2:5]] == [2, 3, 4]
+    assert reader.chain[-1].data == {"type": "test"}
+    reader.close()
+    
+    chain = blockchain.get_chain()
+    blockchain.close()
+    resumed = BlockchainLedger(log_path=db_path, storage="sqlite", verify_on_load=True)
+    assert resumed.get_chain() == chain
+    assert resumed.get_inclusion_proof(2, "italy")["block_index"] == 3
+    resumed.close()
+
+
+@pytest.mark.parametrize("storage", ["memory", "sqlite"])
+def test_prune_to_state_block(tmp_path, storage):
+    """Test pruning archives the prefix, summarizes it and keeps the chain valid."""
+    from blockchain.pruning import iter_archive, verify_archive
+    
+    log_path = tmp_path / "chain.db"
+    blockchain = BlockchainLedger(log_path=log_path, storage=storage)
+    for round_number in range(1, 5):
+        for client in ("italy", "usa"):
+            blockchain.record_client_update(round_number, client, 100, {"accuracy": 0.5})
+        blockchain.record_fl_round(round_number, 2, {"accuracy": 0.5})
+        if round_number == 2:
+            state = blockchain.prune()
+    totals = blockchain.get_state()
+    
+    assert state.index == 6 and blockchain.chain[0].hash == state.hash
+    assert len(blockchain.chain) == 7
+    assert state.data["clients"]["usa"] == {"updates": 2, "data_size": 200, "last_round": 2}
+    assert [r["round"] for r in state.data["rounds"]] == [1, 2]
+    assert totals["clients"]["italy"]["updates"] == 4
+    assert [r["round"] for r in totals["rounds"]] == [1, 2, 3, 4]
+    assert blockchain.is_valid() and blockchain.audit()
+    
+    archive = tmp_path / "chain.db.archive" / "blocks_0000000000_0000000006.jsonl.gz"
+    assert [b.index for b in iter_archive(archive)] == list(range(7))
+    assert verify_archive(archive, state)
+    
+    blockchain.close()
+    resumed = BlockchainLedger(log_path=log_path, storage=storage)
+    assert resumed.chain.base == 6
+    assert resumed.get_state() == totals
+    assert resumed.is_valid(full=True)
+    resumed.add_block({"type": "test"})
+    assert resumed.get_latest_block().index == 13
+    
+    second = resumed.prune(height=10)
+    assert second.data["clients"]["italy"]["updates"] == 4
+    assert second.data["clients"]["usa"]["updates"] == 3
+    assert len(resumed.chain) == 4
+    assert resumed.is_valid(full=True)
+    
+    assert resumed.audit()
+    
+    # The pruned chain round-trips through a verified JSON export
+    export_path = tmp_path / "export.json"
+    resumed.save_to_file(export_path)
+    copy = BlockchainLedger(archive_dir=resumed.archive_dir)
+    copy.load_from_file(export_path, verify=True)
+    assert copy.get_chain() == resumed.get_chain()
+    assert copy.is_valid(full=True) and copy.audit()
+    
+    # A rewritten summary with a recomputed hash passes the live chain
+    # checks, but no longer matches its archive
+    tampered = Block.from_dict(json.loads(json.dumps(resumed.chain[0].to_dict())))
+    tampered.data["clients"]["italy"]["updates"] = 99
+    tampered.hash = tampered.calculate_hash()
+    resumed.chain.replace([tampered] + resumed.chain[1:])
+    assert resumed.is_valid(full=True)
+    assert not resumed.audit()
+    resumed.close()
+
+
+def test_background_audit_survives_errors(monkeypatch):
+    """Test an exception in a background audit is recorded as a failed audit."""
+    import threading
+    
+    blockchain = BlockchainLedger(anchor_key="test-key")
+    audited = threading.Event()
+    
+    def failing_audit():
+        audited.set()
+        raise RuntimeError("storage unavailable")
+    
+    monkeypatch.setattr(blockchain, "audit", failing_audit)
+    blockchain.start_background_audit(interval_seconds=0.01)
+    assert audited.wait(5)
+    audited.clear()
+    assert audited.wait(5)  # the thread kept running
+    blockchain.stop_background_audit()
+    
+    assert blockchain.last_audit["valid"] is False
+    assert blockchain.last_audit["error"] == "storage unavailable"
+
+
+@pytest.mark.parametrize("storage", ["memory", "sqlite"])
+def test_async_commits(tmp_path, storage):
+    """Test queued blocks are committed in order, resolve their futures and persist."""
+    log_path = tmp_path / "chain.db"
+    blockchain = BlockchainLedger(log_path=log_path, storage=storage, async_commits=True, commit_batch_size=8)
+    futures = [blockchain.record_client_update(1, f"hospital_{i}", 100, {}) for i in range(50)]
+    bad = blockchain.submit_block({"value": object()})
+    futures.append(blockchain.record_fl_round(1, 50, {"accuracy": 0.5}))
+    blockchain.flush()
+    
+    assert [future.result().index for future in futures] == list(range(1, 52))
+    assert isinstance(bad.exception(), TypeError)
+    assert blockchain.add_block({"type": "sync"}).index == 52
+    assert blockchain.is_valid()
+    
+    chain = blockchain.get_chain()
+    blockchain.record_fl_round(2, 0, {})
+    blockchain.close()
+    
+    resumed = BlockchainLedger(log_path=log_path, storage=storage)
+    assert resumed.get_chain()[:53] == chain
+    assert resumed.get_latest_block().data["round"] == 2
+    assert resumed.is_valid(full=True)
+    resumed.close()
+
+
+def test_incomplete_block_store_rejected():
+    """Test a storage backend missing part of the interface fails when created."""
+    from blockchain.storage import BlockStore, MemoryBlockStore
+    
+    class PartialStore(BlockStore):
+        def __len__(self):
+            return 0
+    
+    with pytest.raises(TypeError):
+        PartialStore()
+    assert len(MemoryBlockStore()) == 0
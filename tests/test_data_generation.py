@@ -0,0 +1,78 @@
+"""Tests for synthetic data generation."""
+
+import zlib
+import numpy as np
+import pandas as pd
+from data_generation.thalassemia_data_generator import ThalassemiaDataGenerator, stable_seed
+from data_generation.parallel_generation import generate_hospitals_parallel
+
+
+def test_vectorized_dataset_schema():
+    """Test the vectorized path matches the legacy schema and counts."""
+    legacy = ThalassemiaDataGenerator(seed=0).generate_dataset(200)
+    df = ThalassemiaDataGenerator(seed=0).generate_dataset_vectorized(200)
+    
+    assert list(df.columns) == list(legacy.columns)
+    assert df["condition"].value_counts().to_dict() == legacy["condition"].value_counts().to_dict()
+    assert df["patient_id"].is_unique
+    assert df["age"].between(1, 79).all()
+    
+    params = ThalassemiaDataGenerator.CBC_PARAMETERS
+    for condition, group in df.groupby("condition"):
+        for name, (min_val, max_val, std) in params[condition].items():
+            assert group[name].between(min_val - std, max_val + std).all()
+
+
+def test_write_dataset_chunked(tmp_path):
+    """Test chunked writing keeps exact condition totals and is reproducible."""
+    distribution = {"normal": 0.5, "minor": 0.3, "major": 0.2}
+    paths = [tmp_path / "a.csv", tmp_path / "b.csv"]
+    for path in paths:
+        written = ThalassemiaDataGenerator(seed=3).write_dataset_chunked(path, 250, distribution, chunk_rows=60)
+        assert written == 250
+    
+    df = pd.read_csv(paths[0])
+    assert len(df) == 250
+    assert df["condition"].value_counts().to_dict() == {"normal": 125, "minor": 75, "major": 50}
+    assert df["patient_id"].is_unique
+    assert paths[0].read_bytes() == paths[1].read_bytes()
+
+
+def test_parallel_generation_independent_of_workers(tmp_path):
+    """Test parallel generation output does not depend on the worker count."""
+    outputs = {}
+    for workers in (1, 2):
+        specs = [
+            (name, n, tmp_path / f"w{workers}" / f"hospital_{name}")
+            for name, n in [("italy", 130), ("synth_0000", 45)]
+        ]
+        outputs[workers] = [p.read_bytes() for p in generate_hospitals_parallel(specs, seed=7, num_workers=workers, chunk_rows=50)]
+    
+    assert outputs[1] == outputs[2]
+    
+    df = pd.read_csv(tmp_path / "w1" / "hospital_italy" / "cbc_data.csv")
+    assert len(df) == 130
+    assert df["patient_id"].is_unique
+    assert not (tmp_path / "w1" / "hospital_italy" / "cbc_data.parts").exists()
+
+
+def test_parallel_per_sample_generation(tmp_path):
+    """Test the per-sample path is reproducible and leaves the global RNG alone."""
+    state = np.random.get_state()[1].copy()
+    outputs = {}
+    for workers in (1, 2):
+        specs = [("usa", 80, tmp_path / f"w{workers}" / "hospital_usa")]
+        paths = generate_hospitals_parallel(specs, seed=7, num_workers=workers, chunk_rows=30, vectorized=False)
+        outputs[workers] = paths[0].read_bytes()
+    
+    assert outputs[1] == outputs[2]
+    assert (np.random.get_state()[1] == state).all()
+    
+    df = pd.read_csv(tmp_path / "w1" / "hospital_usa" / "cbc_data.csv")
+    assert len(df) == 80
+    assert df["patient_id"].is_unique
+
+
+def test_stable_seed():
+    """Test hospital seeds do not depend on string hash randomization."""
+    assert stable_seed("italy") == zlib.crc32(b"italy") % 10000
@@ -0,0 +1,285 @@
+"""Unit tests for data loaders."""
+
+import pytest
+import numpy as np
+import torch
+from pathlib import Path
+from data_generation.thalassemia_data_generator import ThalassemiaDataGenerator
+from data_loaders.cbc_dataset import CBCDataset, CBCBatchLoader
+from data_loaders.dataset_cache import ClientDatasetCache
+
+
+@pytest.fixture
+def cbc_csv(tmp_path):
+    """Write a small synthetic hospital CSV."""
+    generator = ThalassemiaDataGenerator(seed=0)
+    df = generator.generate_dataset(200)
+    csv_path = tmp_path / "hospital_test" / "cbc_data.csv"
+    generator.save_dataset(df, csv_path)
+    return csv_path
+
+
+def test_cbc_dataset(cbc_csv):
+    """Test CBC dataset items."""
+    dataset = CBCDataset(cbc_csv)
+    features, label = dataset[0]
+    
+    assert len(dataset) == 200
+    assert features.shape == (8,)
+    assert features.dtype == torch.float32
+    assert label.dtype == torch.long
+    assert set(dataset.labels.tolist()) <= {0, 1, 2}
+
+
+def test_cbc_batch_loader(cbc_csv):
+    """Test batch loader covers every row once per epoch."""
+    dataset = CBCDataset(cbc_csv)
+    generator = torch.Generator().manual_seed(0)
+    loader = CBCBatchLoader(dataset, batch_size=32, shuffle=True, generator=generator)
+    batches = list(loader)
+    
+    assert len(loader) == len(batches) == 7
+    assert batches[0][0].shape == (32, 8)
+    assert batches[-1][0].shape == (8, 8)
+    
+    order = torch.randperm(200, generator=torch.Generator().manual_seed(0))
+    assert torch.equal(torch.cat([batch[0] for batch in batches]), dataset.features[order])
+    assert torch.equal(torch.cat([batch[1] for batch in batches]), dataset.labels[order])
+    
+    loader = CBCBatchLoader(dataset, batch_size=32, shuffle=False, drop_last=True)
+    assert len(loader) == len(list(loader)) == 6
+
+
+def test_dataset_cache_reuses_and_invalidates(cbc_csv):
+    """Test cached loaders are reused until the file changes."""
+    cache = ClientDatasetCache()
+    loader1 = cache.get_loader(cbc_csv, batch_size=16, num_workers=0)
+    loader2 = cache.get_loader(cbc_csv, batch_size=16, num_workers=0)
+    
+    assert loader1 is loader2
+    assert len(loader1.dataset) == 200
+    
+    # Appending a row changes mtime/size and forces a reload
+    with open(cbc_csv, "a") as f:
+        f.write(open(cbc_csv).read().splitlines()[1] + "\n")
+    loader3 = cache.get_loader(cbc_csv, batch_size=16, num_workers=0)
+    
+    assert loader3 is not loader1
+    assert len(loader3.dataset) == 201
+
+
+def test_hybrid_dataset_image_index(cbc_csv, tmp_path):
+    """Test the image index resolves patients, fallbacks and persists."""
+    import numpy as np
+    from PIL import Image
+    from data_loaders.hybrid_dataset import HybridDataset
+    
+    image_dir = tmp_path / "images"
+    dataset = HybridDataset(cbc_csv, image_dir)
+    assert all(path is None for path in dataset.image_paths)
+    
+    first_id = dataset.patient_ids[0]
+    condition = list(HybridDataset.LABEL_MAP)[dataset.labels[0]]
+    (image_dir / condition).mkdir(parents=True)
+    Image.fromarray(np.zeros((8, 8, 3), dtype=np.uint8)).save(image_dir / condition / f"{first_id}.png")
+    
+    index_path = tmp_path / "image_index.json"
+    dataset = HybridDataset(cbc_csv, image_dir, index_path=index_path)
+    assert dataset.get_image_path(0) == image_dir / condition / f"{first_id}.png"
+    assert index_path.exists()
+    
+    # Other patients of the same class fall back to that image
+    same_class = [i for i in range(len(dataset)) if dataset.labels[i] == dataset.labels[0]]
+    assert all(dataset.get_image_path(i) == dataset.get_image_path(0) for i in same_class)
+    
+    # The persisted index is refreshed when the class directory changes
+    other_id = dataset.patient_ids[same_class[1]]
+    Image.fromarray(np.zeros((8, 8, 3), dtype=np.uint8)).save(image_dir / condition / f"{other_id}.jpg")
+    dataset = HybridDataset(cbc_csv, image_dir, index_path=index_path)
+    assert dataset.get_image_path(same_class[1]).name == f"{other_id}.jpg"
+    
+    cbc_features, image, label = dataset[0]
+    assert image.shape == (3, 224, 224)
+
+
+def test_image_shard_matches_decoding(tmp_path):
+    """Test shard mode yields the same tensors as decoding from disk."""
+    import pickle
+    import numpy as np
+    from PIL import Image
+    from data_loaders.image_dataset import ImageDataset
+    from data_loaders.image_shards import build_image_shard, list_class_images
+    
+    image_dir = tmp_path / "images"
+    rng = np.random.default_rng(0)
+    for condition in ("normal", "major"):
+        (image_dir / condition).mkdir(parents=True)
+        for i in range(3):
+            pixels = rng.integers(0, 256, (40, 50, 3), dtype=np.uint8)
+            Image.fromarray(pixels).save(image_dir / condition / f"P{i}.png")
+    
+    image_paths = list_class_images(image_dir, list(ImageDataset.LABEL_MAP))
+    shard = build_image_shard(image_dir, tmp_path / "shard", image_paths, image_size=32)
+    assert len(shard) == 6
+    assert pickle.loads(pickle.dumps(shard))._images is None
+    
+    transform = ImageDataset.get_default_transform(32, training=False)
+    decoded = ImageDataset(image_dir, transform=transform, image_size=32)
+    sharded = ImageDataset(image_dir, image_size=32, shard_dir=tmp_path / "shard")
+    sharded.transform = ImageDataset.get_default_transform(32, training=False, resize=False)
+    
+    for idx in range(len(decoded)):
+        assert torch.equal(decoded[idx][0], sharded[idx][0])
+    
+    with pytest.raises(ValueError):
+        ImageDataset(image_dir, image_size=64, shard_dir=tmp_path / "shard")
+
+
+def test_cbc_column_store_sync(cbc_csv):
+    """Test the column store matches the CSV and syncs appended rows."""
+    import pandas as pd
+    from data_loaders.cbc_store import CBCColumnStore
+    
+    store = CBCColumnStore.sync(cbc_csv, chunk_rows=64)
+    df = pd.read_csv(cbc_csv)
+    
+    assert len(store) == len(df)
+    assert np.allclose(store.column("hb"), df["hb"].to_numpy(), atol=1e-4)
+    assert (store.decode("patient_id") == df["patient_id"].to_numpy()).all()
+    assert (store.label_codes("condition", CBCDataset.LABEL_MAP)
+            == df["condition"].map(CBCDataset.LABEL_MAP).to_numpy()).all()
+    
+    # Appended rows are converted incrementally, keeping existing codes
+    codes = np.array(store.column("condition"))
+    with open(cbc_csv, "a") as f:
+        f.write("13.1,5.0,90.0,29.0,33.0,13.0,7.0,250.0,PNEW,unknown_label,40,F\n")
+    store = CBCColumnStore.sync(cbc_csv)
+    assert len(store) == len(df) + 1
+    assert (store.column("condition")[:-1] == codes).all()
+    assert store.decode("condition")[-1] == "unknown_label"
+    assert store.decode("patient_id")[-1] == "PNEW"
+    
+    # A rewritten CSV is rebuilt from scratch
+    df.head(50).to_csv(cbc_csv, index=False)
+    store = CBCColumnStore.sync(cbc_csv)
+    assert len(store) == 50
+    assert store.to_frame()["patient_id"].tolist() == df["patient_id"].head(50).tolist()
+    
+    # A same-length edit early in the CSV is detected too
+    lines = cbc_csv.read_text().splitlines(keepends=True)
+    lines[1] = lines[1].replace(lines[1][0], "9" if lines[1][0] != "9" else "8", 1)
+    cbc_csv.write_text("".join(lines))
+    store = CBCColumnStore.sync(cbc_csv)
+    assert store.column("hb")[0] == pytest.approx(pd.read_csv(cbc_csv)["hb"].iloc[0], abs=1e-4)
+
+
+def test_cbc_column_store_append_hashes_tail(cbc_csv, monkeypatch):
+    """Test an append re-hashes only the last block and concurrent syncs agree."""
+    import threading
+    import pandas as pd
+    from data_loaders import cbc_store
+    from data_loaders.cbc_store import CBCColumnStore
+    
+    monkeypatch.setattr(cbc_store, "HASH_BLOCK_BYTES", 256)
+    CBCColumnStore.sync(cbc_csv)
+    size = cbc_csv.stat().st_size
+    
+    hashed = []
+    hash_blocks = cbc_store._hash_blocks
+    
+    def recording_hash_blocks(path, start, end):
+        hashed.append((start, end))
+        return hash_blocks(path, start, end)
+    
+    monkeypatch.setattr(cbc_store, "_hash_blocks", recording_hash_blocks)
+    with open(cbc_csv, "a") as f:
+        f.write("13.1,5.0,90.0,29.0,33.0,13.0,7.0,250.0,PNEW,normal,40,F\n")
+    
+    threads = [threading.Thread(target=CBCColumnStore.sync, args=(cbc_csv,)) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    
+    store = CBCColumnStore.sync(cbc_csv)
+    assert len(store) == len(pd.read_csv(cbc_csv))
+    assert store.decode("patient_id")[-1] == "PNEW"
+    assert sum(end - start for start, end in hashed) < 4 * 256 + cbc_csv.stat().st_size - size
+
+
+def test_cbc_dataset_from_store(cbc_csv):
+    """Test store-backed datasets match CSV-backed ones."""
+    from data_loaders.hybrid_dataset import HybridDataset
+    
+    from_csv = CBCDataset(cbc_csv)
+    from_store = CBCDataset(cbc_csv, use_store=True)
+    
+    assert len(from_store) == len(from_csv)
+    assert torch.equal(from_store.labels, from_csv.labels)
+    assert torch.allclose(from_store.features, from_csv.features, atol=1e-4)
+    
+    hybrid = HybridDataset(cbc_csv, cbc_csv.parent / "images", use_store=True)
+    assert list(hybrid.patient_ids) == list(HybridDataset(cbc_csv, cbc_csv.parent / "images").patient_ids)
+
+
+def test_streaming_cbc_dataset(cbc_csv):
+    """Test out-of-core loading matches the in-memory dataset."""
+    from data_loaders.streaming_cbc import StreamingCBCDataset, StreamingCBCLoader
+    
+    in_memory = CBCDataset(cbc_csv)
+    streaming = StreamingCBCDataset(cbc_csv, chunk_rows=64)
+    
+    assert len(streaming) == 200
+    assert np.allclose(streaming.get_scaler().mean_, in_memory.get_scaler().mean_)
+    assert np.allclose(streaming.features, in_memory.features.numpy(), atol=1e-5)
+    assert (streaming.labels == in_memory.labels.numpy()).all()
+    
+    loader = StreamingCBCLoader(streaming, batch_size=32, shuffle=True, block_rows=64)
+    batches = list(loader)
+    assert len(batches) == len(loader) == 7
+    assert all(len(labels) == 32 for _, labels in batches[:-1])
+    labels = torch.cat([labels for _, labels in batches])
+    assert torch.equal(labels.sort().values, in_memory.labels.sort().values)
+    
+    # Scaled files and the fitted scaler are reused for an unchanged CSV
+    mtime = (streaming.cache_dir / "features.f32").stat().st_mtime_ns
+    reused = StreamingCBCDataset(cbc_csv, chunk_rows=64)
+    assert (reused.cache_dir / "features.f32").stat().st_mtime_ns == mtime
+    assert np.allclose(reused.get_scaler().scale_, streaming.get_scaler().scale_)
+
+
+@pytest.mark.parametrize("method", ["dirichlet", "quantity", "feature"])
+def test_partition_covers_every_row_once(cbc_csv, tmp_path, method):
+    """Test each partition method assigns every base row to exactly one client."""
+    from data_loaders.streaming_cbc import StreamingCBCDataset
+    from data_loaders.partitioning import ClientPartition, partition_dataset
+    
+    base = StreamingCBCDataset(cbc_csv)
+    partition = partition_dataset(base, tmp_path / method, num_clients=7, method=method, alpha=0.3)
+    
+    reopened = ClientPartition(tmp_path / method)
+    assert reopened.num_clients == 7
+    assert reopened.meta["method"] == method
+    assert np.array_equal(np.sort(np.asarray(reopened.indices)), np.arange(len(base)))
+    assert partition.label_counts(base.labels, 3).sum() == len(base)
+
+
+def test_client_batch_loader(cbc_csv, tmp_path):
+    """Test a client loader yields exactly the client's rows of the base."""
+    from data_loaders.streaming_cbc import StreamingCBCDataset
+    from data_loaders.partitioning import ClientBatchLoader, ClientSubset, partition_dataset
+    
+    base = StreamingCBCDataset(cbc_csv)
+    partition = partition_dataset(base, tmp_path / "parts", num_clients=4, method="quantity")
+    indices = partition.client_indices(2)
+    
+    loader = ClientBatchLoader(ClientSubset(base, indices), batch_size=16, shuffle=True)
+    batches = list(loader)
+    features = torch.cat([f for f, _ in batches])
+    labels = torch.cat([l for _, l in batches])
+    
+    assert len(batches) == len(loader)
+    assert labels.dtype == torch.long
+    assert len(labels) == len(indices)
+    assert torch.bincount(labels, minlength=3).tolist() == np.bincount(base.labels[indices], minlength=3).tolist()
+    assert torch.allclose(features.sum(dim=0), torch.from_numpy(np.asarray(base.features[indices])).sum(dim=0), atol=1e-4)
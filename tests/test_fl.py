@@ -1,10 +1,16 @@
 """Unit tests for federated learning."""
 
 import pytest
+import numpy as np
 import torch
 import torch.nn as nn
+from sklearn.preprocessing import StandardScaler
 from federated.aggregator import FederatedAggregator
 from federated.orchestrator import FederatedOrchestrator
+from federated.client_pool import ClientProcessPool
+from federated.feature_stats import FeatureStats, GLOBAL_SCALER_FILE, compute_feature_stats
+from data_loaders.scaler_io import load_scaler
+from data_generation.thalassemia_data_generator import ThalassemiaDataGenerator
 from models.thalassemia_models import CBCModel
 
 
@@ -52,3 +58,252 @@ def test_orchestrator():
     
     assert orchestrator.current_round == 1
     assert isinstance(global_weights, dict)
+
+
+def test_flat_buffer_matches_loop_aggregation():
+    """Test flat-buffer FedAvg matches the per-key loop."""
+    client_weights = []
+    for _ in range(3):
+        model = CBCModel()
+        model.train()
+        model(torch.randn(8, 8))  # update BatchNorm running stats
+        client_weights.append(model.state_dict())
+    sizes = [100, 200, 300]
+    
+    loop_result = FederatedAggregator("fedavg").aggregate(client_weights, sizes)
+    flat_result = FederatedAggregator("fedavg", use_flat_buffer=True).aggregate(client_weights, sizes)
+    
+    assert list(flat_result.keys()) == list(loop_result.keys())
+    for key in loop_result:
+        assert flat_result[key].dtype == client_weights[0][key].dtype
+        assert flat_result[key].shape == client_weights[0][key].shape
+        assert torch.allclose(flat_result[key].double(), loop_result[key].double(), atol=1e-6)
+
+
+def test_flat_buffer_integer_buffers():
+    """Test integer buffers are averaged and rounded, not truncated."""
+    weights1 = {"w": torch.ones(2), "num_batches_tracked": torch.tensor(10)}
+    weights2 = {"w": torch.zeros(2), "num_batches_tracked": torch.tensor(21)}
+    
+    aggregator = FederatedAggregator("weighted", use_flat_buffer=True)
+    aggregated = aggregator.aggregate([weights1, weights2], custom_weights=[1.0, 1.0])
+    
+    assert aggregated["num_batches_tracked"].dtype == torch.int64
+    assert aggregated["num_batches_tracked"].item() == 16
+    assert torch.allclose(aggregated["w"], torch.full((2,), 0.5))
+
+
+def test_flat_buffer_keeps_float64():
+    """Test float64 weights are aggregated without a float32 round trip."""
+    weights1 = {"w": torch.full((3,), 1.0 + 1e-12, dtype=torch.float64), "b": torch.ones(2)}
+    weights2 = {"w": torch.full((3,), 1.0 - 1e-12, dtype=torch.float64), "b": torch.zeros(2)}
+    expected = torch.full((3,), 1.0 + 1e-12 / 3, dtype=torch.float64)
+    
+    flat = FederatedAggregator("weighted", use_flat_buffer=True)
+    aggregated = flat.aggregate([weights1, weights2], custom_weights=[2.0, 1.0])
+    assert flat.get_layout(weights1).float_dtype == torch.float64
+    assert aggregated["w"].dtype == torch.float64
+    assert aggregated["b"].dtype == torch.float32
+    assert torch.allclose(aggregated["w"], expected, rtol=0, atol=1e-15)
+    
+    streaming = FederatedAggregator("fedavg")
+    streaming.begin_round()
+    streaming.accumulate(weights1, 2.0)
+    streaming.accumulate(weights2, 1.0)
+    assert torch.allclose(streaming.finalize()["w"], expected, rtol=0, atol=1e-15)
+
+
+def test_streaming_aggregation_matches_batch():
+    """Test begin_round/accumulate/finalize matches batch FedAvg."""
+    client_weights = []
+    for _ in range(4):
+        model = CBCModel()
+        model.train()
+        model(torch.randn(8, 8))
+        client_weights.append({k: v.clone() for k, v in model.state_dict().items()})
+    sizes = [120, 80, 300, 50]
+    
+    batch_result = FederatedAggregator("fedavg").aggregate(client_weights, sizes)
+    
+    aggregator = FederatedAggregator("fedavg")
+    aggregator.begin_round()
+    for weights, size in zip(client_weights, sizes):
+        aggregator.accumulate(weights, size)
+    assert aggregator.num_accumulated == 4
+    streamed = aggregator.finalize()
+    
+    for key in batch_result:
+        assert streamed[key].dtype == batch_result[key].dtype
+        assert torch.allclose(streamed[key].double(), batch_result[key].double(), atol=1e-5)
+
+
+def test_orchestrator_streaming_round():
+    """Test a streaming orchestrator round enforces min_clients."""
+    orchestrator = FederatedOrchestrator(CBCModel(), min_clients=2)
+    
+    orchestrator.begin_round()
+    orchestrator.accumulate_client_update(CBCModel().state_dict(), 100, {"accuracy": 0.5})
+    with pytest.raises(ValueError):
+        orchestrator.finalize_round(save_checkpoint=False)
+    assert orchestrator.current_round == 0
+    
+    # An aborted round leaves nothing behind for the next one
+    orchestrator.begin_round()
+    orchestrator.accumulate_client_update(CBCModel().state_dict(), 100, {"accuracy": 0.1})
+    orchestrator.abort_round()
+    
+    orchestrator.begin_round()
+    orchestrator.accumulate_client_update(CBCModel().state_dict(), 100, {"accuracy": 0.5})
+    orchestrator.accumulate_client_update(CBCModel().state_dict(), 300, {"accuracy": 0.9})
+    assert orchestrator.num_round_clients == 2
+    global_weights = orchestrator.finalize_round(save_checkpoint=False)
+    
+    assert orchestrator.current_round == 1
+    assert isinstance(global_weights, dict)
+    assert orchestrator.history["num_clients"] == [2]
+    assert orchestrator.history["global_metrics"][-1]["accuracy"] == pytest.approx(0.8)
+
+
+def test_streaming_round_follows_aggregation_method():
+    """Test streaming "weighted" uses equal weights and unknown methods are rejected."""
+    weights1 = {"w": torch.ones(2)}
+    weights2 = {"w": torch.zeros(2)}
+    
+    orchestrator = FederatedOrchestrator(CBCModel(), aggregation_method="weighted", min_clients=2)
+    orchestrator.begin_round()
+    orchestrator.accumulate_client_update(weights1, 100)
+    orchestrator.accumulate_client_update(weights2, 300)
+    assert torch.allclose(orchestrator.aggregator.finalize()["w"], torch.full((2,), 0.5))
+    
+    with pytest.raises(ValueError):
+        FederatedAggregator("fedprox").begin_round()
+
+
+def _train_dummy_client(seed: int, data_size: int):
+    """Train a CBC model for a few steps on seeded random data."""
+    torch.manual_seed(seed)
+    model = CBCModel()
+    optimizer = torch.optim.Adam(model.parameters(), lr=0.01)
+    for _ in range(3):
+        loss = nn.functional.cross_entropy(model(torch.randn(16, 8)), torch.randint(0, 3, (16,)))
+        optimizer.zero_grad()
+        loss.backward()
+        optimizer.step()
+    return model.state_dict(), data_size, {"loss": loss.item()}
+
+
+def test_client_pool_matches_serial():
+    """Test parallel client training returns the same weights as a serial run."""
+    client_args = [(seed, 100 + seed) for seed in range(3)]
+    serial = [_train_dummy_client(*args) for args in client_args]
+    
+    with ClientProcessPool(2, threads_per_worker=1) as pool:
+        parallel = list(pool.map(_train_dummy_client, client_args))
+    
+    for (s_weights, s_size, s_metrics), (p_weights, p_size, p_metrics) in zip(serial, parallel):
+        assert s_size == p_size
+        assert s_metrics == p_metrics
+        for key in s_weights:
+            assert p_weights[key].dtype == s_weights[key].dtype
+            assert torch.equal(p_weights[key], s_weights[key])
+
+
+def test_vectorized_simulator_matches_per_client_training():
+    """Test vmapped lockstep training equals training each client separately."""
+    from federated.vectorized import VectorizedClientSimulator
+    
+    torch.manual_seed(0)
+    global_model = CBCModel()
+    for module in global_model.modules():
+        if isinstance(module, nn.Dropout):
+            module.p = 0.0
+    global_weights = {k: v.clone() for k, v in global_model.state_dict().items()}
+    
+    sizes = [10, 20, 15]
+    features = torch.randn(sum(sizes), 8)
+    labels = torch.randint(0, 3, (sum(sizes),))
+    steps, batch_size = 3, 4
+    
+    simulator = VectorizedClientSimulator(global_model, num_clients=3, learning_rate=0.01)
+    stacked, metrics = simulator.train_round(
+        global_weights, features, labels, sizes, steps,
+        batch_size=batch_size, generator=torch.Generator().manual_seed(1)
+    )
+    assert metrics["loss"].shape == (3,)
+    for bad_sizes in ([10, 0, 35], [10, 20, 16]):
+        with pytest.raises(ValueError):
+            simulator.train_round(global_weights, features, labels, bad_sizes, steps)
+    
+    starts = [0, 10, 30]
+    ill_conditioned = {"model.0.bias", "model.4.bias", "model.1.running_mean", "model.5.running_mean"}
+    for client in range(3):
+        model = CBCModel()
+        for module in model.modules():
+            if isinstance(module, nn.Dropout):
+                module.p = 0.0
+        model.load_state_dict(global_weights)
+        model.train()
+        optimizer = torch.optim.Adam(model.parameters(), lr=0.01)
+        generator = torch.Generator().manual_seed(1)
+        for _ in range(steps):
+            offsets = torch.rand(3, batch_size, generator=generator)[client]
+            idx = starts[client] + (offsets * sizes[client]).long()
+            loss = nn.functional.cross_entropy(model(features[idx]), labels[idx])
+            optimizer.zero_grad()
+            loss.backward()
+            optimizer.step()
+        
+        for key, value in model.state_dict().items():
+            # Linear biases feeding BatchNorm get a mathematically zero
+            # gradient, so Adam only amplifies rounding noise there
+            if key in ill_conditioned:
+                continue
+            assert torch.allclose(stacked[key][client].double(), value.double(), atol=1e-5), key
+    
+    aggregated = VectorizedClientSimulator.aggregate(stacked, sizes)
+    CBCModel().load_state_dict(aggregated)
+
+
+def test_feature_stats_match_pooled_scaler(tmp_path):
+    """Test merged client statistics give the scaler fit on all rows."""
+    rng = np.random.default_rng(0)
+    clients = [rng.normal(5.0, 2.0, size=(n, 8)) for n in (50, 120, 30)]
+    
+    orchestrator = FederatedOrchestrator(CBCModel(), checkpoint_dir=tmp_path)
+    scaler = orchestrator.aggregate_feature_stats([FeatureStats.from_array(c) for c in clients])
+    expected = StandardScaler().fit(np.concatenate(clients))
+    
+    np.testing.assert_allclose(scaler.mean_, expected.mean_)
+    np.testing.assert_allclose(scaler.scale_, expected.scale_)
+    np.testing.assert_allclose(load_scaler(tmp_path / GLOBAL_SCALER_FILE).scale_, expected.scale_)
+
+
+def test_feature_stats_skip_missing_values():
+    """Test blank cells are skipped per feature, as StandardScaler.fit does."""
+    rng = np.random.default_rng(1)
+    features = rng.normal(5.0, 2.0, size=(40, 8))
+    features[[3, 17], 2] = np.nan
+    features[25, 5] = np.nan
+    
+    stats = FeatureStats.from_array(features[:20]) + FeatureStats.from_array(features[20:])
+    scaler = FeatureStats.from_dict(stats.to_dict()).to_scaler()
+    expected = StandardScaler().fit(features)
+    
+    assert stats.count == 40
+    assert stats.counts.tolist() == [40, 40, 38, 40, 40, 39, 40, 40]
+    np.testing.assert_allclose(scaler.mean_, expected.mean_)
+    np.testing.assert_allclose(scaler.scale_, expected.scale_)
+
+
+def test_compute_feature_stats_csv_and_store(tmp_path):
+    """Test client statistics are the same from the CSV and the column store."""
+    generator = ThalassemiaDataGenerator(seed=0)
+    csv_path = tmp_path / "hospital_test" / "cbc_data.csv"
+    generator.save_dataset(generator.generate_dataset(100), csv_path)
+    
+    from_csv = compute_feature_stats(csv_path, chunk_rows=30)
+    from_store = compute_feature_stats(csv_path, use_store=True, chunk_rows=30)
+    
+    assert from_csv.count == from_store.count == 100
+    np.testing.assert_allclose(from_csv.mean, from_store.mean, rtol=1e-5)
+    np.testing.assert_allclose(from_csv.var, from_store.var, rtol=1e-4)
@@ -49,3 +49,53 @@ def test_get_model():
     
     model_hybrid = get_model("hybrid", num_classes=3, pretrained=False)
     assert isinstance(model_hybrid, HybridModel)
+
+
+def test_hybrid_model_precomputed_features():
+    """Test hybrid forward with cached embeddings or pre-fc features."""
+    model = HybridModel(cbc_input_dim=8, num_classes=3, pretrained=False).eval()
+    cbc_data = torch.randn(2, 8)
+    images = torch.randn(2, 3, 64, 64)
+    
+    with torch.no_grad():
+        expected = model(cbc_data, images)
+        from_embeddings = model(cbc_data, model.image_branch(images))
+        from_features = model(cbc_data, model.backbone_features(images))
+    
+    assert torch.allclose(from_embeddings, expected, atol=1e-5)
+    assert torch.allclose(from_features, expected, atol=1e-5)
+
+
+def test_image_embedding_cache(tmp_path):
+    """Test embeddings are reused and invalidated by backbone changes."""
+    import numpy as np
+    from PIL import Image
+    from models.embedding_cache import ImageEmbeddingCache
+    
+    image_paths = []
+    for i in range(3):
+        path = tmp_path / "images" / f"P{i}.png"
+        path.parent.mkdir(parents=True, exist_ok=True)
+        Image.fromarray(np.full((32, 32, 3), 40 * i, dtype=np.uint8)).save(path)
+        image_paths.append(path)
+    image_paths.append(image_paths[0])
+    
+    model = HybridModel(cbc_input_dim=8, num_classes=3, pretrained=False)
+    model.freeze_image_branch()
+    cache = ImageEmbeddingCache(tmp_path / "cache")
+    
+    embeddings = cache.get_embeddings(model, image_paths, image_size=32)
+    assert embeddings.shape == (4, 128)
+    assert torch.equal(embeddings[0], embeddings[3])
+    assert cache.stats == {"hits": 1, "misses": 3}
+    
+    # A new cache instance reads the persisted file
+    cache = ImageEmbeddingCache(tmp_path / "cache")
+    assert torch.equal(cache.get_embeddings(model, image_paths, image_size=32), embeddings)
+    assert cache.stats["misses"] == 0
+    
+    with torch.no_grad():
+        model.image_branch.conv1.weight.mul_(2.0)
+    cache.get_embeddings(model, image_paths, image_size=32)
+    assert cache.stats["misses"] == 3
+    assert len(list((tmp_path / "cache").glob("*.pt"))) == 1
@@ -0,0 +1,90 @@
+"""Unit tests for training utilities."""
+
+import pytest
+import numpy as np
+import torch
+from torch.utils.data import DataLoader, TensorDataset
+from models.thalassemia_models import CBCModel
+from training.local_trainer import LocalTrainer
+from training.metrics import calculate_metrics, MetricAccumulator
+
+
+def test_metric_accumulator_matches_calculate_metrics():
+    """Test streamed confusion-matrix metrics equal the list-based ones."""
+    torch.manual_seed(0)
+    accumulator = MetricAccumulator(num_classes=4)
+    all_labels, all_preds = [], []
+    
+    for _ in range(5):
+        outputs = torch.randn(16, 4)
+        # Class 3 never occurs, so it must not enter the macro average
+        outputs[:, 3] = -10.0
+        labels = torch.randint(0, 3, (16,))
+        accumulator.update(torch.tensor(0.5), outputs, labels)
+        all_labels.extend(labels.tolist())
+        all_preds.extend(outputs.argmax(dim=1).tolist())
+    
+    metrics = accumulator.compute()
+    expected = calculate_metrics(all_labels, all_preds)
+    
+    for name, value in expected.items():
+        assert metrics[name] == pytest.approx(value)
+    assert metrics["loss"] == pytest.approx(0.5)
+    assert accumulator.confusion_matrix().sum() == 80
+
+
+def test_local_trainer_epoch_metrics():
+    """Test trainer epoch metrics come from the accumulator."""
+    torch.manual_seed(0)
+    dataset = TensorDataset(torch.randn(64, 8), torch.randint(0, 3, (64,)))
+    trainer = LocalTrainer(CBCModel(), device="cpu")
+    
+    train_metrics = trainer.train_epoch(DataLoader(dataset, batch_size=16))
+    val_metrics = trainer.validate(DataLoader(dataset, batch_size=16))
+    
+    for metrics in (train_metrics, val_metrics):
+        assert set(metrics) == {"accuracy", "precision", "recall", "f1", "loss"}
+        assert 0.0 <= metrics["accuracy"] <= 1.0
+        assert metrics["loss"] > 0
+
+
+def test_metrics_match_sklearn():
+    """Test confusion-matrix metrics agree with scikit-learn."""
+    from sklearn import metrics as skm
+    from training.metrics import (
+        calculate_confusion_matrix,
+        calculate_per_class_metrics,
+        get_classification_report
+    )
+    
+    rng = torch.Generator().manual_seed(0)
+    y_true = torch.randint(0, 3, (500,), generator=rng).numpy()
+    y_pred = torch.randint(0, 3, (500,), generator=rng).numpy()
+    y_pred[y_pred == 2] = 4  # a class that only appears in predictions
+    
+    for average in ("macro", "weighted"):
+        metrics = calculate_metrics(y_true, y_pred, average=average)
+        assert metrics["accuracy"] == pytest.approx(skm.accuracy_score(y_true, y_pred))
+        assert metrics["precision"] == pytest.approx(
+            skm.precision_score(y_true, y_pred, average=average, zero_division=0))
+        assert metrics["recall"] == pytest.approx(
+            skm.recall_score(y_true, y_pred, average=average, zero_division=0))
+        assert metrics["f1"] == pytest.approx(
+            skm.f1_score(y_true, y_pred, average=average, zero_division=0))
+    
+    assert (calculate_confusion_matrix(y_true, y_pred) == skm.confusion_matrix(y_true, y_pred)).all()
+    
+    # Sparse, large class ids must not allocate a (max_label + 1)^2 table
+    sparse_true, sparse_pred = np.array([0, 50000, 0]), np.array([0, 50000, 50000])
+    assert (calculate_confusion_matrix(sparse_true, sparse_pred)
+            == skm.confusion_matrix(sparse_true, sparse_pred)).all()
+    
+    per_class = calculate_per_class_metrics(y_true, y_pred)
+    assert set(per_class) == {"class_0", "class_1", "class_2"}
+    assert per_class["class_2"]["recall"] == 0.0
+    assert per_class["class_1"]["f1"] == pytest.approx(
+        skm.f1_score(y_true == 1, y_pred == 1, zero_division=0))
+    
+    names = ["Normal", "Thalassemia Minor", "Thalassemia Major", "Other"]
+    assert get_classification_report(y_true, y_pred, target_names=names) == \
+        skm.classification_report(y_true, y_pred, target_names=names)
@@ -1,6 +1,6 @@
 """Training package for MedChain-FL."""
 
 from .local_trainer import LocalTrainer
-from .metrics import calculate_metrics
+from .metrics import calculate_metrics, MetricAccumulator
 
-__all__ = ["LocalTrainer", "calculate_metrics"]
+__all__ = ["LocalTrainer", "calculate_metrics", "MetricAccumulator"]
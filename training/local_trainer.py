@@ -8,7 +8,7 @@ from typing import Optional, Dict
 from tqdm import tqdm
 from config.logging_config import get_logger
 from models.model_utils import save_model, get_device
-from .metrics import calculate_metrics
+from .metrics import MetricAccumulator
 
 logger = get_logger(__name__)
 
@@ -55,9 +55,7 @@ class LocalTrainer:
         """Train for one epoch."""
         self.model.train()
         
-        total_loss = 0.0
-        all_preds = []
-        all_labels = []
+        accumulator = MetricAccumulator()
         
         pbar = tqdm(dataloader, desc="Training")
         
@@ -88,17 +86,11 @@ class LocalTrainer:
             loss.backward()
             self.optimizer.step()
             
-            # Track metrics
-            total_loss += loss.item()
-            _, predicted = torch.max(outputs.data, 1)
-            all_preds.extend(predicted.cpu().numpy())
-            all_labels.extend(labels.cpu().numpy())
-            
-            pbar.set_postfix({"loss": loss.item()})
+            # Track metrics (on device, synced once per epoch)
+            accumulator.update(loss, outputs, labels)
         
-        avg_loss = total_loss / len(dataloader)
-        metrics = calculate_metrics(all_labels, all_preds)
-        metrics["loss"] = avg_loss
+        metrics = accumulator.compute()
+        pbar.set_postfix({"loss": metrics["loss"]})
         
         return metrics
     
@@ -106,9 +98,7 @@ class LocalTrainer:
         """Validate model."""
         self.model.eval()
         
-        total_loss = 0.0
-        all_preds = []
-        all_labels = []
+        accumulator = MetricAccumulator()
         
         with torch.no_grad():
             for batch in tqdm(dataloader, desc="Validating"):
@@ -127,17 +117,9 @@ class LocalTrainer:
                     outputs = self.model(cbc_data, image_data)
                 
                 loss = self.criterion(outputs, labels)
-                
-                total_loss += loss.item()
-                _, predicted = torch.max(outputs.data, 1)
-                all_preds.extend(predicted.cpu().numpy())
-                all_labels.extend(labels.cpu().numpy())
+                accumulator.update(loss, outputs, labels)
         
-        avg_loss = total_loss / len(dataloader)
-        metrics = calculate_metrics(all_labels, all_preds)
-        metrics["loss"] = avg_loss
-        
-        return metrics
+        return accumulator.compute()
     
     def train(
         self,
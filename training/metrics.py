@@ -1,55 +1,225 @@
-"""Metrics calculation for model evaluation."""
+"""Metrics calculation for model evaluation.
 
+Every metric is derived from a single confusion matrix built with one
+``np.bincount`` pass over the labels; results match scikit-learn's
+``zero_division=0`` behaviour.
+"""
+
+import torch
 import numpy as np
-from sklearn.metrics import (
-    accuracy_score,
-    precision_score,
-    recall_score,
-    f1_score,
-    confusion_matrix,
-    classification_report
-)
-from typing import Dict, List
-
-
-def calculate_metrics(y_true: List, y_pred: List) -> Dict[str, float]:
+from typing import Dict, List, Optional, Tuple
+
+
+def _as_label_array(y) -> np.ndarray:
+    """Convert labels (list, numpy array or tensor) to a 1-D numpy array."""
+    if isinstance(y, torch.Tensor):
+        y = y.detach().cpu().numpy()
+    return np.asarray(y).ravel()
+
+
+def _confusion_with_labels(y_true, y_pred) -> Tuple[np.ndarray, np.ndarray]:
     """
-    Calculate classification metrics.
+    Build a confusion matrix over the sorted union of observed labels.
     
     Args:
         y_true: True labels
         y_pred: Predicted labels
         
+    Returns:
+        Tuple of (confusion matrix, labels)
+    """
+    y_true = _as_label_array(y_true)
+    y_pred = _as_label_array(y_pred)
+    if len(y_true) != len(y_pred):
+        raise ValueError(f"Label length mismatch: {len(y_true)} vs {len(y_pred)}")
+    
+    if len(y_true) == 0:
+        return np.zeros((0, 0), dtype=np.int64), np.array([], dtype=np.int64)
+    
+    both = np.concatenate([y_true, y_pred])
+    is_int = np.issubdtype(y_true.dtype, np.integer) and np.issubdtype(y_pred.dtype, np.integer)
+    if is_int and both.min() >= 0 and both.max() < 2 * len(both):
+        # Small non-negative class ids: a presence table (O(n) memory)
+        # maps them to compact positions without sorting
+        present = np.bincount(both) > 0
+        labels = np.flatnonzero(present)
+        inverse = (np.cumsum(present) - 1)[both]
+    else:
+        # Sparse, large or non-integer labels
+        labels, inverse = np.unique(both, return_inverse=True)
+    
+    size = len(labels)
+    true_idx, pred_idx = inverse[:len(y_true)], inverse[len(y_true):]
+    cm = np.bincount(true_idx * size + pred_idx, minlength=size * size).reshape(size, size)
+    
+    return cm, labels
+
+
+def _per_class_from_confusion(cm: np.ndarray) -> Tuple[np.ndarray, ...]:
+    """Per-class precision, recall, F1 and support (0/0 counts as 0)."""
+    cm = np.asarray(cm, dtype=np.float64)
+    tp = np.diag(cm)
+    support = cm.sum(axis=1)
+    predicted = cm.sum(axis=0)
+    
+    with np.errstate(divide="ignore", invalid="ignore"):
+        precision = np.where(predicted > 0, tp / predicted, 0.0)
+        recall = np.where(support > 0, tp / support, 0.0)
+        f1 = np.where(precision + recall > 0, 2 * precision * recall / (precision + recall), 0.0)
+    
+    return precision, recall, f1, support
+
+
+def metrics_from_confusion_matrix(cm: np.ndarray, average: str = "macro") -> Dict[str, float]:
+    """
+    Calculate accuracy and averaged precision/recall/F1 from a confusion matrix.
+    
+    Classes that appear in neither the true nor the predicted labels are
+    left out of the average, and 0/0 counts as 0.
+    
+    Args:
+        cm: Confusion matrix (rows = true, columns = predicted)
+        average: "macro" or "weighted" (by support)
+        
     Returns:
         Dictionary of metrics
     """
-    metrics = {
-        "accuracy": accuracy_score(y_true, y_pred),
-        "precision": precision_score(y_true, y_pred, average="macro", zero_division=0),
-        "recall": recall_score(y_true, y_pred, average="macro", zero_division=0),
-        "f1": f1_score(y_true, y_pred, average="macro", zero_division=0),
+    if average not in ("macro", "weighted"):
+        raise ValueError(f"Unknown average: {average}")
+    
+    cm = np.asarray(cm, dtype=np.float64)
+    precision, recall, f1, support = _per_class_from_confusion(cm)
+    present = (support + cm.sum(axis=0)) > 0
+    
+    if average == "macro":
+        weights = present.astype(np.float64)
+    else:
+        weights = support
+    total_weight = weights.sum()
+    
+    def average_of(values: np.ndarray) -> float:
+        return float((values * weights).sum() / total_weight) if total_weight > 0 else 0.0
+    
+    total = cm.sum()
+    
+    return {
+        "accuracy": float(np.trace(cm) / total) if total > 0 else 0.0,
+        "precision": average_of(precision),
+        "recall": average_of(recall),
+        "f1": average_of(f1),
     }
+
+
+class MetricAccumulator:
+    """
+    Streaming loss and confusion-matrix accumulator kept on the device.
     
-    return metrics
+    ``update`` only launches device ops (a bincount into the confusion
+    matrix and an add into the loss sum), so there is no host sync per
+    batch; ``compute`` copies the small matrix to the host once.
+    """
+    
+    def __init__(self, num_classes: Optional[int] = None):
+        """
+        Initialize accumulator.
+        
+        Args:
+            num_classes: Number of classes (inferred from the first
+                batch of logits if None)
+        """
+        self.num_classes = num_classes
+        self.reset()
+    
+    def reset(self):
+        """Clear accumulated state."""
+        self.loss_sum: Optional[torch.Tensor] = None
+        self.confusion: Optional[torch.Tensor] = None
+        self.num_batches = 0
+    
+    def update(self, loss: torch.Tensor, outputs: torch.Tensor, labels: torch.Tensor):
+        """
+        Add one batch.
+        
+        Args:
+            loss: Batch mean loss
+            outputs: Logits (batch, num_classes)
+            labels: True labels (batch,)
+        """
+        if self.confusion is None:
+            if self.num_classes is None:
+                self.num_classes = outputs.shape[1]
+            self.confusion = torch.zeros(
+                self.num_classes * self.num_classes, dtype=torch.long, device=outputs.device
+            )
+            self.loss_sum = torch.zeros((), dtype=torch.float64, device=outputs.device)
+        
+        predicted = outputs.detach().argmax(dim=1)
+        # index_add_ into the fixed-size buffer; bincount sizes its output
+        # from the data and would sync with the host on every batch
+        cells = labels.to(self.confusion.device) * self.num_classes + predicted
+        self.confusion.index_add_(0, cells, torch.ones_like(cells))
+        self.loss_sum += loss.detach()
+        self.num_batches += 1
+    
+    def confusion_matrix(self) -> np.ndarray:
+        """Get the accumulated confusion matrix on the host."""
+        if self.confusion is None:
+            size = self.num_classes or 0
+            return np.zeros((size, size), dtype=np.int64)
+        return self.confusion.view(self.num_classes, self.num_classes).cpu().numpy()
+    
+    def compute(self) -> Dict[str, float]:
+        """
+        Get epoch metrics.
+        
+        Returns:
+            Accuracy, macro precision/recall/F1 and mean batch loss
+        """
+        metrics = metrics_from_confusion_matrix(self.confusion_matrix())
+        loss_sum = self.loss_sum.item() if self.loss_sum is not None else 0.0
+        metrics["loss"] = loss_sum / max(self.num_batches, 1)
+        
+        return metrics
+
+
+def calculate_metrics(y_true: List, y_pred: List, average: str = "macro") -> Dict[str, float]:
+    """
+    Calculate classification metrics.
+    
+    Args:
+        y_true: True labels
+        y_pred: Predicted labels
+        average: "macro" or "weighted" averaging of precision/recall/F1
+        
+    Returns:
+        Dictionary of metrics
+    """
+    cm, _ = _confusion_with_labels(y_true, y_pred)
+    
+    return metrics_from_confusion_matrix(cm, average=average)
 
 
 def calculate_confusion_matrix(y_true: List, y_pred: List) -> np.ndarray:
     """Calculate confusion matrix."""
-    return confusion_matrix(y_true, y_pred)
+    return _confusion_with_labels(y_true, y_pred)[0]
 
 
 def get_classification_report(
     y_true: List,
     y_pred: List,
-    target_names: List[str] = None
+    target_names: List[str] = None,
+    digits: int = 2
 ) -> str:
     """
     Get detailed classification report.
     
+    The layout is identical to ``sklearn.metrics.classification_report``.
+    
     Args:
         y_true: True labels
         y_pred: Predicted labels
         target_names: Names of classes
+        digits: Number of digits for floats
         
     Returns:
         Classification report string
@@ -57,22 +227,55 @@ def get_classification_report(
     if target_names is None:
         target_names = ["Normal", "Thalassemia Minor", "Thalassemia Major"]
     
-    return classification_report(y_true, y_pred, target_names=target_names)
+    cm, labels = _confusion_with_labels(y_true, y_pred)
+    if len(labels) != len(target_names):
+        raise ValueError(
+            f"Number of classes, {len(labels)}, does not match size of "
+            f"target_names, {len(target_names)}"
+        )
+    
+    precision, recall, f1, support = _per_class_from_confusion(cm)
+    total = int(support.sum())
+    
+    headers = ["precision", "recall", "f1-score", "support"]
+    width = max(max(len(name) for name in target_names), len("weighted avg"), digits)
+    row_fmt = "{:>{width}s} " + " {:>9.{digits}f}" * 3 + " {:>9}\n"
+    
+    report = ("{:>{width}s} " + " {:>9}" * len(headers)).format("", *headers, width=width)
+    report += "\n\n"
+    for name, p, r, f, s in zip(target_names, precision, recall, f1, support):
+        report += row_fmt.format(name, p, r, f, int(s), width=width, digits=digits)
+    report += "\n"
+    
+    accuracy = float(np.trace(cm) / total) if total > 0 else 0.0
+    report += ("{:>{width}s} " + " {:>9.{digits}}" * 2 + " {:>9.{digits}f}" + " {:>9}\n").format(
+        "accuracy", "", "", accuracy, total, width=width, digits=digits
+    )
+    for average in ("macro", "weighted"):
+        avg = metrics_from_confusion_matrix(cm, average=average)
+        report += row_fmt.format(
+            f"{average} avg", avg["precision"], avg["recall"], avg["f1"], total,
+            width=width, digits=digits
+        )
+    
+    return report
 
 
 def calculate_per_class_metrics(y_true: List, y_pred: List) -> Dict[str, Dict]:
     """Calculate metrics for each class."""
-    classes = sorted(set(y_true))
+    cm, labels = _confusion_with_labels(y_true, y_pred)
+    precision, recall, f1, support = _per_class_from_confusion(cm)
     per_class = {}
     
-    for cls in classes:
-        y_true_binary = [1 if y == cls else 0 for y in y_true]
-        y_pred_binary = [1 if y == cls else 0 for y in y_pred]
+    for i, cls in enumerate(labels):
+        # Only classes present in the true labels are reported
+        if support[i] == 0:
+            continue
         
         per_class[f"class_{cls}"] = {
-            "precision": precision_score(y_true_binary, y_pred_binary, zero_division=0),
-            "recall": recall_score(y_true_binary, y_pred_binary, zero_division=0),
-            "f1": f1_score(y_true_binary, y_pred_binary, zero_division=0),
+            "precision": float(precision[i]),
+            "recall": float(recall[i]),
+            "f1": float(f1[i]),
         }
     
     return per_class
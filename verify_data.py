@@ -1,7 +1,7 @@
 """Quick data verification and exploration script."""
 
-import pandas as pd
 from pathlib import Path
+from data_loaders.cbc_store import load_cbc_frame
 
 print("=" * 60)
 print("MedChain-FL Data Verification Report")
@@ -19,7 +19,7 @@ for hospital in hospitals:
         data_path = base_dir / f"hospital_{hospital}" / "cbc_data.csv"
     
     if data_path.exists():
-        df = pd.read_csv(data_path)
+        df = load_cbc_frame(data_path)
         total_samples += len(df)
         
         print(f"\n{hospital.upper()} Dataset:")
@@ -43,7 +43,7 @@ print("=" * 60)
 
 # Show sample data
 print("\nSample Data (Italy - first 3 rows):")
-df_italy = pd.read_csv(base_dir / "hospital_italy" / "cbc_data.csv")
-print(df_italy.head(3).to_string())
+df_italy = load_cbc_frame(base_dir / "hospital_italy" / "cbc_data.csv")
+print(df_italy.head(3).to_string(float_format="%.2f"))
 
 print("\n✓ All data files generated successfully!")